@@ -0,0 +1,238 @@
+# Benchmark harness for the startup, validation and query hot paths.
+#
+# Generates synthetic `.leetsolver` directories with a given number of `daily_log`
+# rows, times each case and appends one JSON line per (size, case) to the output
+# file, tagged with the current commit so runs can be compared across commits.
+#
+# usage:
+#     python benchmarks/bench.py                      # sizes 100, 10k, 1M
+#     python benchmarks/bench.py --sizes 100 10000 --repeat 20
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+import subprocess
+import threading
+import statistics
+import argparse
+import datetime
+import tempfile
+import platform
+import sqlite3
+import random
+import json
+import time
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import LeetSolver.initapp as initapp
+from LeetSolver.backend.database import Database, make_log_event
+from LeetSolver.validators import validate_sqlite_database, validate_json_file
+from LeetSolver.utils import Animation
+from LeetSolver.frontend.ui_renderer import Region
+from LeetSolver.frontend.logos import load_logo
+from LeetSolver.backend.analytics import Insights
+from LeetSolver.backend.streaks import StreakEngine
+from LeetSolver.backend.writebehind import WriteBehindQueue
+from LeetSolver.backend import scoring
+
+SCHEMA = getattr(initapp, "__DEFAULT_SQLITE_SCHEMA")
+SETTINGS = getattr(initapp, "__DEFULT_SETTINGS")
+QUESTIONS = 3000
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+TAGS = ("array", "string", "hash table", "dynamic programming", "graph", "tree", "greedy", "heap")
+
+
+def commit_id() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def synthetic_logs(rows: int, seed: int = 0) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    start = datetime.date(2015, 1, 1).toordinal()
+    for _ in range(rows):
+        yield make_log_event(
+            f"q{rng.randrange(QUESTIONS)}",
+            date=datetime.date.fromordinal(start + rng.randrange(3650)).isoformat(),
+            time_taken=rng.randrange(5, 120),
+            success=rng.random() < 0.8
+        )
+
+def build_directory(base: Path, rows: int) -> Path:
+    """Creates a validated `.leetsolver` directory holding `rows` daily_log rows."""
+    path = base / ".leetsolver"
+    path.mkdir()
+    db = initapp.validate_DIR(path)
+
+    rng = random.Random(1)
+    db.add_questions(
+        {"question_id": f"q{i}", "name": f"Question {i}", "difficulty": rng.choice(DIFFICULTIES),
+         "tags": ", ".join(rng.sample(TAGS, 2)), "notes": None}
+        for i in range(QUESTIONS)
+    )
+    # the summary triggers are dropped for the bulk load and rebuilt in one pass
+    with db.transaction() as conn:
+        for name in SCHEMA["Triggers"]:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name};")
+    logs = synthetic_logs(rows)
+    while True:
+        batch = [event for _, event in zip(range(50_000), logs)]
+        if not batch:
+            break
+        db.log_solves(batch)
+    db.rebuild_weekly_summary()
+    db.close()
+
+    initapp.validate_DIR(path, revalidate=True)
+    return path
+
+class NullWindow:
+    """Stands in for a curses window, so drawing is timed without a terminal."""
+
+    def box(self) -> None:
+        pass
+
+    def addstr(self, y: int, x: int, text: str) -> None:
+        pass
+
+    def noutrefresh(self) -> None:
+        pass
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "max_ms": round(max(timings), 4),
+    }
+
+def cases(path: Path) -> Dict[str, Callable[[], object]]:
+    db = Database(settings=path / "settings.json", database=path / "database.db")
+    animation = Animation(*load_logo(cache_dir=path))
+    insights = Insights(db)
+    streaks = StreakEngine(db, state_path=path / "bench_streaks.json")
+    settings = initapp.load_settings(db)
+
+    def streak_build() -> None:
+        StreakEngine(db, state_path=None).refresh()
+
+    def streak_queries() -> None:
+        streaks.refresh()
+        streaks.current_streak()
+        streaks.heatmap()
+
+    first = animation.frame_at(0)
+    logo = Region((len(first) + 2, len(first[0]) + 2, 0, 0), win=NullWindow())
+
+    def render_frames() -> None:
+        # what the UI does per frame: draw the logo into the region and flush the diff
+        for t in range(0, 5000, 50):
+            logo.clear()
+            for y, row in enumerate(animation.frame_at(t)):
+                logo.write(y, 0, row)
+            logo.flush()
+
+    def settings_reads() -> None:
+        # what the render loop does: one lookup per frame, one poll per second
+        for _ in range(1000):
+            settings.get("logoid")
+        settings.poll()
+
+    def settings_write() -> None:
+        settings.set("logoid", 1 - settings.get("logoid"))
+        settings.flush()
+
+    suite = {
+        "init_fast_path": lambda: initapp.validate_DIR(path),
+        "init_revalidate": lambda: initapp.validate_DIR(path, revalidate=True),
+        "validate_sqlite_database": lambda: validate_sqlite_database(
+            path / "database.db", schema=SCHEMA, fix=True),
+        "validate_sqlite_database_full": lambda: validate_sqlite_database(
+            path / "database.db", schema=SCHEMA, fix=True, full=True),
+        "validate_json_file": lambda: validate_json_file(
+            path / "settings.json", schema=SETTINGS, fix=True),
+        "query_logs_week": lambda: db.logs_between("2020-06-01", "2020-06-07"),
+        "query_weekly_summary": lambda: db.weekly_summary(52),
+        "query_get_question": lambda: db.get_question("q42"),
+        "query_questions_page": lambda: db.questions_page(
+            "last_solved", ("2020-06-01", "q1500"), limit=50),
+        "query_tag_stats": lambda: db.tag_stats(),
+        "insights_dashboard_cached": lambda: insights.dashboard(),
+        "streak_build": streak_build,
+        "streak_refresh_and_query": streak_queries,
+        "query_search": lambda: db.search_questions('"question" "4"*', 20),
+        "frame_render_100": render_frames,
+        "logo_load_cached": lambda: load_logo(cache_dir=path),
+        "settings_get_1000_poll": settings_reads,
+        "settings_set_flush": settings_write,
+        "backup_snapshot": lambda: db.backup("bench", keep=1),
+    }
+    # writes to the database, runs after the read only cases
+    writer = WriteBehindQueue(db, journal_path=path / "bench_journal.jsonl")
+
+    def log_and_flush() -> None:
+        for i in range(100):
+            writer.log(f"q{i}", time_taken=30)
+        writer.flush()
+
+    suite["writebehind_log_100_flush"] = log_and_flush
+
+    def concurrent_writers() -> None:
+        # 4 connections doing read-then-write transactions on the same file at once
+        def work() -> None:
+            own = Database(database=path / "database.db")
+            for i in range(25):
+                with own.transaction():
+                    own.get_question(f"q{i}")
+                    own.log_solve(f"q{i}", time_taken=30)
+            own.close()
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    suite["concurrent_writers_4x25"] = concurrent_writers
+    suite["query_due_questions"] = lambda: scoring.due_questions(db, 10, store=False)
+    return suite
+
+def run(sizes: List[int], repeat: int, output: Path) -> None:
+    meta = {
+        "commit": commit_id(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "a", encoding="utf-8") as file:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as base:
+                start = time.perf_counter()
+                path = build_directory(Path(base), size)
+                print(f"[{size} rows] built in {time.perf_counter() - start:.1f}s")
+
+                for name, func in cases(path).items():
+                    result = dict(meta, size=size, case=name, **measure(func, repeat))
+                    file.write(json.dumps(result) + "\n")
+                    print(f"  {name:<32} median {result['median_ms']:>10.3f} ms")
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="LeetSolver benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", type=Path, default=ROOT / "benchmarks" / "results.jsonl")
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Import time budget of the non interactive commands.
+#
+# Runs `python -X importtime -m LeetSolver <command>` against a fresh `.leetsolver`
+# directory and fails (exit status 1) if a command loads one of the heavy modules
+# (curses, numpy, plotting) or if its imports take longer than the budget, in the
+# fastest of the runs. Only the imports after the interpreter started are counted.
+# Bytecode is cached (in a temporary directory) as in an installed package, so
+# the budget is spent on imports and not on compiling the sources.
+# tests/test_importtime.py runs the same check with the default budget.
+#
+# usage:
+#     python benchmarks/importtime.py                  # budget 75 ms
+#     python benchmarks/importtime.py --budget 40 --repeat 10
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import subprocess
+import argparse
+import tempfile
+import sqlite3
+import os
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_MS = 75.0
+# logged by the `log` command, added to the fresh database by `prepare`
+QUESTION_ID = "two-sum"
+
+COMMANDS = (
+    ("log", QUESTION_ID, "--time-taken", "20"),
+    ("due",),
+    ("stats", "--json"),
+    ("search", "two", "sum"),
+)
+# modules only the TUI, scoring and plotting need
+FORBIDDEN = ("curses", "_curses", "numpy", "rich", "plotext", "termplotlib")
+
+
+def run(command: Tuple[str, ...], home: str) -> str:
+    """Runs one command, returns its `-X importtime` report."""
+    env = dict(os.environ, HOME=home, PYTHONPATH=str(ROOT / "src"), PYTHONPYCACHEPREFIX=str(Path(home) / "pycache"))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "LeetSolver", *command],
+        cwd=home, capture_output=True, text=True, env=env,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"'{' '.join(command)}' failed:\n{result.stderr[-2000:]}")
+    return result.stderr
+
+def parse_report(report: str) -> Dict[str, int]:
+    """
+    Top level imports made by the command and their cumulative time in microseconds,
+    nested imports are counted in the entry of the module importing them. What the
+    interpreter loads up to `runpy` (site, encodings, ...) is the same for every
+    command and left out.
+    """
+    modules = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit() or name[1:].startswith(" "):
+            continue
+        if name.strip() == "runpy":
+            modules = {}
+        else:
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+def loaded_modules(report: str) -> List[str]:
+    return [
+        line.split("|")[-1].strip() for line in report.splitlines()
+        if line.startswith("import time:") and "|" in line
+    ]
+
+def prepare(home: str) -> None:
+    """Creates and validates the .leetsolver files (and the bytecode cache) of `home`."""
+    run(("due",), home)
+    conn = sqlite3.connect(str(Path(home) / ".leetsolver" / "database.db"))
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO questions (question_id, name, difficulty) VALUES (?, 'Two Sum', 'Easy');",
+            (QUESTION_ID,))
+    conn.close()
+
+def check(command: Tuple[str, ...], home: str, budget: float, repeat: int) -> Tuple[Optional[float], List[str]]:
+    """
+    Runs a command `repeat` times.
+
+    Returns:
+        Tuple: (fastest import time in ms, None if it loaded a heavy module, failures)
+    """
+    name = " ".join(command)
+    timings = []
+    for _ in range(repeat):
+        report = run(command, home)
+        heavy = sorted({module.split(".")[0] for module in loaded_modules(report)} & set(FORBIDDEN))
+        if heavy:
+            return None, [f"{name}: imports {', '.join(heavy)}"]
+        timings.append(sum(parse_report(report).values()) / 1000)
+    # the fastest run is the one least disturbed by the rest of the machine
+    fastest = min(timings)
+    if fastest > budget:
+        return fastest, [f"{name}: {fastest:.1f} ms over the {budget:.0f} ms budget"]
+    return fastest, []
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="LeetSolver import time budget")
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help="milliseconds per command")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as home:
+        prepare(home)
+        for command in COMMANDS:
+            fastest, failed = check(command, home, args.budget, args.repeat)
+            if fastest is not None:
+                print(f"{' '.join(command):<28} {fastest:8.1f} ms")
+            failures += failed
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,157 @@
-from LeetSolver.initapp import init
-# from LeetSolver.frontend import ui
-# from LeetSolver.backend import logic
+from LeetSolver.initapp import init, load_settings
+# curses, numpy and the frontend are imported by the commands needing them, so the
+# non interactive commands (log, stats, due, search) start without loading them
+from pathlib import Path
+import argparse
+import json
 
-def main():
-    backend = init()
+def rebuild_summary(backend, args: argparse.Namespace) -> None:
+    backend.rebuild_weekly_summary()
+
+def import_history(backend, args: argparse.Namespace) -> None:
+    from LeetSolver.backend.importer import import_submissions
+    stats = import_submissions(backend, args.file, batch_size=args.batch_size)
+    print(
+        f"imported {stats['imported']} submissions, {stats['duplicate']} already imported, "
+        f"skipped {stats['skipped']}"
+    )
+    if stats["imported"]:
+        # `due` ranks by the stored scores
+        from LeetSolver.backend.scoring import rescore as rescore_questions
+        rescore_questions(backend)
+
+def search(backend, args: argparse.Namespace) -> None:
+    from LeetSolver.backend.search import QuestionSearch
+    for row in QuestionSearch(backend, limit=args.limit).search(" ".join(args.text)):
+        print(f"{row['question_id']:<32} {row['difficulty'] or '-':<6} {row['name']}")
+
+def log(backend, args: argparse.Namespace) -> None:
+    if backend.get_question(args.question_id) is None:
+        raise SystemExit(f"unknown question '{args.question_id}'")
+    backend.log_solve(
+        args.question_id, date=args.date, time_taken=args.time_taken,
+        success=not args.failed, revision_status=args.revision
+    )
+    print(f"logged {args.question_id}")
+
+def stats(backend, args: argparse.Namespace) -> None:
+    from LeetSolver.backend.streaks import StreakEngine
+    streaks = StreakEngine(backend)
+    streaks.refresh()
+    totals = backend.question_totals()
+    week = backend.weekly_summary(1)
+    result = {
+        "questions": totals["questions"],
+        "solved": totals["solved"],
+        "solves": totals["solves"],
+        "current_streak": streaks.current_streak(),
+        "longest_streak": streaks.longest_streak,
+        "this_week": dict(week[0]) if week else None,
+    }
+    if args.json:
+        print(json.dumps(result))
+        return
+    for name, value in result.items():
+        if isinstance(value, dict):
+            value = ", ".join(f"{key} {count}" for key, count in value.items())
+        print(f"{name.replace('_', ' '):<16} {value}")
+
+def due(backend, args: argparse.Namespace) -> None:
+    # stored scores are as fresh as the last rescore: the TUI rescores on start and
+    # after writing solves, `import` after adding some, `log` does not (no numpy here)
+    for row in backend.stored_due_questions(args.limit):
+        print(f"{row['question_id']:<32} {row['magic_score']:>6.2f} {row['difficulty'] or '-':<6} {row['name']}")
+
+def rescore(backend, args: argparse.Namespace) -> None:
+    from LeetSolver.backend.scoring import rescore as rescore_questions
+    question_ids, _ = rescore_questions(backend)
+    print(f"rescored {len(question_ids)} questions")
+
+def backup(backend, args: argparse.Namespace) -> None:
+    from LeetSolver.backup import list_backups
+    if not args.list:
+        print(f"saved {backend.backup(keep=args.keep)}")
+    for snapshot in list_backups(backend.backup_dir):
+        print(snapshot.name)
+
+def restore(backend, args: argparse.Namespace) -> None:
+    from LeetSolver.backup import list_backups
+    snapshots = list_backups(backend.backup_dir)
+    snapshot = args.snapshot or (snapshots[0] if snapshots else None)
+    if snapshot is None:
+        raise SystemExit("no backup to restore")
+    if not snapshot.is_file():
+        snapshot = backend.backup_dir / snapshot
+    backend.restore(snapshot)
+    print(f"restored {snapshot.name}")
+
+def run_ui(backend, args: argparse.Namespace) -> None:
+    from LeetSolver.frontend.ui_controller import UIController
+    settings = load_settings(backend)
+    ui_data = {"logoid": settings.get("logoid"), "cache_dir": Path(backend.settings).parent}
+    UIController(ui_data, backend=backend, settings=settings).mainloop()
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="LeetSolver")
+    parser.add_argument(
+        "--revalidate", action="store_true",
+        help="ignore cached fingerprints and fully validate the .leetsolver files"
+    )
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser(
+        "rebuild-summary", help="recompute weekly_summary from the whole daily_log"
+    ).set_defaults(handler=rebuild_summary)
+    
+    import_parser = commands.add_parser(
+        "import", help="import a submission history export (.jsonl or .csv)"
+    )
+    import_parser.add_argument("file", type=Path)
+    import_parser.add_argument("--batch-size", type=int, default=10_000)
+    import_parser.set_defaults(handler=import_history)
+    
+    search_parser = commands.add_parser(
+        "search", help="full-text search over question names, tags and notes"
+    )
+    search_parser.add_argument("text", nargs="+")
+    search_parser.add_argument("--limit", type=int, default=20)
+    search_parser.set_defaults(handler=search)
+    
+    log_parser = commands.add_parser("log", help="log one solve of a question")
+    log_parser.add_argument("question_id")
+    log_parser.add_argument("--time-taken", type=int, help="minutes spent")
+    log_parser.add_argument("--failed", action="store_true", help="the attempt did not succeed")
+    log_parser.add_argument("--revision", action="store_true", help="the solve was a revision")
+    log_parser.add_argument("--date", help="YYYY-MM-DD, today by default")
+    log_parser.set_defaults(handler=log)
+    
+    stats_parser = commands.add_parser("stats", help="totals, streaks and this week's solves")
+    stats_parser.add_argument("--json", action="store_true")
+    stats_parser.set_defaults(handler=stats)
+    
+    due_parser = commands.add_parser("due", help="questions due for revision, by the scores of the last rescore (run by the TUI and import)")
+    due_parser.add_argument("--limit", type=int, default=10)
+    due_parser.set_defaults(handler=due)
+    
+    commands.add_parser(
+        "rescore", help="recompute the magic_score of every question"
+    ).set_defaults(handler=rescore)
+    
+    backup_parser = commands.add_parser("backup", help="snapshot the database into .leetsolver/backups")
+    backup_parser.add_argument("--keep", type=int, help="snapshots kept, 5 by default")
+    backup_parser.add_argument("--list", action="store_true", help="only list the snapshots")
+    backup_parser.set_defaults(handler=backup)
+    
+    restore_parser = commands.add_parser("restore", help="replace the database with a snapshot")
+    restore_parser.add_argument("snapshot", type=Path, nargs="?", help="file name or path, the newest by default")
+    restore_parser.set_defaults(handler=restore)
+    parser.set_defaults(handler=run_ui)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    backend = init(revalidate=args.revalidate)
+    
+    args.handler(backend, args)
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
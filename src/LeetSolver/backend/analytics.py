@@ -0,0 +1,113 @@
+from LeetSolver.backend.database import Database
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import threading
+
+# tables each insight reads, a cached result is reused until one of them is written to
+DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "weekly_summary": ("daily_log", "questions"),
+    "difficulty_trend": ("daily_log", "questions"),
+    "time_distribution": ("daily_log",),
+    "tag_stats": ("daily_log", "question_tags"),
+}
+
+
+class AnalyticsCache:
+    """
+    In memory LRU of query results keyed by (query name, parameters).
+
+    Every entry remembers the `change_counter` versions of the tables it was
+    computed from. A lookup reads the current versions (one small query) and
+    only recomputes entries whose tables were written since, so after logging
+    one solve the per-tag stats are recomputed but nothing that only reads
+    untouched tables is.
+    """
+
+    def __init__(self, db: Database, maxsize: int = 128) -> None:
+        self.db = db
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__entries: "OrderedDict[Hashable, Tuple[Tuple[int, ...], Any]]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(
+        self,
+        name: str,
+        params: Tuple,
+        depends: Tuple[str, ...],
+        compute: Callable[[], Any],
+        versions: Optional[Dict[str, int]] = None
+    ) -> Any:
+        """
+        The cached result of `name(*params)`, computed with `compute()` if missing
+        or if one of the `depends` tables changed since it was stored.
+        """
+        versions = self.db.change_versions() if versions is None else versions
+        current = tuple(versions.get(table, 0) for table in depends)
+        key = (name, params)
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] == current:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        result = compute()
+        with self.__lock:
+            self.__entries[key] = (current, result)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+
+class Insights:
+    """
+    The aggregates behind the stats screens, served through an `AnalyticsCache`.
+    Methods take the same arguments as the `Database` queries of the same name.
+    """
+
+    def __init__(self, db: Database, cache: Optional[AnalyticsCache] = None) -> None:
+        self.db = db
+        self.cache = cache or AnalyticsCache(db)
+
+    def __query(self, name: str, *params: Any) -> Any:
+        return self.cache.get(
+            name, params, DEPENDENCIES[name], lambda: getattr(self.db, name)(*params)
+        )
+
+    def weekly_summary(self, limit: int = 52):
+        return self.__query("weekly_summary", limit)
+
+    def difficulty_trend(self, since: Optional[str] = None):
+        return self.__query("difficulty_trend", since)
+
+    def time_distribution(self, bucket: int = 10, since: Optional[str] = None):
+        return self.__query("time_distribution", bucket, since)
+
+    def tag_stats(self, since: Optional[str] = None):
+        return self.__query("tag_stats", since)
+
+    def dashboard(self, since: Optional[str] = None) -> Dict[str, Any]:
+        """Every insight of the stats screen, reading the change counters once."""
+        versions = self.db.change_versions()
+        return {
+            name: self.cache.get(
+                name, params, DEPENDENCIES[name],
+                lambda name=name, params=params: getattr(self.db, name)(*params),
+                versions
+            )
+            for name, params in (
+                ("weekly_summary", (52,)),
+                ("difficulty_trend", (since,)),
+                ("time_distribution", (10, since)),
+                ("tag_stats", (since,)),
+            )
+        }
\ No newline at end of file
@@ -0,0 +1,605 @@
+from LeetSolver.error import DatabaseConnectionError
+from LeetSolver.connection import LOCK_STATS, connect
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from contextlib import contextmanager
+from pathlib import Path
+import threading
+import datetime
+import sqlite3
+import re
+
+# every connection is tuned once when it is opened
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL;",
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA temp_store = MEMORY;",
+)
+
+# a question is due for revision once its magic_score reaches this,
+# see `backend.scoring` for how the score is computed
+DUE_THRESHOLD = 1.0
+
+# Every statement the backend runs lives here. sqlite3 keeps the compiled form
+# of a statement in a per connection cache keyed by its text, so reusing these
+# exact strings means each one is prepared only once per connection.
+STATEMENTS = {
+    "upsert_question": (
+        "INSERT INTO questions (question_id, name, difficulty, tags, notes) "
+        "VALUES (:question_id, :name, :difficulty, :tags, :notes) "
+        "ON CONFLICT(question_id) DO UPDATE SET "
+        "name = excluded.name, "
+        "difficulty = COALESCE(excluded.difficulty, difficulty), "
+        "tags = COALESCE(excluded.tags, tags), "
+        "notes = COALESCE(excluded.notes, notes);"
+    ),
+    "get_question": "SELECT * FROM questions WHERE question_id = ?;",
+    "set_question_tags": "UPDATE questions SET tags = ? WHERE question_id = ?;",
+    "insert_tag": "INSERT INTO tags (name) VALUES (?) ON CONFLICT(name) DO NOTHING;",
+    "clear_question_tags": "DELETE FROM question_tags WHERE question_id = ?;",
+    "link_question_tag": (
+        "INSERT OR IGNORE INTO question_tags (question_id, tag_id) "
+        "SELECT ?, tag_id FROM tags WHERE name = ?;"
+    ),
+    "questions_with_tag": (
+        "SELECT q.* FROM tags AS t "
+        "JOIN question_tags AS qt ON qt.tag_id = t.tag_id "
+        "JOIN questions AS q ON q.question_id = qt.question_id "
+        "WHERE t.name = ? ORDER BY qt.question_id;"
+    ),
+    # one GROUP BY over the junction, every daily_log lookup is served by the
+    # covering idx_daily_log_question_date (question_id, date, success, time_taken)
+    "tag_stats": (
+        "SELECT t.name AS tag, COUNT(DISTINCT qt.question_id) AS questions, "
+        "COUNT(l.question_id) AS attempts, IFNULL(SUM(l.success), 0) AS solved, "
+        "AVG(l.time_taken) AS avg_time_taken, AVG(l.success) AS success_rate "
+        "FROM tags AS t "
+        "JOIN question_tags AS qt ON qt.tag_id = t.tag_id "
+        "LEFT JOIN daily_log AS l ON l.question_id = qt.question_id AND l.date >= ? "
+        "GROUP BY t.tag_id "
+        "ORDER BY success_rate IS NULL, success_rate, attempts DESC;"
+    ),
+    "insert_log": (
+        "INSERT INTO daily_log (date, question_id, time_taken, success, revision_status) "
+        "VALUES (:date, :question_id, :time_taken, :success, :revision_status);"
+    ),
+    "touch_question": (
+        "UPDATE questions SET "
+        "first_solved = CASE WHEN :success THEN MIN(COALESCE(first_solved, :date), :date) ELSE first_solved END, "
+        "last_solved = CASE WHEN :success THEN MAX(COALESCE(last_solved, :date), :date) ELSE last_solved END, "
+        "total_solved = COALESCE(total_solved, 0) + :success "
+        "WHERE question_id = :question_id;"
+    ),
+    "scoring_columns": (
+        "SELECT question_id, julianday(?) - julianday(last_solved), total_solved, "
+        "personal_rating, best_rating, current_rating FROM questions;"
+    ),
+    "store_magic_score": "UPDATE questions SET magic_score = ? WHERE question_id = ?;",
+    # a range scan of idx_questions_magic_score from the top
+    "stored_due_questions": (
+        "SELECT question_id, name, difficulty, magic_score FROM questions "
+        "WHERE magic_score >= ? ORDER BY magic_score DESC, question_id DESC LIMIT ?;"
+    ),
+    "question_totals": (
+        "SELECT COUNT(*) AS questions, IFNULL(SUM(total_solved > 0), 0) AS solved, "
+        "(SELECT IFNULL(SUM(total_questions), 0) FROM weekly_summary) AS solves "
+        "FROM questions;"
+    ),
+    # the per submission totals come from the rows `import_log` really added, see `Database.import_solves`
+    "import_question": (
+        "INSERT INTO questions (question_id, name, difficulty) "
+        "VALUES (:question_id, COALESCE(:name, :question_id), :difficulty) "
+        "ON CONFLICT(question_id) DO UPDATE SET "
+        "name = COALESCE(:name, name), "
+        "difficulty = COALESCE(excluded.difficulty, difficulty) "
+        # an unchanged question is not written, its full-text entry is not redone
+        "WHERE name IS NOT COALESCE(:name, name) "
+        "OR difficulty IS NOT COALESCE(excluded.difficulty, difficulty);"
+    ),
+    # submissions already imported hit idx_daily_log_submission and are skipped
+    "import_log": (
+        "INSERT OR IGNORE INTO daily_log (date, question_id, time_taken, success, revision_status, solved_at) "
+        "VALUES (:date, :question_id, :time_taken, :success, :revision_status, :solved_at);"
+    ),
+    "import_totals": (
+        "UPDATE questions SET "
+        "first_solved = MIN(COALESCE(questions.first_solved, n.first), n.first), "
+        "last_solved = MAX(COALESCE(questions.last_solved, n.last), n.last), "
+        "total_solved = COALESCE(questions.total_solved, 0) + n.solves "
+        "FROM (SELECT question_id, MIN(date) AS first, MAX(date) AS last, COUNT(*) AS solves "
+        "FROM daily_log WHERE id > ? AND success GROUP BY question_id) AS n "
+        "WHERE questions.question_id = n.question_id;"
+    ),
+    # what trg_weekly_summary_insert does for the rows it skips (imported ones, with
+    # a solved_at), for every such row above an id at once
+    "import_weekly_summary": (
+        "INSERT INTO weekly_summary (week_start, total_questions, easy_count, medium_count, hard_count) "
+        "SELECT date(l.date, 'weekday 0', '-6 days') AS week, COUNT(*), "
+        "IFNULL(SUM(q.difficulty = 'Easy'), 0), "
+        "IFNULL(SUM(q.difficulty = 'Medium'), 0), "
+        "IFNULL(SUM(q.difficulty = 'Hard'), 0) "
+        "FROM daily_log AS l LEFT JOIN questions AS q ON q.question_id = l.question_id "
+        "WHERE l.id > ? AND l.solved_at IS NOT NULL AND l.success GROUP BY week "
+        "ON CONFLICT(week_start) DO UPDATE SET "
+        "total_questions = total_questions + excluded.total_questions, "
+        "easy_count = easy_count + excluded.easy_count, "
+        "medium_count = medium_count + excluded.medium_count, "
+        "hard_count = hard_count + excluded.hard_count;"
+    ),
+    # what trg_change_daily_log_insert does for the rows it skips, one bump per row
+    "import_change_counter": (
+        "INSERT INTO change_counter (table_name, version) "
+        "SELECT 'daily_log', COUNT(*) FROM daily_log WHERE id > ? AND solved_at IS NOT NULL "
+        "ON CONFLICT(table_name) DO UPDATE SET version = version + excluded.version;"
+    ),
+    "journal_position": "SELECT last_seq FROM journal_state WHERE journal = ?;",
+    "set_journal_position": (
+        "INSERT INTO journal_state (journal, last_seq) VALUES (?, ?) "
+        "ON CONFLICT(journal) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq);"
+    ),
+    "logs_between": (
+        "SELECT * FROM daily_log WHERE date BETWEEN ? AND ? ORDER BY date, id;"
+    ),
+    "weekly_summary": (
+        "SELECT * FROM weekly_summary ORDER BY week_start DESC LIMIT ?;"
+    ),
+    "clear_weekly_summary": "DELETE FROM weekly_summary;",
+    "change_versions": "SELECT table_name, version FROM change_counter;",
+    "max_log_id": "SELECT IFNULL(MAX(id), 0) FROM daily_log;",
+    # ordered scan of the covering idx_daily_log_date, no sorting
+    "daily_counts": "SELECT date, COUNT(*) FROM daily_log WHERE id <= ? GROUP BY date ORDER BY date;",
+    "daily_counts_between_ids": (
+        "SELECT date, COUNT(*) FROM daily_log WHERE id > ? AND id <= ? GROUP BY date;"
+    ),
+    "difficulty_trend": (
+        "SELECT week_start, easy_count, medium_count, hard_count FROM weekly_summary "
+        "WHERE week_start >= ? ORDER BY week_start;"
+    ),
+    "time_distribution": (
+        "SELECT time_taken / :bucket * :bucket AS bucket, COUNT(*) AS solves "
+        "FROM daily_log WHERE time_taken IS NOT NULL AND date >= :since "
+        "GROUP BY bucket ORDER BY bucket;"
+    ),
+    # bm25 weights: a hit in the name counts more than in the tags, more than in the notes.
+    # the best rows are picked inside the full-text index, only those are joined
+    "search_questions": (
+        "SELECT q.question_id, q.name, q.difficulty, q.tags, hit.score AS rank "
+        "FROM (SELECT rowid, bm25(questions_fts, 10.0, 5.0, 1.0) AS score FROM questions_fts "
+        "WHERE questions_fts MATCH ? ORDER BY score LIMIT ?) AS hit "
+        "JOIN questions AS q ON q.rowid = hit.rowid ORDER BY hit.score;"
+    ),
+    "rebuild_weekly_summary": (
+        "INSERT INTO weekly_summary (week_start, total_questions, easy_count, medium_count, hard_count) "
+        "SELECT date(l.date, 'weekday 0', '-6 days') AS week, COUNT(*), "
+        "IFNULL(SUM(q.difficulty = 'Easy'), 0), "
+        "IFNULL(SUM(q.difficulty = 'Medium'), 0), "
+        "IFNULL(SUM(q.difficulty = 'Hard'), 0) "
+        "FROM daily_log AS l LEFT JOIN questions AS q ON q.question_id = l.question_id "
+        "WHERE l.success GROUP BY week;"
+    ),
+}
+
+# Keyset pagination of the question list: a page continues from the (sort value,
+# question_id) of the last row shown, so every page is one index range scan of
+# `LIMIT` rows whatever its position (no OFFSET). Rows whose sort value is NULL
+# sort first and are paged by question_id alone. {col} is one of PAGE_SORTS.
+PAGE_SORTS = ("question_id", "difficulty", "last_solved", "magic_score")
+__PAGE_COLUMNS = (
+    "SELECT question_id, name, difficulty, last_solved, total_solved, magic_score, "
+    "tags, substr(notes, 1, 200) AS notes FROM questions "
+)
+__PAGE_STATEMENTS = {
+    "first": "WHERE {col} IS NOT NULL ORDER BY {col}, question_id LIMIT ?;",
+    "last": "WHERE {col} IS NOT NULL ORDER BY {col} DESC, question_id DESC LIMIT ?;",
+    "after": "WHERE ({col}, question_id) > (?, ?) ORDER BY {col}, question_id LIMIT ?;",
+    "before": "WHERE ({col}, question_id) < (?, ?) ORDER BY {col} DESC, question_id DESC LIMIT ?;",
+    "null_first": "WHERE {col} IS NULL ORDER BY question_id LIMIT ?;",
+    "null_last": "WHERE {col} IS NULL ORDER BY question_id DESC LIMIT ?;",
+    "null_after": "WHERE {col} IS NULL AND question_id > ? ORDER BY question_id LIMIT ?;",
+    "null_before": "WHERE {col} IS NULL AND question_id < ? ORDER BY question_id DESC LIMIT ?;",
+}
+STATEMENTS.update({
+    f"page_{col}_{name}": __PAGE_COLUMNS + where.format(col=col)
+    for col in PAGE_SORTS for name, where in __PAGE_STATEMENTS.items()
+})
+
+# (sort value, question_id) of a row, where a page starts or ends
+PageKey = Tuple[Any, str]
+
+
+def split_tags(tags: Optional[str]) -> List[str]:
+    """Splits a `questions.tags` string ("Array, two pointers; DP") into unique lowercase tag names."""
+    names = (name.strip().lower() for name in re.split(r"[,;]", tags or ""))
+    return list(dict.fromkeys(name for name in names if name))
+
+def sync_question_tags(conn: Union[sqlite3.Connection, sqlite3.Cursor], questions: Iterable[Tuple[str, Optional[str]]]) -> None:
+    """
+    Replaces the `question_tags` rows of each (question_id, tags string) with the
+    split tags, creating missing `tags`. Runs in the caller's transaction.
+    """
+    questions = list(questions)
+    conn.executemany(STATEMENTS["clear_question_tags"], ((question_id,) for question_id, _ in questions))
+    links = [(question_id, name) for question_id, tags in questions for name in split_tags(tags)]
+    conn.executemany(STATEMENTS["insert_tag"], ((name,) for _, name in links))
+    conn.executemany(STATEMENTS["link_question_tag"], links)
+
+def make_log_event(
+    question_id: str,
+    date: Optional[str] = None,
+    time_taken: Optional[int] = None,
+    success: bool = True,
+    revision_status: bool = False
+) -> Dict[str, Any]:
+    """
+    Builds the parameter dict used by the `insert_log` and `touch_question` statements.
+    """
+    return {
+        "question_id": question_id,
+        "date": date or datetime.date.today().isoformat(),
+        "time_taken": time_taken,
+        "success": int(bool(success)),
+        "revision_status": int(bool(revision_status)),
+    }
+
+class Database:
+    """
+    Data access object for the LeetSolver database.
+
+    Holds the paths of the validated `.leetsolver` files and a small thread local
+    pool of long lived sqlite3 connections (one per thread, opened on first use)
+    in WAL mode, so readers never block the writer and a commit costs no fsync
+    of the main database file.
+
+    Writes are grouped with `transaction()`, nested calls join the outer
+    transaction so a batch of solves is committed once. Connections come from
+    `connection.connect`, so other processes writing to the same file are waited
+    for with backoff instead of failing.
+    """
+
+    def __init__(self, settings: Optional[Path] = None, database: Optional[Path] = None) -> None:
+        self.settings = settings
+        self.database = database
+        self.__local = threading.local()
+        self.__connections: List[sqlite3.Connection] = []
+        self.__lock = threading.Lock()
+
+    def __connect(self) -> sqlite3.Connection:
+        try:
+            # isolation_level=None: transactions are handled by `transaction()`
+            # check_same_thread=False: only so `close()` can close every connection
+            conn = connect(
+                self.database, isolation_level=None,
+                check_same_thread=False, cached_statements=max(128, len(STATEMENTS) * 2)
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+        except sqlite3.Error as e:
+            raise DatabaseConnectionError(str(self.database), cause=e)
+
+        with self.__lock:
+            self.__connections.append(conn)
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The connection owned by the calling thread."""
+        conn = getattr(self.__local, "conn", None)
+        if conn is None:
+            conn = self.__local.conn = self.__connect()
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Runs the block in a single transaction, committing on success and
+        rolling back on error. If a transaction is already open it is joined.
+
+        The write lock is taken when the transaction starts (`BEGIN IMMEDIATE`,
+        waiting for other writers with backoff), so its writes never fail half way
+        on a lock. `immediate=False` is for blocks that only read a consistent snapshot.
+        """
+        conn = self.conn
+        if conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute("BEGIN IMMEDIATE;" if immediate else "BEGIN;")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK;")
+            raise
+        conn.execute("COMMIT;")
+
+    def close(self) -> None:
+        """Closes every pooled connection."""
+        with self.__lock:
+            connections, self.__connections = self.__connections, []
+        for conn in connections:
+            conn.close()
+        self.__local = threading.local()
+
+    # questions
+    def add_question(
+        self,
+        question_id: str,
+        name: str,
+        difficulty: Optional[str] = None,
+        tags: Optional[str] = None,
+        notes: Optional[str] = None
+    ) -> None:
+        self.add_questions([{
+            "question_id": question_id, "name": name,
+            "difficulty": difficulty, "tags": tags, "notes": notes
+        }])
+
+    def add_questions(self, questions: Iterable[Dict[str, Any]]) -> None:
+        """
+        Inserts or updates many questions with one `executemany`. Questions given
+        with `tags` also get their `question_tags` rows replaced.
+        """
+        questions = list(questions)
+        with self.transaction() as conn:
+            conn.executemany(STATEMENTS["upsert_question"], questions)
+            sync_question_tags(conn, (
+                (question["question_id"], question["tags"])
+                for question in questions if question.get("tags") is not None
+            ))
+
+    def set_question_tags(self, question_id: str, tags: Iterable[str]) -> None:
+        """Replaces the tags of a question, both the `tags` text and the junction rows."""
+        text = ", ".join(split_tags(",".join(tags)))
+        with self.transaction() as conn:
+            conn.execute(STATEMENTS["set_question_tags"], (text, question_id))
+            sync_question_tags(conn, [(question_id, text)])
+
+    def questions_with_tag(self, tag: str) -> List[sqlite3.Row]:
+        return self.conn.execute(STATEMENTS["questions_with_tag"], (tag.strip().lower(),)).fetchall()
+
+    def tag_stats(self, since: Optional[str] = None) -> List[sqlite3.Row]:
+        """
+        Per tag: number of `questions`, `attempts` and `solved` logs, `avg_time_taken`
+        and `success_rate` (None without attempts), counting logs from `since` (a date)
+        on. Weakest tags (lowest success rate) first.
+        """
+        return self.conn.execute(STATEMENTS["tag_stats"], (since or "",)).fetchall()
+
+    def get_question(self, question_id: str) -> Optional[sqlite3.Row]:
+        return self.conn.execute(STATEMENTS["get_question"], (question_id,)).fetchone()
+
+    def questions_page(
+        self,
+        sort: str = "question_id",
+        key: Optional[PageKey] = None,
+        forward: bool = True,
+        limit: int = 50,
+        descending: bool = False
+    ) -> List[sqlite3.Row]:
+        """
+        One page of the question list ordered by (`sort`, question_id), NULL values first
+        (last when `descending`), using keyset pagination.
+
+        Args:
+            sort (str): One of PAGE_SORTS, each is served by an index ending in question_id.
+            key (Optional[PageKey]): (sort value, question_id) of the row the page continues
+                from, None starts from the top (`forward`) or the bottom of the list.
+            forward (bool): Rows after `key` in list order, else the rows before it.
+            limit (int): Maximum number of rows.
+            descending (bool): List order is descending.
+
+        Returns:
+            List[sqlite3.Row]: The rows in list order, at most `limit`.
+        """
+        if sort not in PAGE_SORTS:
+            raise ValueError(f"cannot page questions by '{sort}'")
+
+        # a descending list read forward is the ascending order read backward
+        ascending = forward != descending
+        if key is None:
+            segments = [("null_first", ()), ("first", ())] if ascending else [("last", ()), ("null_last", ())]
+        elif key[0] is None:
+            segments = [("null_after", (key[1],)), ("first", ())] if ascending else [("null_before", (key[1],))]
+        else:
+            segments = [("after", key)] if ascending else [("before", key), ("null_last", ())]
+
+        rows: List[sqlite3.Row] = []
+        for name, params in segments:
+            if len(rows) >= limit:
+                break
+            rows += self.conn.execute(
+                STATEMENTS[f"page_{sort}_{name}"], (*params, limit - len(rows))
+            ).fetchall()
+        return rows if forward else rows[::-1]
+
+    def search_questions(self, match: str, limit: int = 20) -> List[sqlite3.Row]:
+        """
+        Questions whose name, tags or notes match an FTS5 query, best first (BM25).
+        See `backend.search` to build the query from typed text.
+        """
+        return self.conn.execute(STATEMENTS["search_questions"], (match, limit)).fetchall()
+
+    def scoring_columns(self, today: str) -> List[Tuple]:
+        """
+        Plain tuples of (question_id, days since last solve, total_solved,
+        personal_rating, best_rating, current_rating) for every question.
+        """
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        return cursor.execute(STATEMENTS["scoring_columns"], (today,)).fetchall()
+
+    def store_magic_scores(self, scores: Iterable[Tuple[float, str]]) -> None:
+        """Writes (magic_score, question_id) pairs with one `executemany`."""
+        with self.transaction() as conn:
+            conn.executemany(STATEMENTS["store_magic_score"], scores)
+
+    def stored_due_questions(self, limit: int = 10, threshold: float = DUE_THRESHOLD) -> List[sqlite3.Row]:
+        """
+        Due questions by the `magic_score` stored at the last rescore, most overdue
+        first. Reads the score index only, see `scoring.due_questions` for fresh scores.
+        """
+        return self.conn.execute(STATEMENTS["stored_due_questions"], (threshold, limit)).fetchall()
+
+    def question_totals(self) -> sqlite3.Row:
+        """
+        Number of questions, of solved questions and of successful solves logged
+        (from `weekly_summary`, failed attempts are not counted).
+        """
+        return self.conn.execute(STATEMENTS["question_totals"]).fetchone()
+
+    # daily log
+    def log_solve(self, question_id: str, **kw) -> None:
+        """
+        Logs one solve of a question, see `make_log_event` for the accepted keywords.
+        """
+        self.log_solves([make_log_event(question_id, **kw)])
+
+    def log_solves(self, events: Iterable[Dict[str, Any]]) -> None:
+        """
+        Logs many solves (dicts built by `make_log_event`) in one transaction,
+        adding the `daily_log` rows and updating the solved questions.
+        """
+        events = list(events)
+        with self.transaction() as conn:
+            conn.executemany(STATEMENTS["insert_log"], events)
+            conn.executemany(STATEMENTS["touch_question"], events)
+
+    def import_solves(self, questions: Iterable[Dict[str, Any]], events: Iterable[Dict[str, Any]]) -> int:
+        """
+        Used by the bulk importer, in one transaction upserts the name and difficulty
+        of the questions of a batch, then adds the `daily_log` rows (dicts built by
+        `make_log_event` plus the `solved_at` of the submission).
+
+        A submission already in the log (same `question_id` and `solved_at`) is skipped,
+        so importing an export again, or retrying an interrupted import, adds nothing
+        twice. The totals of `questions`, `weekly_summary` and the change counter are
+        updated from the rows really added with one statement each, the per row
+        triggers skip rows with a `solved_at` (submissions without a date are
+        counted by them). The schema is never changed, so other connections keep
+        their prepared statements and the startup fingerprint stays valid.
+
+        Returns:
+            int: The number of rows added.
+        """
+        with self.transaction() as conn:
+            conn.executemany(STATEMENTS["import_question"], questions)
+            start = conn.execute(STATEMENTS["max_log_id"]).fetchone()[0]
+            added = conn.executemany(STATEMENTS["import_log"], events).rowcount
+            if added:
+                for statement in ("import_totals", "import_weekly_summary", "import_change_counter"):
+                    conn.execute(STATEMENTS[statement], (start,))
+        return added
+
+    def journal_position(self, journal: str) -> int:
+        """Sequence number of the last entry of a write-behind journal applied to the database."""
+        row = self.conn.execute(STATEMENTS["journal_position"], (journal,)).fetchone()
+        return row[0] if row else 0
+
+    def apply_journal(self, journal: str, entries: Iterable[Tuple[int, Dict[str, Any]]]) -> Tuple[int, int]:
+        """
+        Logs the (seq, event) entries of a write-behind journal newer than its recorded
+        position and records the highest one as applied, in one transaction. The
+        position is read under the write lock, so a journal replayed after a crash, or
+        flushed by two processes at once, never logs an entry twice.
+
+        Returns:
+            Tuple: (number of entries logged, position of the journal afterwards)
+        """
+        with self.transaction() as conn:
+            applied = self.journal_position(journal)
+            batch = [(seq, event) for seq, event in entries if seq > applied]
+            if batch:
+                self.log_solves(event for _, event in batch)
+                applied = max(seq for seq, _ in batch)
+                conn.execute(STATEMENTS["set_journal_position"], (journal, applied))
+        return len(batch), applied
+
+    def logs_between(self, start: str, end: str) -> List[sqlite3.Row]:
+        return self.conn.execute(STATEMENTS["logs_between"], (start, end)).fetchall()
+
+    # weekly summary
+    def weekly_summary(self, limit: int = 52) -> List[sqlite3.Row]:
+        """
+        Successful solves per week (in total and per difficulty), latest weeks first.
+        The table is kept up to date by the `daily_log` triggers declared in the
+        schema, so this never aggregates the log itself.
+        """
+        return self.conn.execute(STATEMENTS["weekly_summary"], (limit,)).fetchall()
+
+    def rebuild_weekly_summary(self) -> None:
+        """
+        Recomputes `weekly_summary` from the whole `daily_log` in a single pass,
+        for databases logged before the triggers existed or after difficulty edits.
+        """
+        with self.transaction() as conn:
+            conn.execute(STATEMENTS["clear_weekly_summary"])
+            conn.execute(STATEMENTS["rebuild_weekly_summary"])
+
+    def difficulty_trend(self, since: Optional[str] = None) -> List[sqlite3.Row]:
+        """Solves per difficulty for every week starting on or after `since`, oldest first."""
+        return self.conn.execute(STATEMENTS["difficulty_trend"], (since or "",)).fetchall()
+
+    def time_distribution(self, bucket: int = 10, since: Optional[str] = None) -> List[sqlite3.Row]:
+        """Number of logged solves per `bucket` wide time_taken range, from `since` on."""
+        return self.conn.execute(
+            STATEMENTS["time_distribution"], {"bucket": bucket, "since": since or ""}
+        ).fetchall()
+
+    # change tracking
+    def change_versions(self) -> Dict[str, int]:
+        """
+        Write counter of every tracked table, bumped by the `trg_change_*` triggers.
+        A table that was never written to is missing (version 0).
+        """
+        return dict(self.conn.execute(STATEMENTS["change_versions"]).fetchall())
+
+    def daily_counts(self, after_id: int = 0) -> Tuple[int, int, List[Tuple[str, int]]]:
+        """
+        Number of `daily_log` rows per date, only counting rows with an id above
+        `after_id` (0 counts the whole log).
+
+        Returns:
+            Tuple: (highest log id, `daily_log` change version, [(date, count), ...]),
+                read from one snapshot so the three agree.
+        """
+        with self.transaction(immediate=False) as conn:
+            versions = dict(conn.execute(STATEMENTS["change_versions"]).fetchall())
+            last_id = conn.execute(STATEMENTS["max_log_id"]).fetchone()[0]
+            if after_id:
+                rows = conn.execute(STATEMENTS["daily_counts_between_ids"], (after_id, last_id)).fetchall()
+            else:
+                rows = conn.execute(STATEMENTS["daily_counts"], (last_id,)).fetchall()
+        return last_id, versions.get("daily_log", 0), [tuple(row) for row in rows]
+
+    def lock_stats(self) -> Dict[str, Any]:
+        """Lock wait metrics of this process, see `connection.LockStats`."""
+        return LOCK_STATS.snapshot()
+
+    # backups
+    @property
+    def backup_dir(self) -> Path:
+        from LeetSolver.backup import BACKUP_DIR
+        return Path(self.database).parent / BACKUP_DIR
+
+    def backup(self, reason: str = "manual", keep: Optional[int] = None, cancel: Optional[threading.Event] = None) -> Path:
+        """
+        Takes a compressed snapshot of the database into `backup_dir`, see
+        `backup.backup_sqlite_database`. It reads from a connection of its own,
+        so solves keep being logged while it runs (call it off the UI thread).
+        """
+        from LeetSolver.backup import KEEP_BACKUPS, backup_sqlite_database
+        return backup_sqlite_database(
+            self.database, self.backup_dir, reason,
+            keep=KEEP_BACKUPS if keep is None else keep, cancel=cancel
+        )
+
+    def restore(self, snapshot: Path) -> None:
+        """
+        Replaces the database with a snapshot, after taking a snapshot of the
+        current state. Pooled connections are closed first, do not use it while
+        other threads are logging.
+        """
+        from LeetSolver.backup import list_backups, restore_sqlite_database
+        # rotation must not delete the snapshot being restored
+        self.backup("restore", keep=len(list_backups(self.backup_dir)) + 1)
+        self.close()
+        restore_sqlite_database(snapshot, Path(self.database))
\ No newline at end of file
@@ -0,0 +1,151 @@
+from LeetSolver.backend.database import Database, make_log_event
+from LeetSolver.error import LeetSolverError
+from typing import Any, Dict, Iterator, List, Optional
+from itertools import islice
+from pathlib import Path
+import datetime
+import json
+import csv
+
+# accepted column names of a submission record, first match wins
+__FIELD_ALIASES = {
+    "question_id": ("question_id", "titleSlug", "title_slug", "slug"),
+    "name": ("name", "title"),
+    "difficulty": ("difficulty",),
+    "date": ("date", "timestamp"),
+    "time_taken": ("time_taken",),
+    "success": ("success", "status", "statusDisplay", "status_display"),
+    "revision_status": ("revision_status",),
+}
+__SUCCESS_VALUES = frozenset(("1", "true", "yes", "accepted", "ac"))
+__DIFFICULTIES = {"easy": "Easy", "medium": "Medium", "hard": "Hard"}
+
+
+def _field(record: Dict[str, Any], name: str) -> Any:
+    for alias in __FIELD_ALIASES[name]:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+def _parse_date(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) or str(value).isdigit():
+        return datetime.date.fromtimestamp(int(value)).isoformat()
+    return datetime.date.fromisoformat(str(value)[:10]).isoformat()
+
+def _solved_at(value: Any) -> Optional[str]:
+    # the exact time of the submission identifies it, with the question, across imports
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) or str(value).isdigit():
+        return datetime.datetime.fromtimestamp(int(value), datetime.timezone.utc).isoformat()
+    return str(value).strip()
+
+def _parse_bool(value: Any, default: bool) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, (bool, int)):
+        return bool(value)
+    return str(value).strip().lower() in __SUCCESS_VALUES
+
+def parse_submission(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turns one exported submission record into an import event
+    (the `make_log_event` dict plus `name`, `difficulty` and `solved_at`).
+    Raises ValueError if the record has no question id or an unreadable date.
+    """
+    question_id = _field(record, "question_id")
+    if question_id is None:
+        raise ValueError("submission without question id")
+
+    time_taken = _field(record, "time_taken")
+    date = _field(record, "date")
+    event = make_log_event(
+        str(question_id),
+        date=_parse_date(date),
+        time_taken=int(time_taken) if time_taken is not None else None,
+        success=_parse_bool(_field(record, "success"), True),
+        revision_status=_parse_bool(_field(record, "revision_status"), False)
+    )
+    event["name"] = _field(record, "name")
+    event["difficulty"] = __DIFFICULTIES.get(str(_field(record, "difficulty")).strip().lower())
+    event["solved_at"] = _solved_at(date)
+    return event
+
+def summarize_batch(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Folds a batch of import events into one row per question (its name and
+    difficulty), so `questions` is upserted once per question per batch instead
+    of once per submission.
+    """
+    questions: Dict[str, Dict[str, Any]] = {}
+    for event in events:
+        question = questions.get(event["question_id"])
+        if question is None:
+            question = questions[event["question_id"]] = {
+                "question_id": event["question_id"], "name": None, "difficulty": None
+            }
+        question["name"] = event["name"] or question["name"]
+        question["difficulty"] = event["difficulty"] or question["difficulty"]
+    return list(questions.values())
+
+def read_records(export_fp: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the raw records of a JSON lines (`.jsonl`, `.ndjson`) or CSV export,
+    one line at a time so memory use does not depend on the file size.
+    Lines that are not JSON objects are yielded as empty dicts (and later skipped).
+    """
+    suffix = export_fp.suffix.lower()
+    if suffix not in (".jsonl", ".ndjson", ".csv"):
+        raise LeetSolverError(f"Unsupported export format '{suffix}', expected .jsonl or .csv")
+
+    with open(export_fp, "r", encoding="utf-8", newline="") as file:
+        if suffix == ".csv":
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = {}
+            yield record if isinstance(record, dict) else {}
+
+def import_submissions(db: Database, export_fp: Path, batch_size: int = 10_000) -> Dict[str, int]:
+    """
+    Imports a submission history export into `questions` and `daily_log`.
+
+    The export is parsed as a stream and written in batches of `batch_size`
+    submissions, each batch in one transaction with `executemany` (questions are
+    upserted once per batch, see `summarize_batch`), so memory stays flat however
+    large the export is. Submissions already in the database are skipped, an export
+    can be imported again (or an interrupted import retried) without counting twice.
+
+    Returns:
+        Dict: counts of `imported`, `duplicate` (already imported) and `skipped`
+            (unreadable) submissions.
+    """
+    stats = {"imported": 0, "duplicate": 0, "skipped": 0}
+
+    def events() -> Iterator[Dict[str, Any]]:
+        for record in read_records(export_fp):
+            try:
+                yield parse_submission(record)
+            except (ValueError, TypeError, OverflowError, OSError):
+                stats["skipped"] += 1
+
+    try:
+        stream = events()
+        while True:
+            batch = list(islice(stream, batch_size))
+            if not batch:
+                break
+            added = db.import_solves(summarize_batch(batch), batch)
+            stats["imported"] += added
+            stats["duplicate"] += len(batch) - added
+    except OSError as e:
+        raise LeetSolverError(f"Could not read export file '{export_fp}'", cause=e)
+    return stats
@@ -0,0 +1,97 @@
+from LeetSolver.backend.database import Database, DUE_THRESHOLD
+from typing import List, Optional, Tuple
+import datetime
+import numpy as np
+
+# Spaced repetition model
+# ---------------------------------------------------------------------------
+# Every solved question has an expected recall interval (in days) that grows
+# geometrically with the number of solves and linearly with its rating (1..10).
+# The priority (`magic_score`) is how far past that interval the question is:
+#   score = days_since_last_solve / interval * (1 + rating_drop / 10)
+# so a score >= 1 (DUE_THRESHOLD) means the question is due, and questions whose current rating
+# fell below their best rating come back sooner. Never solved questions score 0.
+# ---------------------------------------------------------------------------
+BASE_INTERVAL_DAYS = 1.0
+INTERVAL_GROWTH = 2.0
+MAX_INTERVAL_STEPS = 8
+DEFAULT_RATING = 5.0
+
+
+def compute_scores(
+    elapsed: np.ndarray,
+    total_solved: np.ndarray,
+    personal_rating: np.ndarray,
+    best_rating: np.ndarray,
+    current_rating: np.ndarray
+) -> np.ndarray:
+    """
+    Computes the priority of every question in one vectorized pass.
+    All inputs are float arrays of the same length where NaN means NULL.
+    """
+    rating = np.where(np.isnan(current_rating), personal_rating, current_rating)
+    rating = np.clip(np.nan_to_num(rating, nan=DEFAULT_RATING), 1, 10)
+
+    steps = np.clip(np.nan_to_num(total_solved, nan=0.0), 0, MAX_INTERVAL_STEPS)
+    interval = BASE_INTERVAL_DAYS * INTERVAL_GROWTH ** steps * (rating / DEFAULT_RATING)
+
+    rating_drop = np.clip(np.nan_to_num(best_rating - current_rating, nan=0.0), 0, 9)
+    scores = np.clip(elapsed, 0, None) / interval * (1 + rating_drop / 10)
+    return np.nan_to_num(scores, nan=0.0)
+
+
+def top_n(scores: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the `n` highest scores, highest first. Uses a partial sort so only
+    the selected `n` elements are fully sorted.
+    """
+    if n <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if n < scores.size:
+        selected = np.argpartition(-scores, n - 1)[:n]
+    else:
+        selected = np.arange(scores.size)
+    return selected[np.argsort(-scores[selected], kind="stable")]
+
+
+def load_scores(db: Database, today: Optional[str] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Loads the scoring columns of every question and scores them.
+    Returns the question ids and their scores (same order).
+    """
+    today = today or datetime.date.today().isoformat()
+    rows = db.scoring_columns(today)
+    if not rows:
+        return [], np.empty(0)
+
+    question_ids = [row[0] for row in rows]
+    columns = np.array([row[1:] for row in rows], dtype=float).T
+    return question_ids, compute_scores(*columns)
+
+
+def rescore(db: Database, today: Optional[str] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Recomputes `questions.magic_score` for every question and writes the
+    results back in one transaction. Returns the ids and scores.
+    """
+    question_ids, scores = load_scores(db, today)
+    db.store_magic_scores(zip(scores.tolist(), question_ids))
+    return question_ids, scores
+
+
+def due_questions(
+    db: Database,
+    limit: int = 10,
+    today: Optional[str] = None,
+    store: bool = True
+) -> List[Tuple[str, float]]:
+    """
+    Returns up to `limit` (question_id, score) pairs that are due for revision,
+    most overdue first. With `store=True` the fresh scores are also written back.
+    """
+    question_ids, scores = (rescore if store else load_scores)(db, today)
+    return [
+        (question_ids[index], float(scores[index]))
+        for index in top_n(scores, limit)
+        if scores[index] >= DUE_THRESHOLD
+    ]
@@ -0,0 +1,65 @@
+from LeetSolver.backend.database import Database
+from collections import OrderedDict
+from typing import List
+import sqlite3
+import re
+
+__TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_words(text: str) -> List[str]:
+    return __TOKEN_RE.findall(text.lower())
+
+def fts_query(words: List[str]) -> str:
+    """
+    Builds an FTS5 query from typed words: every word must match and the last one
+    is a prefix, since it may still be being typed. Words are quoted so FTS5
+    operators in the text are searched for literally.
+    """
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+class QuestionSearch:
+    """
+    Search-as-you-type over the questions, one `search(text)` per keystroke.
+
+    - Results of recent queries are kept (LRU), so deleting characters or
+      typing a query again answers without touching the database.
+    - Typing more only narrows the results (every word must match, the last one
+      as a prefix), so once a query matches nothing its extensions are not run.
+    """
+
+    def __init__(self, db: Database, limit: int = 20, cache_size: int = 64) -> None:
+        self.db = db
+        self.limit = limit
+        self.cache_size = cache_size
+        self.__cache: "OrderedDict[str, List[sqlite3.Row]]" = OrderedDict()
+        self.__empty: List[str] = []
+
+    def clear(self) -> None:
+        """Forgets cached results, call it after questions were added or edited."""
+        self.__cache.clear()
+        self.__empty = []
+
+    def search(self, text: str) -> List[sqlite3.Row]:
+        words = search_words(text)
+        if not words:
+            return []
+
+        key = " ".join(words)
+        results = self.__cache.get(key)
+        if results is not None:
+            self.__cache.move_to_end(key)
+            return results
+
+        if any(key.startswith(empty) for empty in self.__empty):
+            results = []
+        else:
+            results = self.db.search_questions(fts_query(words), self.limit)
+            if not results:
+                self.__empty.append(key)
+
+        self.__cache[key] = results
+        if len(self.__cache) > self.cache_size:
+            self.__cache.popitem(last=False)
+        return results
\ No newline at end of file
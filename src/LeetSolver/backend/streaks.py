@@ -0,0 +1,178 @@
+from LeetSolver.backend.database import Database
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from array import array
+import datetime
+import base64
+import json
+
+STATE_FILE = "streaks.json"
+
+
+def _ordinal(date: str) -> Optional[int]:
+    try:
+        return datetime.date.fromisoformat(str(date)[:10]).toordinal()
+    except ValueError:
+        return None
+
+def _today(today: Optional[str]) -> int:
+    return _ordinal(today) if today else datetime.date.today().toordinal()
+
+
+class StreakEngine:
+    """
+    Per day activity of the whole history, kept as a compact count array
+    (`counts[i]` = logged solves on day `start + i`, as date ordinals).
+
+    The first `refresh()` builds it with one ordered scan of the date index.
+    Later refreshes only count the `daily_log` rows added since (id above
+    `last_id`). If the `daily_log` change counter moved by more than the rows
+    added, rows were edited or deleted and the array is rebuilt. The state is
+    saved next to the database, so a new session starts from it.
+
+    The run length ending on every day is derived on each change, so
+    `current_streak` and `longest_streak` are lookups and `heatmap` only reads
+    the requested days, none of them touches the database.
+    """
+
+    def __init__(self, db: Database, state_path: Optional[Path] = None) -> None:
+        self.db = db
+        self.state_path = state_path or (Path(db.database).parent / STATE_FILE if db.database else None)
+        self.start = 0
+        self.counts = array("I")
+        self.last_id = 0
+        self.version = 0
+        # runs[i]: consecutive active days ending on day start + i
+        self.runs = array("I")
+        self.longest = 0
+        self.__loaded = False
+
+    # state
+    def load(self) -> bool:
+        """Restores the saved state, False if there is none or it cannot be read."""
+        self.__loaded = True
+        if self.state_path is None:
+            return False
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+            counts = array("I")
+            counts.frombytes(base64.b64decode(state["counts"]))
+            self.start, self.last_id, self.version = state["start"], state["last_id"], state["version"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self.counts = counts
+        self.__derive()
+        return True
+
+    def save(self) -> None:
+        # the state is a cache of daily_log, losing it only costs a rebuild
+        if self.state_path is None:
+            return
+        state = {
+            "start": self.start, "last_id": self.last_id, "version": self.version,
+            "counts": base64.b64encode(self.counts.tobytes()).decode("ascii"),
+        }
+        try:
+            with open(self.state_path, "w", encoding="utf-8") as file:
+                json.dump(state, file)
+        except OSError:
+            pass
+
+    def refresh(self) -> None:
+        """Brings the counts up to date with `daily_log`, incrementally when possible."""
+        if not self.__loaded:
+            self.load()
+
+        if self.last_id:
+            last_id, version, rows = self.db.daily_counts(self.last_id)
+            added = sum(count for _, count in rows)
+            if last_id >= self.last_id and version - self.version == added:
+                if added:
+                    self.__add(rows)
+                    self.last_id, self.version = last_id, version
+                    self.__derive()
+                    self.save()
+                return
+
+        last_id, version, rows = self.db.daily_counts()
+        self.start, self.counts = 0, array("I")
+        self.__add(rows)
+        self.last_id, self.version = last_id, version
+        self.__derive()
+        self.save()
+
+    def __add(self, rows: Iterable[Tuple[str, int]]) -> None:
+        days = [(day, count) for day, count in ((_ordinal(date), count) for date, count in rows) if day]
+        if not days:
+            return
+        first = min(day for day, _ in days)
+        last = max(day for day, _ in days)
+        if not self.counts:
+            self.start = first
+        if first < self.start:
+            self.counts[:0] = array("I", bytes(4 * (self.start - first)))
+            self.start = first
+        end = self.start + len(self.counts)
+        if last >= end:
+            self.counts.extend(array("I", bytes(4 * (last - end + 1))))
+        for day, count in days:
+            self.counts[day - self.start] += count
+
+    def __derive(self) -> None:
+        runs = array("I", bytes(4 * len(self.counts)))
+        run = 0
+        for i, count in enumerate(self.counts):
+            run = run + 1 if count else 0
+            runs[i] = run
+        self.runs = runs
+        self.longest = max(runs, default=0)
+
+    # queries
+    @property
+    def longest_streak(self) -> int:
+        return self.longest
+
+    def current_streak(self, today: Optional[str] = None) -> int:
+        """
+        Consecutive active days up to today. A streak is still current on the
+        day after its last active day, it is only lost once a full day is missed.
+        """
+        day = _today(today) - self.start
+        for day in (day, day - 1):
+            if 0 <= day < len(self.runs) and self.runs[day]:
+                return self.runs[day]
+        return 0
+
+    def count_on(self, date: str) -> int:
+        day = _ordinal(date)
+        if day is None or not 0 <= day - self.start < len(self.counts):
+            return 0
+        return self.counts[day - self.start]
+
+    def heatmap(self, days: int = 365, today: Optional[str] = None) -> List[int]:
+        """Solves per day of the `days` days ending today, oldest first."""
+        first = _today(today) - days + 1
+        lo, hi = max(first - self.start, 0), min(first + days - self.start, len(self.counts))
+        values = [0] * days
+        if lo < hi:
+            offset = self.start + lo - first
+            values[offset:offset + hi - lo] = self.counts[lo:hi]
+        return values
+
+    def heatmap_grid(self, weeks: int = 53, today: Optional[str] = None) -> Dict[str, object]:
+        """
+        The calendar layout of the heatmap, 7 rows (Monday..Sunday) by `weeks`
+        columns (oldest first), days after today are 0. Ready for a matrix plot.
+        """
+        end = _today(today)
+        # the grid ends with the week holding today
+        last_sunday = end + (6 - datetime.date.fromordinal(end).weekday())
+        values = self.heatmap(weeks * 7, datetime.date.fromordinal(last_sunday).isoformat())
+        future = last_sunday - end
+        if future:
+            values[-future:] = [0] * future
+        return {
+            "first_day": datetime.date.fromordinal(last_sunday - weeks * 7 + 1).isoformat(),
+            "rows": [values[weekday::7] for weekday in range(7)],
+        }
\ No newline at end of file
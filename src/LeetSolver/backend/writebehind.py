@@ -0,0 +1,121 @@
+from LeetSolver.backend.database import Database, make_log_event
+from LeetSolver.error import LeetSolverError
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from pathlib import Path
+import threading
+import fcntl
+import json
+
+JOURNAL_FILE = "journal.jsonl"
+
+
+def parse_journal(lines: List[str]) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    The (seq, event) entries of the journal lines. A line torn by a crash was
+    never acknowledged and is skipped.
+    """
+    entries = []
+    for line in lines:
+        try:
+            entry = json.loads(line)
+            entries.append((int(entry["seq"]), entry["event"]))
+        except (ValueError, KeyError, TypeError):
+            continue
+    return entries
+
+
+class WriteBehindQueue:
+    """
+    Gathers solve events in a journal and writes them to the database in batches.
+
+    `log()` only appends one JSON line to an append-only journal in the
+    `.leetsolver` directory (written through to the OS, never fsynced), so a
+    keypress never waits for SQLite. `flush()` writes every journal entry not
+    yet applied in one transaction together with the highest sequence number
+    (`journal_state`), then empties the journal once nothing is left in it.
+
+    The journal is shared by every process logging to the same directory (the
+    TUI, cron jobs, shell hooks): appending, reading and truncating it is done
+    under an exclusive `flock`, sequence numbers continue from the last entry
+    of the file, and a flush applies the entries of every process. Entries of a
+    session that crashed are applied by the next flush, entries older than the
+    recorded sequence number were already committed and are skipped, so no event
+    is lost or logged twice.
+    """
+
+    def __init__(self, db: Database, journal_path: Optional[Path] = None) -> None:
+        self.db = db
+        self.journal_path = journal_path or Path(db.database).parent / JOURNAL_FILE
+        self.__lock = threading.Lock()
+        # one flush at a time, so sequence numbers are committed in order
+        self.__flushing = threading.Lock()
+        try:
+            # read and appended through the same handle, the lock is taken on it
+            self.__journal = open(self.journal_path, "a+", encoding="utf-8")
+        except OSError as e:
+            raise LeetSolverError(f"Could not open the journal '{self.journal_path}'", cause=e)
+        applied = self.db.journal_position(self.journal_path.name)
+        with self.__locked() as (entries, _):
+            # solves recovered from a crashed session, or not flushed by another process yet
+            self.__pending = [seq for seq, _ in entries if seq > applied]
+
+    @property
+    def pending(self) -> int:
+        return len(self.__pending)
+
+    @contextmanager
+    def __locked(self) -> Iterator[Tuple[List[Tuple[int, Dict[str, Any]]], bool]]:
+        """
+        Holds the journal lock of this process and of the others, yields the journal
+        entries and whether its last line was torn by a crash.
+        """
+        with self.__lock:
+            try:
+                fcntl.flock(self.__journal.fileno(), fcntl.LOCK_EX)
+            except OSError as e:
+                raise LeetSolverError(f"Could not lock the journal '{self.journal_path}'", cause=e)
+            try:
+                self.__journal.seek(0)
+                lines = self.__journal.readlines()
+                yield parse_journal(lines), bool(lines) and not lines[-1].endswith("\n")
+            finally:
+                fcntl.flock(self.__journal.fileno(), fcntl.LOCK_UN)
+
+    def log(self, question_id: str, **kw) -> None:
+        """Journals one solve, see `make_log_event` for the accepted keywords."""
+        event = make_log_event(question_id, **kw)
+        with self.__locked() as (entries, torn):
+            # an empty journal was flushed, the numbers continue from the database
+            last = max(seq for seq, _ in entries) if entries else self.db.journal_position(self.journal_path.name)
+            # end a torn line so the entry starts on a line of its own
+            self.__journal.write(("\n" if torn else "") + json.dumps({"seq": last + 1, "event": event}) + "\n")
+            self.__journal.flush()
+            self.__pending.append(last + 1)
+
+    def flush(self) -> int:
+        """
+        Writes every journal entry not yet applied in one transaction, returns how
+        many were written.
+        """
+        with self.__flushing:
+            with self.__locked() as (entries, _):
+                if not entries:
+                    # flushed (and emptied) by another process
+                    self.__pending = []
+                    return 0
+            written, applied = self.db.apply_journal(self.journal_path.name, entries)
+
+            with self.__locked() as (entries, _):
+                # entries logged while flushing stay in the journal until the next flush
+                if all(seq <= applied for seq, _ in entries):
+                    self.__journal.truncate(0)
+                self.__pending = [seq for seq in self.__pending if seq > applied]
+            return written
+
+    def close(self) -> None:
+        """Flushes what is left and closes the journal."""
+        try:
+            self.flush()
+        finally:
+            self.__journal.close()
\ No newline at end of file
@@ -0,0 +1,201 @@
+from LeetSolver.error import BackupError
+from LeetSolver.connection import RETRY_DEADLINE_S
+from typing import List, Optional, Union
+from pathlib import Path
+import threading
+import datetime
+import sqlite3
+import shutil
+import gzip
+import time
+import os
+
+BACKUP_DIR = "backups"
+KEEP_BACKUPS = 5
+# pages copied per step, the source is only read locked while a step runs
+PAGES_PER_STEP = 256
+__SUFFIX = ".db.gz"
+# sqlite3_backup_step results of a source or target locked by another connection
+__BUSY_STEPS = (5, 6)
+# seconds waited before a step that found the database locked is tried again
+BUSY_SLEEP_S = 0.01
+
+
+def backup_path(backup_dir: Path, reason: str) -> Path:
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return backup_dir / f"database-{stamp}-{reason}{__SUFFIX}"
+
+def list_backups(backup_dir: Path) -> List[Path]:
+    """The snapshots in `backup_dir`, newest first (names start with their timestamp)."""
+    try:
+        return sorted(backup_dir.glob(f"database-*{__SUFFIX}"), reverse=True)
+    except OSError:
+        return []
+
+def backup_age(backup_dir: Path) -> Optional[float]:
+    """Seconds since the newest snapshot was taken, None if there is none."""
+    for snapshot in list_backups(backup_dir):
+        try:
+            return time.time() - snapshot.stat().st_mtime
+        except OSError:
+            continue
+    return None
+
+def rotate_backups(backup_dir: Path, keep: int = KEEP_BACKUPS) -> List[Path]:
+    """Deletes all but the `keep` newest snapshots, returns the deleted ones."""
+    removed = []
+    for snapshot in list_backups(backup_dir)[max(keep, 1):]:
+        try:
+            snapshot.unlink()
+            removed.append(snapshot)
+        except OSError:
+            pass
+    return removed
+
+def copy_sqlite_database(
+    source: sqlite3.Connection,
+    target: sqlite3.Connection,
+    pages: int = PAGES_PER_STEP,
+    sleep: float = BUSY_SLEEP_S,
+    cancel: Optional[threading.Event] = None
+) -> None:
+    """
+    Copies `source` into `target` with the SQLite backup API, `pages` pages per step.
+    A step that finds either database locked is tried again `sleep` seconds later.
+
+    The source keeps a read transaction open for the whole copy, so in WAL mode the
+    copy is one consistent snapshot and writers are never blocked by it (nor does a
+    write restart it). Setting `cancel` stops the copy after the current step.
+
+    Raises:
+        BackupError: If the source has a transaction open (a write transaction of
+            its own would lock the copy out forever), the copy stayed locked for
+            RETRY_DEADLINE_S, or was cancelled.
+        sqlite3.DatabaseError: If the copy failed.
+    """
+    busy_since: List[float] = []
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        if cancel is not None and cancel.is_set():
+            raise BackupError("cancelled", "database")
+        if status not in __BUSY_STEPS:
+            busy_since.clear()
+        elif not busy_since:
+            busy_since.append(time.monotonic())
+        elif time.monotonic() - busy_since[0] >= RETRY_DEADLINE_S:
+            raise BackupError("locked", "database")
+
+    if source.in_transaction:
+        raise BackupError("open transaction", "database")
+    source.execute("BEGIN;")
+    try:
+        source.execute("SELECT COUNT(*) FROM sqlite_master;").fetchone()
+        source.backup(target, pages=pages, progress=progress, sleep=sleep)
+    finally:
+        source.rollback()
+
+def backup_sqlite_database(
+    source: Union[Path, sqlite3.Connection],
+    backup_dir: Path,
+    reason: str = "manual",
+    keep: int = KEEP_BACKUPS,
+    pages: int = PAGES_PER_STEP,
+    sleep: float = BUSY_SLEEP_S,
+    cancel: Optional[threading.Event] = None
+) -> Path:
+    """
+    Takes a gzip compressed snapshot of a live database into `backup_dir` and
+    keeps only the `keep` newest snapshots.
+
+    1. The database is copied page by page (`copy_sqlite_database`) into a
+       temporary file in `backup_dir`, from a connection of its own when given a
+       path, so the app keeps logging while a large history is copied.
+    2. The copy is compressed next to it and renamed into place once complete,
+       a snapshot file is therefore never partial.
+    Both steps check `cancel` between chunks, a cancelled backup leaves no file.
+
+    Args:
+        source (Union[Path, sqlite3.Connection]): The database file, or an open
+            connection to it with no transaction open.
+        backup_dir (Path): Where the snapshots are kept, created if missing.
+        reason (str): Tag put in the file name (e.g. "migrate", "daily").
+        keep (int): Number of snapshots kept after this one is written.
+        pages (int): Pages copied per step.
+        sleep (float): Seconds slept before a step that found the database locked is retried.
+        cancel (Optional[threading.Event]): Stops the backup when set.
+
+    Raises:
+        BackupError: If the snapshot could not be taken or was cancelled.
+
+    Returns:
+        Path: The new snapshot.
+    """
+    snapshot = backup_path(backup_dir, reason)
+    copy = snapshot.with_name(snapshot.name[:-len(__SUFFIX)] + ".tmp")
+    part = snapshot.with_name(snapshot.name + ".part")
+    try:
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        conn = source if isinstance(source, sqlite3.Connection) else \
+            sqlite3.connect(f"{Path(source).resolve().as_uri()}?mode=ro", uri=True, timeout=5)
+        target = sqlite3.connect(str(copy))
+        try:
+            copy_sqlite_database(conn, target, pages, sleep, cancel)
+        finally:
+            target.close()
+            if conn is not source:
+                conn.close()
+
+        with open(copy, "rb") as file, gzip.open(part, "wb", compresslevel=6) as compressed:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                if cancel is not None and cancel.is_set():
+                    raise BackupError("cancelled", str(snapshot))
+                compressed.write(chunk)
+        os.replace(part, snapshot)
+    except BackupError:
+        raise
+    except (OSError, sqlite3.Error) as e:
+        raise BackupError("backup", str(snapshot), cause=e)
+    finally:
+        for leftover in (copy, part):
+            try:
+                leftover.unlink()
+            except OSError:
+                pass
+
+    rotate_backups(backup_dir, keep)
+    return snapshot
+
+def restore_sqlite_database(snapshot: Path, sqlite3_fp: Path, pages: int = PAGES_PER_STEP) -> None:
+    """
+    Replaces the content of `sqlite3_fp` with a snapshot taken by `backup_sqlite_database`.
+    The snapshot is decompressed and checked (`PRAGMA integrity_check`) before anything
+    is written, then copied in with the backup API (`copy_sqlite_database`) so open
+    connections see the change.
+
+    Raises:
+        BackupError: If the snapshot is unreadable or damaged, or the copy failed.
+    """
+    copy = snapshot.with_name(snapshot.name + ".restore")
+    try:
+        with gzip.open(snapshot, "rb") as compressed, open(copy, "wb") as file:
+            shutil.copyfileobj(compressed, file, 1 << 20)
+        source = sqlite3.connect(str(copy))
+        try:
+            if source.execute("PRAGMA integrity_check;").fetchone()[0] != "ok":
+                raise BackupError("restore", str(snapshot))
+            target = sqlite3.connect(str(sqlite3_fp), timeout=5)
+            try:
+                copy_sqlite_database(source, target, pages)
+            finally:
+                target.close()
+        finally:
+            source.close()
+    except BackupError:
+        raise
+    except (OSError, EOFError, sqlite3.Error) as e:
+        raise BackupError("restore", str(snapshot), cause=e)
+    finally:
+        try:
+            copy.unlink()
+        except OSError:
+            pass
\ No newline at end of file
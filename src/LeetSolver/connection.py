@@ -0,0 +1,158 @@
+# Busy handling for connections to a database shared with other processes (the TUI,
+# cron jobs and shell hooks all log to the same file).
+#
+# SQLite's own busy handler is turned off (timeout=0). A statement that finds the
+# database locked is retried here with exponential backoff and full jitter, so
+# waiting processes spread out instead of waking up together, and every wait is
+# counted in `LOCK_STATS`. Writers take the write lock up front with
+# `BEGIN IMMEDIATE`: a deferred transaction that has already read fails with
+# SQLITE_BUSY_SNAPSHOT when another process commits first, and no amount of
+# waiting fixes that. A COMMIT that finds the database locked (a reader in rollback
+# journal mode, a checkpoint) leaves its transaction open and is retried as well.
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+from pathlib import Path
+import threading
+import sqlite3
+import random
+import time
+
+BACKOFF_BASE_S = 0.001
+BACKOFF_MAX_S = 0.05
+# give up (raise the busy error) once a statement waited this long, as long as
+# SQLite's default busy timeout was
+RETRY_DEADLINE_S = 5.0
+# SQLITE_BUSY and SQLITE_LOCKED, extended codes keep them in the low byte
+__BUSY_CODES = (5, 6)
+__COMMIT_STATEMENTS = frozenset(("COMMIT", "END", "COMMIT TRANSACTION", "END TRANSACTION"))
+
+
+def is_busy_error(error: sqlite3.Error) -> bool:
+    """True if the error says another connection holds the lock."""
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in __BUSY_CODES
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+def is_commit(sql: str) -> bool:
+    return " ".join(sql.replace(";", " ").split()).upper() in __COMMIT_STATEMENTS
+
+
+class LockStats:
+    """
+    Lock wait metrics of the process: statements that had to wait, retries,
+    statements that gave up, and the total and longest wait in seconds.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.waits = 0
+            self.retries = 0
+            self.timeouts = 0
+            self.wait_s = 0.0
+            self.max_wait_s = 0.0
+
+    def record(self, retries: int, waited: float, timed_out: bool) -> None:
+        with self.__lock:
+            self.waits += 1
+            self.retries += retries
+            self.timeouts += timed_out
+            self.wait_s += waited
+            self.max_wait_s = max(self.max_wait_s, waited)
+
+    def snapshot(self) -> Dict[str, Union[int, float]]:
+        with self.__lock:
+            return {
+                "waits": self.waits,
+                "retries": self.retries,
+                "timeouts": self.timeouts,
+                "wait_ms": round(self.wait_s * 1000, 3),
+                "max_wait_ms": round(self.max_wait_s * 1000, 3),
+                "avg_wait_ms": round(self.wait_s * 1000 / self.waits, 3) if self.waits else 0.0,
+            }
+
+LOCK_STATS = LockStats()
+
+
+def retry_busy(func: Callable[..., Any], *args: Any, deadline: Optional[float] = None) -> Any:
+    """
+    Calls `func(*args)`, retrying while it fails because the database is locked.
+    The n-th retry sleeps a random time up to min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2**n).
+
+    Raises:
+        sqlite3.OperationalError: If it is still locked after `deadline` seconds
+            (RETRY_DEADLINE_S by default), or failed for another reason.
+    """
+    deadline = RETRY_DEADLINE_S if deadline is None else deadline
+    started: Optional[float] = None
+    retries = 0
+    while True:
+        try:
+            result = func(*args)
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e):
+                raise
+            now = time.monotonic()
+            if started is None:
+                started = now
+            if now - started >= deadline:
+                LOCK_STATS.record(retries, now - started, True)
+                raise
+            time.sleep(random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** retries)))
+            retries += 1
+            continue
+        if started is not None:
+            LOCK_STATS.record(retries, time.monotonic() - started, False)
+        return result
+
+
+class RetryingCursor(sqlite3.Cursor):
+    """
+    Retries statements that find the database locked, unless a transaction is open:
+    a statement of an open transaction cannot be retried alone (the transaction
+    should have been started with `BEGIN IMMEDIATE`). COMMIT is the exception, a
+    busy COMMIT leaves the transaction as it was and can be run again.
+    """
+
+    def execute(self, sql: str, parameters: Any = ()) -> "RetryingCursor":
+        if self.connection.in_transaction and not is_commit(sql):
+            return super().execute(sql, parameters)
+        return retry_busy(super().execute, sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> "RetryingCursor":
+        if self.connection.in_transaction:
+            return super().executemany(sql, seq_of_parameters)
+        # a retry needs the parameters again
+        return retry_busy(super().executemany, sql, list(seq_of_parameters))
+
+
+class RetryingConnection(sqlite3.Connection):
+    """
+    A connection whose cursors (and `execute` shortcuts) are `RetryingCursor`s,
+    and whose `commit()` is retried like a COMMIT statement.
+    """
+
+    def cursor(self, factory: Callable[..., sqlite3.Cursor] = RetryingCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+    def commit(self) -> None:
+        retry_busy(super().commit)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect(database: Union[str, Path], **kw: Any) -> RetryingConnection:
+    """
+    `sqlite3.connect` returning a `RetryingConnection`, with SQLite's busy handler
+    off since the waiting is done by the retries. Other arguments are passed on.
+    """
+    kw.setdefault("timeout", 0)
+    return sqlite3.connect(str(database), factory=RetryingConnection, **kw)
\ No newline at end of file
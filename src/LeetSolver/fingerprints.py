@@ -0,0 +1,38 @@
+from typing import Optional, Tuple
+from pathlib import Path
+import sqlite3
+
+
+def fingerprint_json_file(json_fp: Path) -> Optional[Tuple[int, int]]:
+    """
+    Returns a cheap fingerprint (mtime, size) of the JSON file, or None if it is missing.
+    If the fingerprint did not change since the last validation the file is still valid.
+    """
+    try:
+        stat = json_fp.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def fingerprint_sqlite_database(sqlite3_fp: Path) -> Optional[Tuple[int, int]]:
+    """
+    Returns a cheap fingerprint (schema_version, user_version) of the SQLite3 database,
+    or None if it is missing or cannot be read.
+
+    Note:
+        mtime and size are left out on purpose, they change on every logged solve
+        while `schema_version` only changes when the structure of the database does.
+    """
+    if not sqlite3_fp.is_file():
+        return None
+    try:
+        conn = sqlite3.connect(f"{sqlite3_fp.resolve().as_uri()}?mode=ro", uri=True, timeout=5)
+        try:
+            return (
+                conn.execute("PRAGMA schema_version;").fetchone()[0],
+                conn.execute("PRAGMA user_version;").fetchone()[0]
+            )
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return None
\ No newline at end of file
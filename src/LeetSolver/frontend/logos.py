@@ -0,0 +1,94 @@
+# Logo assets of the TUI. Definitions live in `assets/logos.json` keyed by the
+# `logoid` of settings.json (see `analyis_logo_data` for the definition format).
+# A definition is parsed, validated against rules.txt (5 x 25, 7 x 27 padded)
+# and padded once, the ready to blit frames are cached in the `.leetsolver`
+# directory under the logo id and the (mtime, size) of the asset file, so startup
+# and theme switches only read the cache, not the definitions, while it is unchanged.
+from LeetSolver.utils import analyis_logo_data, pad_logo_frame
+from LeetSolver.fingerprints import fingerprint_json_file
+from LeetSolver.error import ValidationError
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+import json
+
+LOGO_HEIGHT = 5
+LOGO_WIDTH = 25
+LOGO_MARGIN = 1
+DEFAULT_LOGO_ID = "0"
+
+__ASSET_FILE = Path(__file__).resolve().parent / "assets" / "logos.json"
+__CACHE_FILE = "logo_cache.json"
+
+# (padded frames, durations in ms)
+LogoFrames = Tuple[List[Tuple[str, ...]], List[int]]
+
+
+@lru_cache(maxsize=1)
+def load_logo_definitions() -> Dict[str, Dict]:
+    """The logo definitions shipped with the package, read once per process."""
+    try:
+        with open(__ASSET_FILE, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        raise ValidationError("logos.json", "could not read the logo assets", cause=e)
+
+def render_logo(logoid: str, definition: Dict) -> LogoFrames:
+    """
+    Parses and validates a logo definition and pads its frames.
+
+    Raises:
+        ValidationError: If the definition is malformed or too large.
+    """
+    try:
+        frames, timestamps = analyis_logo_data(definition["data"], LOGO_HEIGHT, LOGO_WIDTH)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValidationError(f"logo {logoid}", str(e), cause=e)
+    return [pad_logo_frame(rows, LOGO_HEIGHT, LOGO_WIDTH, LOGO_MARGIN) for rows in frames], timestamps
+
+def _read_cache(path: Path) -> Dict:
+    try:
+        with open(path / __CACHE_FILE, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _write_cache(path: Path, cache: Dict) -> None:
+    # a missing cache only costs one more render, so failures are ignored
+    try:
+        with open(path / __CACHE_FILE, "w", encoding="utf-8") as file:
+            json.dump(cache, file, ensure_ascii=False)
+    except OSError:
+        pass
+
+def _resolve_logo(logoid: str) -> Tuple[str, Dict]:
+    definitions = load_logo_definitions()
+    if logoid not in definitions:
+        logoid = DEFAULT_LOGO_ID
+    return logoid, definitions[logoid]
+
+def load_logo(logoid: object = DEFAULT_LOGO_ID, cache_dir: Optional[Path] = None) -> LogoFrames:
+    """
+    The padded frames and durations of a logo, unknown ids fall back to the default logo.
+
+    Args:
+        logoid (object): The `logoid` of settings.json.
+        cache_dir (Optional[Path]): The `.leetsolver` directory holding the frame cache,
+            None renders the logo without caching it.
+    """
+    logoid = str(logoid)
+    if cache_dir is None:
+        return render_logo(*_resolve_logo(logoid))
+
+    fingerprint = fingerprint_json_file(__ASSET_FILE)
+    key = [*fingerprint, LOGO_HEIGHT, LOGO_WIDTH, LOGO_MARGIN] if fingerprint else None
+    cache = _read_cache(cache_dir)
+    entry = cache.get(logoid)
+    if key is not None and isinstance(entry, dict) and entry.get("key") == key:
+        return [tuple(rows) for rows in entry["frames"]], entry["timestamps"]
+
+    frames, timestamps = render_logo(*_resolve_logo(logoid))
+    cache[logoid] = {"key": key, "frames": frames, "timestamps": timestamps}
+    _write_cache(cache_dir, cache)
+    return frames, timestamps
\ No newline at end of file
@@ -1,27 +1,228 @@
 from LeetSolver.frontend.ui_core import UICore
+from LeetSolver.frontend.ui_events import EventLoop, Timer
+from LeetSolver.frontend.logos import load_logo, DEFAULT_LOGO_ID
+from LeetSolver.frontend.ui_list import VirtualList
+from LeetSolver.backend.writebehind import WriteBehindQueue
+from LeetSolver.backup import backup_age
+from LeetSolver.settings import Settings
 from LeetSolver.utils import (
-    analyis_logo_data,
-    Animation
+    Animation,
+    AnimationClock
 )
-from typing import List, Tuple, Optional, Iterator, Dict
+from concurrent.futures import Future
+from functools import partial
+from typing import Optional, Dict, Any
+import threading
+import curses
+
+
+def question_line(row) -> str:
+    return (
+        f"{row['question_id'][:32]:<32} {row['difficulty'] or '-':<6} "
+        f"{row['last_solved'] or '-':<10} {row['tags'] or ''}"
+    )
 
 
 class UIController:
     """
+    Wires the data side of the app to the UICore: schedules the logo animation
+    on the event loop and runs backend queries in the loop's worker threads,
+    so the UI thread only ever draws.
+
+    With `settings` the logo follows the `logoid` setting: settings.json is checked
+    every `settings_poll_ms` (one stat) and edits made by hand show up live.
     """
-    def __init__(self, ui_data:Dict, frame_repeat:int = 200):
+    def __init__(
+        self, ui_data:Dict, backend: Any = None, flush_ms: int = 500, backup_hours: float = 24,
+        settings: Optional[Settings] = None, settings_poll_ms: int = 1000
+    ):
         self.ui_data = ui_data
-        self.frame_repeat = frame_repeat
+        self.backend = backend
+        self.settings = settings
+        self.settings_poll_ms = settings_poll_ms
+        self.__settings_timer: Optional[Timer] = None
+        self.flush_ms = flush_ms
+        self.backup_hours = backup_hours
+        self.__backup_cancel = threading.Event()
+        self.writer: Optional[WriteBehindQueue] = None
+        self.__flush_timer: Optional[Timer] = None
+        self.loop = EventLoop()
         self.uic = UICore()
+        self.clock = AnimationClock()
+        self.__timer: Optional[Timer] = None
         
     def add_logo(self):
-        frames, timestamps = analyis_logo_data(
-            self.ui_data["logo_data"]
+        # `logoid` comes from settings.json, `cache_dir` is the .leetsolver directory
+        frames, timestamps = load_logo(
+            self.ui_data.get("logoid", DEFAULT_LOGO_ID), self.ui_data.get("cache_dir")
+        )
+        return Animation(frames, timestamps)
+    
+    def set_logo(self, logoid):
+        """Switches the logo (theme change), the frames come from the cache."""
+        self.ui_data["logoid"] = logoid
+        if self.settings is not None and isinstance(logoid, int):
+            # saved once the user stops switching, see `Settings.set`
+            self.settings.set("logoid", logoid)
+        self.clock.add("logo", self.add_logo())
+        self.__tick()
+    
+    def __settings_changed(self, changed: Dict[str, Any]):
+        if "logoid" in changed and changed["logoid"] != self.ui_data.get("logoid"):
+            self.set_logo(changed["logoid"])
+    
+    def __poll_settings(self):
+        self.settings.poll()
+        if self.settings.error is not None:
+            self.uic.status = f"could not save settings: {self.settings.error}"
+            self.uic.refresh()
+        self.__settings_timer = self.loop.call_later(self.settings_poll_ms, self.__poll_settings)
+    
+    def __tick(self):
+        # one timer for every animation, due when the first of them changes frame
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        now = self.clock.now()
+        self.uic.logo = self.clock.frames(now)["logo"]
+        self.uic.refresh()
+        wait = self.clock.ms_until_next(now)
+        if wait is not None:
+            self.__timer = self.loop.call_later(wait, self.__tick)
+    
+    def __show_week(self, future: Future):
+        try:
+            weeks = future.result()
+        except Exception as e:
+            self.uic.status = f"could not load stats: {e}"
+        else:
+            self.uic.status = (
+                f"week of {weeks[0]['week_start']}: {weeks[0]['total_questions']} solved"
+                if weeks else "nothing logged yet"
+            )
+        self.uic.refresh()
+    
+    def __load_page(self, fetch, *args, on_done):
+        # pages of the question list are queried off the UI thread, redrawn when merged
+        def merged(future: Future):
+            on_done(future)
+            self.uic.refresh()
+        self.loop.run_in_background(fetch, *args, on_done=merged)
+    
+    def add_question_list(self, sort: str = "magic_score", descending: bool = True):
+        """Shows the questions, most due first by default, paged from the backend."""
+        questions = VirtualList(
+            partial(self.backend.questions_page, sort, descending=descending),
+            key=lambda row: (row[sort], row["question_id"]),
+            loader=self.__load_page
         )
-        return Animation(self.frame_repeat, frames, timestamps)
+        self.uic.questions = questions
+        self.uic.list_format = question_line
+        for keys, action in (
+            ((curses.KEY_DOWN, ord('j')), lambda: questions.move(1)),
+            ((curses.KEY_UP, ord('k')), lambda: questions.move(-1)),
+            ((curses.KEY_NPAGE,), lambda: questions.page(1)),
+            ((curses.KEY_PPAGE,), lambda: questions.page(-1)),
+        ):
+            for key in keys:
+                self.uic.keymap[key] = action
+        questions.reload()
+    
+    def log_solve(self, question_id: str, **kw):
+        """Queues a solve, it is written to the database by the next timed flush."""
+        self.writer.log(question_id, **kw)
+        if self.__flush_timer is None:
+            self.__flush_timer = self.loop.call_later(self.flush_ms, self.__flush)
+    
+    def __flush(self):
+        self.__flush_timer = None
+        self.loop.run_in_background(self.__flush_and_rescore, on_done=self.__flushed)
+    
+    def __flush_and_rescore(self) -> int:
+        # the stored scores `due` ranks by follow the solves, the shown list keeps
+        # its order (and cursor) until it is reloaded
+        written = self.writer.flush()
+        if written:
+            self.__rescore()
+        return written
+    
+    def __rescore(self):
+        # numpy is only loaded in the worker thread, the UI is up before it
+        from LeetSolver.backend.scoring import rescore
+        rescore(self.backend)
+    
+    def __rescored(self, future: Future):
+        try:
+            future.result()
+        except Exception as e:
+            self.uic.status = f"could not rescore questions: {e}"
+        else:
+            if self.uic.questions is not None:
+                self.uic.questions.reload()
+        self.uic.refresh()
+    
+    def __flushed(self, future: Future):
+        try:
+            written = future.result()
+        except Exception as e:
+            self.uic.status = f"could not save solves, will retry: {e}"
+            if self.__flush_timer is None:
+                self.__flush_timer = self.loop.call_later(self.flush_ms, self.__flush)
+        else:
+            if written:
+                self.uic.status = f"saved {written} solve{'s' if written > 1 else ''}"
+        self.uic.refresh()
+    
+    def __backup(self):
+        # a snapshot a day, taken in a worker thread and cancelled on exit
+        age = backup_age(self.backend.backup_dir)
+        if age is None or age > self.backup_hours * 3600:
+            self.uic.exit_hooks.append(self.__backup_cancel.set)
+            self.loop.run_in_background(
+                self.backend.backup, "daily", None, self.__backup_cancel, on_done=self.__backed_up
+            )
+    
+    def __backed_up(self, future: Future):
+        try:
+            future.result()
+        except Exception as e:
+            self.uic.status = f"backup failed: {e}"
+            self.uic.refresh()
+    
+    def __log_selected(self):
+        row = self.uic.questions.selected if self.uic.questions else None
+        if row is not None:
+            self.log_solve(row["question_id"])
+            self.uic.status = f"logged {row['question_id']}"
+            self.uic.refresh()
     
     def setup(self):
-        self.add_logo()
+        if self.settings is not None:
+            self.ui_data["logoid"] = self.settings.get("logoid", DEFAULT_LOGO_ID)
+            # debounced writes run on the UI thread like every other timer
+            self.settings.call_later = self.loop.call_later
+            self.settings.subscribe(self.__settings_changed)
+            self.__settings_timer = self.loop.call_later(self.settings_poll_ms, self.__poll_settings)
+        self.clock.add("logo", self.add_logo())
+        self.__timer = self.loop.call_later(0, self.__tick)
+        if self.backend is not None:
+            self.uic.status = "loading stats..."
+            self.loop.run_in_background(self.backend.weekly_summary, 1, on_done=self.__show_week)
+            self.add_question_list()
+            # scores age every day, the list is shown again in fresh order once they are
+            self.loop.run_in_background(self.__rescore, on_done=self.__rescored)
+            # solves are written behind, the journal is flushed once more on exit
+            self.writer = WriteBehindQueue(self.backend)
+            self.uic.exit_hooks.append(self.writer.close)
+            self.uic.keymap[ord('s')] = self.__log_selected
+            if self.writer.pending:
+                # solves recovered from the journal of a crashed session
+                self.__flush_timer = self.loop.call_later(0, self.__flush)
+            self.__backup()
+        if self.settings is not None:
+            # after the solve queue, a settings write that fails must not cost solves
+            self.uic.exit_hooks.append(self.settings.close)
         
     def mainloop(self):
-        pass
\ No newline at end of file
+        self.setup()
+        self.uic.run(self.loop)
\ No newline at end of file
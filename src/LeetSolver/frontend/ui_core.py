@@ -1,7 +1,16 @@
 import curses
+import signal
+import sys
+import os
+from LeetSolver.frontend.ui_renderer import Renderer
+from LeetSolver.frontend.ui_events import EventLoop
+from LeetSolver.frontend.ui_list import VirtualList
+from typing import Any, Callable, Dict, List, Optional
 
 MINIMAL_HEIGHT = 24
 MINIMAL_WIDTH = 80
+# first row of the question list in the main window, below the logo
+LIST_TOP = 9
 
 # what my ui core needs
 # METHODS   
@@ -14,60 +23,116 @@ class UICore:
     
     def __init__(self):
         self.stdscr = self.__setup_terminal()
+        self.renderer = Renderer(self.stdscr)
+        self.usable = False
+        self.logo: Optional[List[str]] = None
+        self.status = ""
+        self.questions: Optional[VirtualList] = None
+        self.list_format: Callable[[Any], str] = str
+        # key code -> handler, 'q' quits once the loop runs
+        self.keymap: Dict[int, Callable[[], None]] = {}
+        # run when the UI stops, also on errors and Ctrl-C (e.g. flushing queued writes)
+        self.exit_hooks: List[Callable[[], None]] = []
         
     def __setup_terminal(self) -> "curses.window":
         screen = curses.initscr()
         curses.noecho()
         curses.cbreak()
         screen.keypad(True)
+        screen.nodelay(True)
         curses.start_color()
         return screen
     
     def resize_windows(self):
+        """
+        Rebuilds the windows for the current terminal size, only called at
+        start and on resize. Returns False if the terminal is too small.
+        """
         h, w = self.stdscr.getmaxyx()
         if h < MINIMAL_HEIGHT or w < MINIMAL_WIDTH:
+            self.renderer.layout({})
+            self.stdscr.addnstr(0, 0, "Terminal too small.", max(w - 1, 0))
+            self.stdscr.noutrefresh()
+            curses.doupdate()
             return False
 
-        # Clear old windows if they exist
-        if self.menu_win:
-            del self.menu_win
-        if self.main_win:
-            del self.main_win
-
         # Example: reserve top 3 rows for menu
         menu_height = 3
-        self.menu_win = curses.newwin(menu_height, w, 0, 0)
-        self.main_win = curses.newwin(h - menu_height, w, menu_height, 0)
-
-        # Optional: box the windows
-        self.menu_win.box()
-        self.main_win.box()
-
+        self.renderer.layout({
+            "menu": (menu_height, w, 0, 0),
+            "main": (h - menu_height, w, menu_height, 0),
+        })
         return True
 
     def draw(self):
-        """Draw your UI"""
-        self.menu_win.addstr(1, 2, "Menu Window")
-        self.main_win.addstr(1, 2, "Main Window")
-        self.menu_win.refresh()
-        self.main_win.refresh()
+        """Draw your UI, into the renderer's back buffers"""
+        self.renderer["menu"].write(0, 1, "Menu Window")
+        main = self.renderer["main"]
+        main.write(0, 1, "Main Window")
+        # the logo frames are pre-padded with a one cell margin
+        for y, line in enumerate(self.logo or ()):
+            main.write(y + 1, 0, line)
+        if self.questions is not None:
+            self.draw_list(main)
+        main.write(main.height - 1, 1, self.status.ljust(main.width - 2))
 
-    def run(self):
-        try:
-            while True:
-                if not self.resize_windows():
-                    self.stdscr.clear()
-                    self.stdscr.addstr(0, 0, "Terminal too small.")
-                    self.stdscr.refresh()
-                    curses.napms(500)
-                    continue
+    def draw_list(self, main):
+        """Draws the visible rows of the question list, the selected one marked."""
+        self.questions.resize(main.height - LIST_TOP - 1)
+        rows = self.questions.visible()
+        selected = self.questions.selected
+        for y in range(self.questions.height):
+            line = ""
+            if y < len(rows):
+                line = ("> " if rows[y] is selected else "  ") + self.list_format(rows[y])
+            main.write(LIST_TOP + y, 1, line.ljust(main.width - 2))
 
-                self.draw()
-                key = self.stdscr.getch()
-                if key == ord('q'):
-                    break
+    def refresh(self):
+        """Draws the UI and pushes the changes to the terminal."""
+        if self.usable:
+            self.draw()
+            self.renderer.render()
+
+    def on_resize(self):
+        w, h = os.get_terminal_size(sys.__stdout__.fileno())
+        # resizeterm queues a KEY_RESIZE, only call it when the size really changed
+        if not curses.is_term_resized(h, w):
+            return
+        curses.resizeterm(h, w)
+        self.usable = self.resize_windows()
+        self.refresh()
+
+    def on_input(self):
+        """Reads every pending key (curses may buffer more than one per wake up)."""
+        while (key := self.stdscr.getch()) != curses.ERR:
+            if key == curses.KEY_RESIZE:
+                self.on_resize()
+            elif key in self.keymap:
+                self.keymap[key]()
+        self.refresh()
+
+    def run(self, loop: Optional[EventLoop] = None):
+        """
+        Runs the UI on an event loop: keys are read when stdin is readable and
+        resizes arrive as SIGWINCH, nothing is polled. On exit, including
+        KeyboardInterrupt, the exit hooks run and then the loop is closed.
+        """
+        loop = loop or EventLoop()
+        self.keymap.setdefault(ord('q'), loop.stop)
+        try:
+            self.usable = self.resize_windows()
+            self.refresh()
+            loop.add_reader(sys.stdin.fileno(), self.on_input)
+            loop.add_signal_handler(signal.SIGWINCH, self.on_resize)
+            loop.run()
         finally:
-            self.__teardown_terminal()
+            try:
+                for hook in self.exit_hooks:
+                    hook()
+            finally:
+                signal.signal(signal.SIGWINCH, signal.SIG_DFL)
+                loop.close()
+                self.__teardown_terminal()
 
 
     def __teardown_terminal(self):
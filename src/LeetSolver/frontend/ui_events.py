@@ -0,0 +1,130 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+import selectors
+import signal
+import queue
+import heapq
+import time
+import os
+
+
+class Timer:
+    """Handle of a scheduled callback, `cancel()` stops it from running."""
+    __slots__ = ("when", "callback", "cancelled")
+
+    def __init__(self, when: float, callback: Callable[[], Any]) -> None:
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def __lt__(self, other: "Timer") -> bool:
+        return self.when < other.when
+
+
+class EventLoop:
+    """
+    Single threaded scheduler of the TUI, it sleeps in one `select` call until
+    either a watched file descriptor (stdin) is readable, the next timer is due
+    or another thread posted an event, so an idle UI uses no CPU.
+
+    - `add_reader(fd, callback)` runs callback when fd is readable (keyboard input).
+    - `call_later(ms, callback)` runs callback once after ms (animation frames).
+    - `call_soon_threadsafe(callback)` runs callback on the loop, from any thread.
+    - `run_in_background(func, *args, on_done=...)` runs func (a DB query) in a
+      worker thread and hands its Future to `on_done` back on the loop thread.
+    - `add_signal_handler(signum, callback)` runs callback on the loop after a signal.
+    """
+
+    def __init__(self, max_workers: int = 2) -> None:
+        self.selector = selectors.DefaultSelector()
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="leetsolver")
+        self.running = False
+        self.__timers: List[Timer] = []
+        self.__posted: "queue.SimpleQueue[Callable[[], Any]]" = queue.SimpleQueue()
+        # self pipe: other threads (and signal handlers) write a byte to wake `select`
+        self.__wake_r, self.__wake_w = os.pipe()
+        os.set_blocking(self.__wake_r, False)
+        os.set_blocking(self.__wake_w, False)
+        self.selector.register(self.__wake_r, selectors.EVENT_READ, self.__drain_wakeups)
+
+    # sources
+    def add_reader(self, fd: int, callback: Callable[[], Any]) -> None:
+        self.selector.register(fd, selectors.EVENT_READ, callback)
+
+    def remove_reader(self, fd: int) -> None:
+        self.selector.unregister(fd)
+
+    def call_later(self, delay_ms: float, callback: Callable[[], Any]) -> Timer:
+        timer = Timer(time.monotonic() + delay_ms / 1000, callback)
+        heapq.heappush(self.__timers, timer)
+        return timer
+
+    def call_soon_threadsafe(self, callback: Callable[[], Any]) -> None:
+        self.__posted.put(callback)
+        try:
+            os.write(self.__wake_w, b"\0")
+        except BlockingIOError:
+            # the pipe is full, the loop is already going to wake up
+            pass
+
+    def add_signal_handler(self, signum: int, callback: Callable[[], Any]) -> None:
+        signal.signal(signum, lambda *_: self.call_soon_threadsafe(callback))
+
+    def run_in_background(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        on_done: Optional[Callable[[Future], Any]] = None
+    ) -> Future:
+        future = self.executor.submit(func, *args)
+        if on_done is not None:
+            future.add_done_callback(lambda done: self.call_soon_threadsafe(lambda: on_done(done)))
+        return future
+
+    # loop
+    def __drain_wakeups(self) -> None:
+        try:
+            while os.read(self.__wake_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def __timeout(self) -> Optional[float]:
+        while self.__timers and self.__timers[0].cancelled:
+            heapq.heappop(self.__timers)
+        if not self.__posted.empty():
+            return 0
+        if not self.__timers:
+            return None
+        return max(0.0, self.__timers[0].when - time.monotonic())
+
+    def run_once(self) -> None:
+        """Waits for the next event and runs every callback that is ready."""
+        for key, _ in self.selector.select(self.__timeout()):
+            key.data()
+
+        now = time.monotonic()
+        while self.__timers and self.__timers[0].when <= now:
+            timer = heapq.heappop(self.__timers)
+            if not timer.cancelled:
+                timer.callback()
+
+        while not self.__posted.empty():
+            self.__posted.get_nowait()()
+
+    def run(self) -> None:
+        self.running = True
+        while self.running:
+            self.run_once()
+
+    def stop(self) -> None:
+        self.running = False
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.selector.close()
+        os.close(self.__wake_r)
+        os.close(self.__wake_w)
@@ -0,0 +1,170 @@
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Sequence
+
+# fetch(key, forward, limit) -> rows after (forward) or before `key` in list order,
+# key is None for the top (forward) or bottom of the list. See `Database.questions_page`.
+Fetch = Callable[[Optional[Any], bool, int], Sequence[Any]]
+# runs fetch off the UI thread, calls on_done(future) back on it. See `EventLoop.run_in_background`.
+Loader = Callable[..., Any]
+
+
+class VirtualList:
+    """
+    A scrollable list that only holds the visible rows plus `prefetch` rows on
+    either side. When the cursor gets within `prefetch` rows of an edge of the
+    held window the next page is fetched (keyset, from the key of the edge row)
+    and the far side is dropped, so memory and query time per scroll depend on
+    the page size only, never on the length of the list.
+
+    Without a `loader` pages are fetched synchronously, otherwise in the
+    background and merged when they arrive. A move past the held rows stops at
+    the last one and is finished when the page beyond them is merged, so
+    paging faster than the pages load never lands short.
+    """
+
+    def __init__(
+        self,
+        fetch: Fetch,
+        key: Callable[[Any], Any],
+        height: int = 20,
+        prefetch: Optional[int] = None,
+        loader: Optional[Loader] = None
+    ) -> None:
+        self.fetch = fetch
+        self.key = key
+        self.height = max(1, height)
+        self.prefetch = prefetch
+        self.loader = loader
+        self.rows: List[Any] = []
+        self.top = 0        # index in rows of the first visible row
+        self.cursor = 0     # index in rows of the selected row
+        self.at_start = False
+        self.at_end = False
+        self.__pending = {True: False, False: False}
+        self.__generation = 0
+        # rows of the last move still to go once the next page is merged
+        self.__unmoved = 0
+
+    @property
+    def margin(self) -> int:
+        return self.prefetch if self.prefetch is not None else self.height
+
+    @property
+    def selected(self) -> Optional[Any]:
+        return self.rows[self.cursor] if self.rows else None
+
+    def visible(self) -> List[Any]:
+        return self.rows[self.top:self.top + self.height]
+
+    def resize(self, height: int) -> None:
+        height = max(1, height)
+        if height != self.height:
+            self.height = height
+            self.__scroll_to_cursor()
+            self.__prefetch()
+
+    def reload(self) -> None:
+        """Drops the held rows and shows the top of the list (e.g. after the sort changed)."""
+        self.__generation += 1
+        self.__pending = {True: False, False: False}
+        self.__unmoved = 0
+        self.rows, self.top, self.cursor = [], 0, 0
+        self.at_start, self.at_end = True, False
+        self.__load(True, None, self.height + self.margin)
+
+    def move(self, delta: int) -> None:
+        """Moves the cursor by `delta` rows, scrolling and fetching as needed."""
+        if not self.rows:
+            return
+        self.__move_cursor(self.__unmoved + delta)
+        self.__scroll_to_cursor()
+        self.__prefetch()
+
+    def page(self, pages: int) -> None:
+        self.move(pages * self.height)
+
+    # window
+    def __move_cursor(self, delta: int) -> None:
+        target = self.cursor + delta
+        self.cursor = min(max(target, 0), len(self.rows) - 1)
+        rest = target - self.cursor
+        # past an edge of the list there is nothing to wait for
+        waiting = not self.at_end if rest > 0 else not self.at_start
+        self.__unmoved = rest if rest and waiting else 0
+
+    def __scroll_to_cursor(self) -> None:
+        if self.cursor < self.top:
+            self.top = self.cursor
+        elif self.cursor >= self.top + self.height:
+            self.top = self.cursor - self.height + 1
+
+    def __prefetch(self) -> None:
+        if not self.rows:
+            return
+        if not self.at_end and len(self.rows) - (self.top + self.height) < self.margin:
+            self.__load(True, self.key(self.rows[-1]), self.margin)
+        if not self.at_start and self.top < self.margin:
+            self.__load(False, self.key(self.rows[0]), self.margin)
+
+    def __load(self, forward: bool, key: Optional[Any], limit: int) -> None:
+        if self.__pending[forward]:
+            return
+        self.__pending[forward] = True
+        generation = self.__generation
+
+        if self.loader is None:
+            self.__merge(generation, forward, key, limit, self.fetch(key, forward, limit))
+            return
+
+        def on_done(future: Future) -> None:
+            try:
+                rows = future.result()
+            except Exception:
+                # the rows are fetched again on the next scroll towards this edge
+                rows = None
+            self.__merge(generation, forward, key, limit, rows)
+
+        self.loader(self.fetch, key, forward, limit, on_done=on_done)
+
+    def __merge(self, generation: int, forward: bool, key: Optional[Any], limit: int, rows: Optional[Sequence[Any]]) -> None:
+        if generation != self.__generation:
+            return
+        self.__pending[forward] = False
+        edge = (self.rows[-1] if forward else self.rows[0]) if self.rows else None
+        # drop pages whose edge was trimmed away while they were loading
+        if rows is None:
+            # a failed fetch is retried on the next scroll, the move it held up is dropped
+            self.__unmoved = 0
+            return
+        if (edge is None) != (key is None) or (edge is not None and self.key(edge) != key):
+            return
+
+        rows = list(rows)
+        if forward:
+            self.rows.extend(rows)
+            self.at_end = len(rows) < limit
+        else:
+            self.rows[:0] = rows
+            self.top += len(rows)
+            self.cursor += len(rows)
+            self.at_start = len(rows) < limit
+        if self.__unmoved:
+            self.__move_cursor(self.__unmoved)
+            self.__scroll_to_cursor()
+        self.__trim(forward)
+        self.__prefetch()
+
+    def __trim(self, forward: bool) -> None:
+        """Keeps at most `margin` rows beyond the visible ones on the side away from the last fetch."""
+        if forward:
+            extra = self.top - self.margin
+            if extra > 0:
+                del self.rows[:extra]
+                self.top -= extra
+                self.cursor -= extra
+                self.at_start = False
+        else:
+            extra = len(self.rows) - (self.top + self.height + self.margin)
+            if extra > 0:
+                del self.rows[-extra:]
+                self.at_end = False
\ No newline at end of file
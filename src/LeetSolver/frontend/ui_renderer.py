@@ -0,0 +1,104 @@
+import curses
+from typing import Dict, List, Optional, Tuple
+
+# (height, width, y, x) of a region on the screen
+Layout = Tuple[int, int, int, int]
+
+
+class Region:
+    """
+    A boxed curses window with two buffers of its inner area:
+    `back` is what the UI wants to show and `front` is what is on the screen.
+    Drawing only writes into `back`, `flush` sends the changed cells to curses.
+    `win` replaces the window created for the layout (e.g. a stub to time drawing
+    without a terminal).
+    """
+
+    def __init__(self, layout: Layout, border: bool = True, win: Optional["curses.window"] = None) -> None:
+        height, width, y, x = layout
+        self.win = win if win is not None else curses.newwin(height, width, y, x)
+        self.pad = 1 if border else 0
+        self.height = height - 2 * self.pad
+        self.width = width - 2 * self.pad
+        if border:
+            self.win.box()
+        self.back: List[str] = [" " * self.width] * self.height
+        # None means unknown, the row is painted on the next flush
+        self.front: List[Optional[str]] = [None] * self.height
+
+    def clear(self) -> None:
+        self.back = [" " * self.width] * self.height
+
+    def write(self, y: int, x: int, text: str) -> None:
+        """Writes `text` at (y, x) of the inner area, clipped to the region."""
+        if not 0 <= y < self.height or x >= self.width:
+            return
+        if x < 0:
+            text, x = text[-x:], 0
+        text = text[:self.width - x]
+        row = self.back[y]
+        self.back[y] = row[:x] + text + row[x + len(text):]
+
+    def flush(self) -> bool:
+        """
+        Sends the cells that differ between `back` and `front` to the window and
+        marks it for the next `doupdate`. Returns True if anything changed.
+        """
+        changed = False
+        for y, (new, old) in enumerate(zip(self.back, self.front)):
+            if new == old:
+                continue
+            start, end = 0, len(new)
+            if old is not None:
+                while new[start] == old[start]:
+                    start += 1
+                while new[end - 1] == old[end - 1]:
+                    end -= 1
+            try:
+                self.win.addstr(y + self.pad, start + self.pad, new[start:end])
+            except curses.error:
+                # writing the bottom right cell of a borderless window moves the
+                # cursor out of it, the cell itself is still drawn
+                pass
+            self.front[y] = new
+            changed = True
+
+        if changed:
+            self.win.noutrefresh()
+        return changed
+
+
+class Renderer:
+    """
+    Owns the screen regions and pushes only what changed to the terminal:
+    every region is flushed with `noutrefresh` and the screen is updated with a
+    single `doupdate`. Windows are only rebuilt when the layout changes (resize).
+    """
+
+    def __init__(self, stdscr: "curses.window") -> None:
+        self.stdscr = stdscr
+        self.regions: Dict[str, Region] = {}
+        self.pending = False
+
+    def layout(self, layouts: Dict[str, Layout]) -> None:
+        """(Re)creates the regions, e.g. after `KEY_RESIZE`. Everything is repainted once."""
+        for region in self.regions.values():
+            del region.win
+        self.regions = {}
+        self.stdscr.erase()
+        self.stdscr.noutrefresh()
+        for name, layout in layouts.items():
+            self.regions[name] = Region(layout)
+            self.regions[name].win.noutrefresh()
+        self.pending = True
+
+    def __getitem__(self, name: str) -> Region:
+        return self.regions[name]
+
+    def render(self) -> None:
+        """Flushes every region and updates the terminal, if anything changed."""
+        for region in self.regions.values():
+            self.pending |= region.flush()
+        if self.pending:
+            curses.doupdate()
+            self.pending = False
@@ -10,21 +10,28 @@
 # 7. if not correct create the default file in the folder
 # 8. if correct return the databse obeject
 
-from LeetSolver.validators import (
-    validate_sqlite_database,
-    validate_json_file
+# the validators (and what they import) are only loaded when a fingerprint
+# changed, see validate_DIR
+from LeetSolver.fingerprints import (
+    fingerprint_sqlite_database,
+    fingerprint_json_file
 )
 from LeetSolver.error import (
     LeetSolverError,
     FolderValidationError
 )
-from LeetSolver.utils import IsPathReadAndWritable
-from typing import Optional
+from LeetSolver.settings import Settings
+from LeetSolver.backend.database import Database, STATEMENTS, sync_question_tags
+from LeetSolver.utils import IsPathReadAndWritable, schema_hash
+from typing import Dict, Optional
+from importlib import import_module
 from pathlib import Path
+import json
 
 
 # scema and constants and data
 __DIR_NAME = ".leetsolver"
+__FINGERPRINT_FILE = "fingerprint.json"
 
 __DIR_LIST = [
     Path("~").expanduser().resolve(),
@@ -35,10 +42,90 @@ __DEFULT_SETTINGS = {
     "logoid" : 0,
 }
 
+# statements keeping `weekly_summary` in sync with `daily_log`, {row} is NEW or OLD.
+# only successful attempts are counted (failed ones are in the log, not in the summary).
+# the difficulty is read from `questions` at write time, if it is changed later
+# `Database.rebuild_weekly_summary` brings the summary back in sync.
+__WEEKLY_SUMMARY_ADD = (
+    "INSERT INTO weekly_summary (week_start, total_questions, easy_count, medium_count, hard_count) "
+    "SELECT date({row}.date, 'weekday 0', '-6 days'), 1, "
+    "IFNULL((SELECT difficulty = 'Easy' FROM questions WHERE question_id = {row}.question_id), 0), "
+    "IFNULL((SELECT difficulty = 'Medium' FROM questions WHERE question_id = {row}.question_id), 0), "
+    "IFNULL((SELECT difficulty = 'Hard' FROM questions WHERE question_id = {row}.question_id), 0) "
+    "WHERE {row}.success "
+    "ON CONFLICT(week_start) DO UPDATE SET "
+    "total_questions = total_questions + 1, "
+    "easy_count = easy_count + excluded.easy_count, "
+    "medium_count = medium_count + excluded.medium_count, "
+    "hard_count = hard_count + excluded.hard_count; "
+)
+__WEEKLY_SUMMARY_REMOVE = (
+    "UPDATE weekly_summary SET "
+    "total_questions = total_questions - 1, "
+    "easy_count = easy_count - IFNULL((SELECT difficulty = 'Easy' FROM questions WHERE question_id = {row}.question_id), 0), "
+    "medium_count = medium_count - IFNULL((SELECT difficulty = 'Medium' FROM questions WHERE question_id = {row}.question_id), 0), "
+    "hard_count = hard_count - IFNULL((SELECT difficulty = 'Hard' FROM questions WHERE question_id = {row}.question_id), 0) "
+    "WHERE week_start = date({row}.date, 'weekday 0', '-6 days') AND {row}.success; "
+    "DELETE FROM weekly_summary "
+    "WHERE week_start = date({row}.date, 'weekday 0', '-6 days') AND total_questions <= 0; "
+)
+
+# statements keeping the `questions_fts` full-text index in sync with `questions`
+# (external content: the index stores no copy of the text, only the tokens)
+__QUESTIONS_FTS_ADD = (
+    "INSERT INTO questions_fts (rowid, name, tags, notes) "
+    "VALUES ({row}.rowid, {row}.name, {row}.tags, {row}.notes); "
+)
+__QUESTIONS_FTS_REMOVE = (
+    "INSERT INTO questions_fts (questions_fts, rowid, name, tags, notes) "
+    "VALUES ('delete', {row}.rowid, {row}.name, {row}.tags, {row}.notes); "
+)
+
+# imported submissions (the rows with a solved_at) are left to `Database.import_solves`,
+# which summarizes a whole batch with one statement per derived table
+__NOT_IMPORTED = "WHEN NEW.solved_at IS NULL "
+
+# tables whose writes invalidate cached analytics, see `backend.analytics`
+__TRACKED_TABLES = ("questions", "daily_log", "question_tags")
+__CHANGE_COUNTER_BUMP = (
+    "INSERT INTO change_counter (table_name, version) VALUES ('{table}', 1) "
+    "ON CONFLICT(table_name) DO UPDATE SET version = version + 1; "
+)
+
+def backfill_weekly_summary(cursor, schema: Dict) -> None:
+    """
+    v1 upgrade: fills `weekly_summary` from the `daily_log` rows logged before its
+    triggers kept it up to date. v9 upgrade: drops the failed attempts counted until then.
+    """
+    cursor.execute(STATEMENTS["clear_weekly_summary"])
+    cursor.execute(STATEMENTS["rebuild_weekly_summary"])
+
+def split_question_tags(cursor, schema: Dict) -> None:
+    """v4 upgrade: fills `tags` / `question_tags` from the existing `questions.tags` strings."""
+    sync_question_tags(cursor, cursor.execute(
+        "SELECT question_id, tags FROM questions WHERE tags IS NOT NULL;").fetchall())
+
+def rebuild_derived_tables(cursor, schema: Dict) -> None:
+    """
+    After a salvage (see `salvage.py`): rebuilds what is derived from the rows that
+    survived, and bumps every change counter so caches of the old data are dropped.
+    """
+    cursor.execute("DELETE FROM question_tags;")
+    split_question_tags(cursor, schema)
+    backfill_weekly_summary(cursor, schema)
+    for table in __TRACKED_TABLES:
+        cursor.execute(__CHANGE_COUNTER_BUMP.format(table=table))
+
 # make sure scmea is currect degined else riase error
+# bump `__version__` on every change, databases at the current version are not re-validated
 __DEFAULT_SQLITE_SCHEMA = {
-    "__version__": "v1",
-    "__on_upgrade__": None,
+    "__version__": "v9",
+    "__on_upgrade__": {
+        "v1": backfill_weekly_summary,
+        "v4": split_question_tags,
+        "v9": backfill_weekly_summary,
+    },
+    "__on_salvage__": rebuild_derived_tables,
     "Tables": [
         {
             "name": "questions",
@@ -70,7 +157,9 @@ __DEFAULT_SQLITE_SCHEMA = {
                 (2, 'question_id', 'TEXT', 1, None, 0),
                 (3, 'time_taken', 'INTEGER', 0, None, 0),
                 (4, 'success', 'BOOLEAN', 0, None, 0),
-                (5, 'revision_status', 'BOOLEAN', 0, None, 0)
+                (5, 'revision_status', 'BOOLEAN', 0, None, 0),
+                # time of the imported submission, NULL for solves logged in the app
+                (6, 'solved_at', 'TEXT', 0, None, 0)
             ),
             "constraints": {
                 "FOREIGN KEY": [
@@ -80,6 +169,64 @@ __DEFAULT_SQLITE_SCHEMA = {
             },
             "outer_statement": ""
         },
+        {
+            "name": "tags",
+            "columns": (
+                (0, 'tag_id', 'INTEGER', 1, None, 1),
+                (1, 'name', 'TEXT', 1, None, 0)
+            ),
+            "constraints": {
+                "FOREIGN KEY": [],
+                "UNIQUE": [
+                    "UNIQUE (name)"
+                ]
+            },
+            "outer_statement": ""
+        },
+        {
+            # UNIQUE (tag_id, question_id) doubles as the covering tag -> questions index
+            "name": "question_tags",
+            "columns": (
+                (0, 'question_id', 'TEXT', 1, None, 0),
+                (1, 'tag_id', 'INTEGER', 1, None, 0)
+            ),
+            "constraints": {
+                "FOREIGN KEY": [
+                    "FOREIGN KEY(question_id) REFERENCES questions(question_id)",
+                    "FOREIGN KEY(tag_id) REFERENCES tags(tag_id)"
+                ],
+                "UNIQUE": [
+                    "UNIQUE (tag_id, question_id)"
+                ]
+            },
+            "outer_statement": ""
+        },
+        {
+            # bumped by the trg_change_* triggers on every write to a tracked table
+            "name": "change_counter",
+            "columns": (
+                (0, 'table_name', 'TEXT', 1, None, 1),
+                (1, 'version', 'INTEGER', 1, '0', 0)
+            ),
+            "constraints": {
+                "FOREIGN KEY": [],
+                "UNIQUE": []
+            },
+            "outer_statement": " WITHOUT ROWID"
+        },
+        {
+            # last journal entry applied per write-behind journal, see `backend.writebehind`
+            "name": "journal_state",
+            "columns": (
+                (0, 'journal', 'TEXT', 1, None, 1),
+                (1, 'last_seq', 'INTEGER', 1, '0', 0)
+            ),
+            "constraints": {
+                "FOREIGN KEY": [],
+                "UNIQUE": []
+            },
+            "outer_statement": " WITHOUT ROWID"
+        },
         {
             "name": "weekly_summary",
             "columns": (
@@ -97,8 +244,66 @@ __DEFAULT_SQLITE_SCHEMA = {
         }
         
     ],
-    "Triggers": { },
-    "Indexes": { },
+    "VirtualTables": {
+        "questions_fts": (
+            "CREATE VIRTUAL TABLE questions_fts USING fts5(name, tags, notes, "
+            "content='questions', content_rowid='rowid', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            "INSERT INTO questions_fts (questions_fts) VALUES ('rebuild');"
+        ),
+    },
+    "Triggers": {
+        "trg_questions_fts_insert": (
+            "CREATE TRIGGER trg_questions_fts_insert AFTER INSERT ON questions BEGIN "
+            + __QUESTIONS_FTS_ADD.format(row="NEW") + "END;"
+        ),
+        "trg_questions_fts_delete": (
+            "CREATE TRIGGER trg_questions_fts_delete AFTER DELETE ON questions BEGIN "
+            + __QUESTIONS_FTS_REMOVE.format(row="OLD") + "END;"
+        ),
+        "trg_questions_fts_update": (
+            "CREATE TRIGGER trg_questions_fts_update AFTER UPDATE OF name, tags, notes ON questions BEGIN "
+            + __QUESTIONS_FTS_REMOVE.format(row="OLD") + __QUESTIONS_FTS_ADD.format(row="NEW") + "END;"
+        ),
+        "trg_weekly_summary_insert": (
+            "CREATE TRIGGER trg_weekly_summary_insert AFTER INSERT ON daily_log " + __NOT_IMPORTED + "BEGIN "
+            + __WEEKLY_SUMMARY_ADD.format(row="NEW") + "END;"
+        ),
+        "trg_weekly_summary_delete": (
+            "CREATE TRIGGER trg_weekly_summary_delete AFTER DELETE ON daily_log BEGIN "
+            + __WEEKLY_SUMMARY_REMOVE.format(row="OLD") + "END;"
+        ),
+        "trg_weekly_summary_update": (
+            "CREATE TRIGGER trg_weekly_summary_update AFTER UPDATE OF date, question_id, success ON daily_log BEGIN "
+            + __WEEKLY_SUMMARY_REMOVE.format(row="OLD") + __WEEKLY_SUMMARY_ADD.format(row="NEW") + "END;"
+        ),
+        **{
+            f"trg_change_{table}_{event.lower()}": (
+                f"CREATE TRIGGER trg_change_{table}_{event.lower()} AFTER {event} ON {table} "
+                + (__NOT_IMPORTED if (table, event) == ("daily_log", "INSERT") else "")
+                + "BEGIN " + __CHANGE_COUNTER_BUMP.format(table=table) + "END;"
+            )
+            for table in __TRACKED_TABLES for event in ("INSERT", "UPDATE", "DELETE")
+        },
+    },
+    "Indexes": {
+        # covers `Database.time_distribution`
+        "idx_daily_log_date": "CREATE INDEX idx_daily_log_date ON daily_log(date, time_taken);",
+        # covers the per question lookups of `Database.tag_stats`
+        "idx_daily_log_question_date": (
+            "CREATE INDEX idx_daily_log_question_date ON daily_log(question_id, date, success, time_taken);"
+        ),
+        # an imported submission is logged once, see `Database.import_solves`
+        "idx_daily_log_submission": (
+            "CREATE UNIQUE INDEX idx_daily_log_submission ON daily_log(question_id, solved_at) "
+            "WHERE solved_at IS NOT NULL;"
+        ),
+        "idx_question_tags_question": "CREATE INDEX idx_question_tags_question ON question_tags(question_id, tag_id);",
+        # (column, question_id) so the keyset pages of `Database.questions_page` are range scans
+        "idx_questions_difficulty": "CREATE INDEX idx_questions_difficulty ON questions(difficulty, question_id);",
+        "idx_questions_last_solved": "CREATE INDEX idx_questions_last_solved ON questions(last_solved, question_id);",
+        "idx_questions_magic_score": "CREATE INDEX idx_questions_magic_score ON questions(magic_score, question_id);",
+    },
 }
 
 # Warning dont modify
@@ -107,21 +312,20 @@ __REQUIRED_FILES = [
         "var": "settings",
         "name": "settings.json",
         "schema": __DEFULT_SETTINGS,
-        "validate": validate_json_file
+        "validate": "validate_json_file",
+        "fingerprint": fingerprint_json_file
     },
     {
         "var": "database",
         "name": "database.db",
         "schema": __DEFAULT_SQLITE_SCHEMA,
-        "validate": validate_sqlite_database
+        "validate": "validate_sqlite_database",
+        "fingerprint": fingerprint_sqlite_database
     }
 ]
 
 
 # main code
-class Database:
-    pass
-
 def get_dirpath() -> Optional[Path]:
     """
     Get or create the LeetSolver directory path.
@@ -145,36 +349,88 @@ def get_dirpath() -> Optional[Path]:
     
     return None
 
-def validate_DIR(path: Path) -> None:
+def load_fingerprints(path: Path) -> Dict:
+    """
+    Load the fingerprints stored by the last successful validation.
+    A missing or broken fingerprint file is treated as empty (forces full validation).
+    """
+    try:
+        with open(path / __FINGERPRINT_FILE, "r", encoding="utf-8") as file:
+            fingerprints = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return fingerprints if isinstance(fingerprints, dict) else {}
+
+def save_fingerprints(path: Path, fingerprints: Dict) -> None:
+    """
+    Store the fingerprints of the validated files, failing silently since
+    the only cost of a missing fingerprint is a full validation on next start.
+    """
+    try:
+        with open(path / __FINGERPRINT_FILE, "w", encoding="utf-8") as file:
+            json.dump(fingerprints, file, indent=4)
+    except OSError:
+        pass
+
+def validate_DIR(path: Path, revalidate: bool = False) -> Database:
     """
     Validate the directory's required files.
 
     1. Loops through each file in the required file list.
-    2. For each file, runs its associated validation method with the default schema and fix=True.
+    2. For each file, compares its fingerprint (schema hash + cheap file stats) with the
+       one stored by the last successful validation. If both match the file is skipped.
+    3. Otherwise runs its associated validation method (looked up by name in
+       `LeetSolver.validators`, imported on first use) with the default schema and fix=True.
        - If the file is broken, the validation method tries to fix it silently.
        - If the file does not exist, it attempts to create it.
-    3. If validation fails (e.g., unrecoverable error or file can't be fixed/created), 
+    4. If validation fails (e.g., unrecoverable error or file can't be fixed/created), 
        an exception is raised.
-    4. This function catches those exceptions and raises a LeetSolverError instead.
-    5. If the function completes without error, the directory is valid and ready to use.
+    5. This function catches those exceptions and raises a LeetSolverError instead.
+    6. If the function completes without error, the directory is valid and ready to use
+       and the new fingerprints are stored.
+
+    Args:
+        path (Path): The LeetSolver directory.
+        revalidate (bool): Ignore stored fingerprints and force the full validation.
     """
-    database = Database()
+    paths = {}
+    cached = {} if revalidate else load_fingerprints(path)
+    fingerprints = {}
+    
     for file in __REQUIRED_FILES:
+        file_path = path / file['name']
         try:
-            file['validate'](path / file['name'], schema=file['schema'], fix=True)
-            setattr(database, file["var"], path / file['name'])
+            expected = schema_hash(file['schema'])
+            stat = file['fingerprint'](file_path)
+            
+            if stat is None or cached.get(file['name']) != [expected, list(stat)]:
+                validate = getattr(import_module("LeetSolver.validators"), file['validate'])
+                validate(file_path, schema=file['schema'], fix=True, full=revalidate)
+                stat = file['fingerprint'](file_path)
+                
+            paths[file["var"]] = file_path
         except Exception as e:
             raise LeetSolverError(f"Initialization failed due to a technical error: {e}")
-    return database
+        
+        if stat is not None:
+            fingerprints[file['name']] = [expected, list(stat)]
+    
+    if fingerprints != cached:
+        save_fingerprints(path, fingerprints)
+    return Database(**paths)
 
-def init() -> Database:
+def init(revalidate: bool = False) -> Database:
     """
     Initialize the LeetSolver application.
 
     1. Locate or create the required directory for LeetSolver.
-    2. Validate the directory and its required files.
+    2. Validate the directory and its required files, skipping files whose
+       fingerprint did not change since the last validation (unless `revalidate`).
     3. Return a Database object if initialization is successful.
 
+    Args:
+        revalidate (bool): Force the full validation of every required file.
+
     Raises:
         FolderValidationError: If the directory cannot be created or accessed.
         LeetSolverError: If directory validation fails.
@@ -187,4 +443,11 @@ def init() -> Database:
     if path is None:
         raise FolderValidationError("[Error:001] Ensure the /home/user directory has write permissions.")
     
-    return validate_DIR(path)
+    return validate_DIR(path, revalidate)
+
+def load_settings(backend: Database, **kw) -> Settings:
+    """
+    The settings of an initialized directory, parsed once and typed against the
+    default settings. Keywords are passed on to `Settings` (e.g. `debounce_ms`).
+    """
+    return Settings(backend.settings, schema=__DEFULT_SETTINGS, **kw)
\ No newline at end of file
@@ -0,0 +1,217 @@
+# Normalized models of SQLite3 tables, built either from the declared schema dict
+# (see the [SCHEMA DESIGN] notes in validators.py) or from a live database through
+# PRAGMA table_info / foreign_key_list / index_list. Both sides normalize to the
+# same shape so comparing them is a set/dict lookup per column and constraint,
+# used by the validator, the table migration and any diff tooling.
+from typing import Dict, FrozenSet, Optional, Tuple
+import sqlite3
+import re
+
+# (type, notnull, default, pk)
+Column = Tuple[str, bool, Optional[str], bool]
+# ((from columns), referenced table, (referenced columns))
+ForeignKey = Tuple[Tuple[str, ...], str, Tuple[str, ...]]
+
+__FOREIGN_KEY_RE = re.compile(
+    r"FOREIGN\s+KEY\s*\(([^)]*)\)\s*REFERENCES\s+[\"`\[]?(\w+)[\"`\]]?\s*(?:\(([^)]*)\))?",
+    re.IGNORECASE
+)
+__UNIQUE_RE = re.compile(r"UNIQUE\s*\(([^)]*)\)", re.IGNORECASE)
+
+
+def _names(text: Optional[str]) -> Tuple[str, ...]:
+    if not text:
+        return ()
+    return tuple(name.strip().strip("\"`[]").lower() for name in text.split(",") if name.strip())
+
+def _type(text: Optional[str]) -> str:
+    return " ".join((text or "").upper().split())
+
+def _options(text: Optional[str]) -> FrozenSet[str]:
+    # table options such as WITHOUT ROWID or STRICT
+    return frozenset(_type(option) for option in (text or "").split(",") if option.strip())
+
+
+class TableModel:
+    """
+    Normalized structure of one table. Identifiers are lowercase (SQLite compares
+    them case-insensitively) and types are uppercase with single spaces.
+
+    Attributes:
+        name (str): The table name.
+        columns (Dict[str, Column]): Column name to (type, notnull, default, pk), in table order.
+        foreign_keys (Tuple[ForeignKey, ...]): Foreign key constraints.
+        unique (Tuple[Tuple[str, ...], ...]): Column sets of UNIQUE constraints.
+        options (FrozenSet[str]): Table options, e.g. {"WITHOUT ROWID"}.
+    """
+    __slots__ = ("name", "columns", "foreign_keys", "unique", "options")
+
+    def __init__(
+        self,
+        name: str,
+        columns: Dict[str, Column],
+        foreign_keys: Tuple[ForeignKey, ...] = (),
+        unique: Tuple[Tuple[str, ...], ...] = (),
+        options: FrozenSet[str] = frozenset()
+    ) -> None:
+        self.name = name
+        self.columns = columns
+        self.foreign_keys = foreign_keys
+        self.unique = unique
+        self.options = options
+
+    @property
+    def without_rowid(self) -> bool:
+        return "WITHOUT ROWID" in self.options
+
+    def __repr__(self) -> str:
+        return f"TableModel(name={self.name!r}, columns={list(self.columns)!r})"
+
+
+def declared_table_model(table_schema: Dict) -> TableModel:
+    """Builds the model of a table from its schema dict."""
+    options = _options(table_schema.get("outer_statement"))
+    columns = {}
+    for column in table_schema["columns"]:
+        default = None if column[4] is None else str(column[4])
+        # primary key columns of a WITHOUT ROWID table are always NOT NULL
+        notnull = bool(column[3]) or (bool(column[5]) and "WITHOUT ROWID" in options)
+        columns[column[1].lower()] = (_type(column[2]), notnull, default, bool(column[5]))
+
+    # constraints keep the declared order (so issues can point at them by index),
+    # a constraint that cannot be parsed is kept as its raw text and never matches
+    foreign_keys = []
+    for constraint in table_schema["constraints"]["FOREIGN KEY"]:
+        match = __FOREIGN_KEY_RE.search(constraint)
+        foreign_keys.append(
+            (_names(match[1]), match[2].lower(), _names(match[3])) if match else constraint
+        )
+    unique = []
+    for constraint in table_schema["constraints"]["UNIQUE"]:
+        match = __UNIQUE_RE.search(constraint)
+        unique.append(_names(match[1]) if match else constraint)
+
+    return TableModel(
+        table_schema["name"], columns, tuple(foreign_keys), tuple(unique), options
+    )
+
+def read_table_model(cursor: sqlite3.Cursor, name: str) -> Optional[TableModel]:
+    """Builds the model of a table from the database, None if it does not exist."""
+    row = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?;", (name,)
+    ).fetchone()
+    if row is None:
+        return None
+
+    columns = {
+        col[1].lower(): (_type(col[2]), bool(col[3]), col[4], bool(col[5]))
+        for col in cursor.execute(f"PRAGMA table_info({name});").fetchall()
+    }
+
+    # foreign_key_list: (id, seq, table, from, to, on_update, on_delete, match)
+    grouped: Dict[int, list] = {}
+    for fk in cursor.execute(f"PRAGMA foreign_key_list({name});").fetchall():
+        grouped.setdefault(fk[0], []).append(fk)
+    foreign_keys = []
+    for rows in grouped.values():
+        rows.sort(key=lambda fk: fk[1])
+        foreign_keys.append((
+            tuple(fk[3].lower() for fk in rows),
+            rows[0][2].lower(),
+            tuple(fk[4].lower() for fk in rows if fk[4] is not None)
+        ))
+
+    # index_list: (seq, name, unique, origin, partial), origin "u" is a UNIQUE constraint
+    unique = []
+    for index in cursor.execute(f"PRAGMA index_list({name});").fetchall():
+        if index[3] == "u":
+            info = cursor.execute(f"PRAGMA index_info({index[1]});").fetchall()
+            unique.append(tuple(col[2].lower() for col in sorted(info)))
+
+    sql = row[0] or ""
+    return TableModel(
+        name, columns, tuple(foreign_keys), tuple(unique),
+        _options(sql[sql.rfind(")") + 1:])
+    )
+
+def diff_table_models(declared: TableModel, actual: TableModel) -> Dict:
+    """
+    Compares a declared model with the actual one.
+
+    Returns:
+        Dict: with
+            "columns_exists": names of declared columns present in the table,
+            "columns_missing": cids (declared order) of columns not in the table,
+            "columns_mismatch": cids of columns whose definition differs,
+            "columns_extra": names of table columns that are not declared,
+            "FOREIGN KEY" / "UNIQUE": indexes of the declared constraints not in the table,
+            "outer_statement": True if the table options differ.
+    """
+    issues = {
+        "columns_exists": [],
+        "columns_missing": [],
+        "columns_mismatch": [],
+        "columns_extra": [name for name in actual.columns if name not in declared.columns],
+        "FOREIGN KEY": [],
+        "UNIQUE": [],
+        "outer_statement": declared.options != actual.options
+    }
+
+    for cid, (name, column) in enumerate(declared.columns.items()):
+        actual_column = actual.columns.get(name)
+        if actual_column is None:
+            issues["columns_missing"].append(cid)
+            continue
+        issues["columns_exists"].append(name)
+        if actual_column != column:
+            issues["columns_mismatch"].append(cid)
+
+    actual_foreign_keys = set(actual.foreign_keys)
+    for idx, foreign_key in enumerate(declared.foreign_keys):
+        if foreign_key in actual_foreign_keys:
+            continue
+        # a reference without columns points at the primary key, accept either form
+        if isinstance(foreign_key, tuple) and not foreign_key[2] and any(
+            fk[:2] == foreign_key[:2] for fk in actual_foreign_keys):
+            continue
+        issues["FOREIGN KEY"].append(idx)
+
+    actual_unique = set(actual.unique)
+    for idx, columns in enumerate(declared.unique):
+        if columns not in actual_unique:
+            issues["UNIQUE"].append(idx)
+    return issues
+
+
+class SchemaIntrospector:
+    """
+    Reads and caches the models of the tables of one database connection.
+    The cache is dropped whenever `PRAGMA schema_version` changes, so models stay
+    correct across migrations without being rebuilt for every lookup.
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor) -> None:
+        self.cursor = cursor
+        self.__version: Optional[int] = None
+        self.__tables: Optional[FrozenSet[str]] = None
+        self.__models: Dict[str, Optional[TableModel]] = {}
+
+    def __sync(self) -> None:
+        version = self.cursor.execute("PRAGMA schema_version;").fetchone()[0]
+        if version != self.__version:
+            self.__version, self.__tables, self.__models = version, None, {}
+
+    def tables(self) -> FrozenSet[str]:
+        """Names of every table in the database."""
+        self.__sync()
+        if self.__tables is None:
+            self.__tables = frozenset(row[0] for row in self.cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table';").fetchall())
+        return self.__tables
+
+    def table(self, name: str) -> Optional[TableModel]:
+        """The model of a table, None if it does not exist."""
+        self.__sync()
+        if name not in self.__models:
+            self.__models[name] = read_table_model(self.cursor, name)
+        return self.__models[name]
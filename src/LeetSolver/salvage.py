@@ -0,0 +1,447 @@
+# Recovery of the rows still readable in a corrupted SQLite3 database.
+#
+# Every declared table is read with keyset scans (`rowid >= ?` in batches) into a
+# fresh database. When a scan hits a damaged page the next readable rowid is
+# searched for (exponential probing, then bisection) and the scan resumes from
+# it, so one bad page only costs the rows it held. Past a damaged interior page
+# nothing can be sought to, what is left is read backwards from the end. Tables
+# without rowid are scanned by primary key from both ends. If not even the schema can be read, the
+# `.recover` command of the sqlite3 shell is used when it is installed.
+# Memory use is one batch, whatever the size of the database.
+from LeetSolver.validators import create_sqlite_table_query
+from LeetSolver.introspect import declared_table_model, read_table_model
+from LeetSolver.connection import is_busy_error
+from LeetSolver.error import ValidationError
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from pathlib import Path
+import subprocess
+import datetime
+import sqlite3
+import shutil
+import json
+import os
+
+BATCH_SIZE = 5000
+__MIN_ROWID = -2 ** 63
+__MAX_ROWID = 2 ** 63 - 1
+# SQLITE_CORRUPT and SQLITE_NOTADB, extended codes keep them in the low byte
+__CORRUPTION_CODES = (11, 26)
+
+
+def is_corruption_error(error: sqlite3.DatabaseError) -> bool:
+    """True if the error says the file is damaged (not e.g. locked or read only)."""
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in __CORRUPTION_CODES
+    message = str(error).lower()
+    return "malformed" in message or "not a database" in message
+
+def sqlite_database_is_damaged(sqlite3_fp: Path, check_pages: bool = False) -> bool:
+    """
+    True if the database cannot be opened, or with `check_pages` if
+    `PRAGMA quick_check` (a read of every page, no index cross checks) fails.
+    """
+    try:
+        conn = sqlite3.connect(f"{sqlite3_fp.resolve().as_uri()}?mode=ro", uri=True, timeout=5)
+        try:
+            conn.execute("PRAGMA user_version;").fetchone()
+            return check_pages and conn.execute("PRAGMA quick_check(1);").fetchone()[0] != "ok"
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:
+        if is_corruption_error(e):
+            return True
+        raise
+
+def sqlite_database_in_use(sqlite3_fp: Path) -> bool:
+    """
+    True if another connection holds a lock on the database, which every connection
+    in WAL mode does as long as it is open. The exclusive lock taken to find out is
+    released right away.
+    """
+    conn = sqlite3.connect(str(sqlite3_fp), timeout=0, isolation_level=None)
+    try:
+        # in WAL mode only an exclusive locking mode conflicts with idle connections
+        conn.execute("PRAGMA locking_mode = EXCLUSIVE;")
+        conn.execute("BEGIN EXCLUSIVE;")
+        conn.execute("ROLLBACK;")
+    except sqlite3.DatabaseError as e:
+        if is_busy_error(e):
+            return True
+        # a file nobody can open is not in use
+        if is_corruption_error(e):
+            return False
+        raise
+    finally:
+        conn.close()
+    return False
+
+def _count_rows(source: sqlite3.Connection, table: str) -> Optional[int]:
+    """
+    Number of rows of a table, counted through one of its (full) indexes the damage
+    did not reach, else through the table itself. None if every count fails.
+    """
+    try:
+        indexes = [row[1] for row in source.execute(f"PRAGMA index_list({table});") if not row[4]]
+    except sqlite3.DatabaseError as e:
+        if not is_corruption_error(e):
+            raise
+        indexes = []
+    for index in indexes + [None]:
+        indexed = f" INDEXED BY {index}" if index else ""
+        try:
+            return source.execute(f"SELECT COUNT(*) FROM {table}{indexed};").fetchone()[0]
+        except sqlite3.DatabaseError as e:
+            if not is_corruption_error(e):
+                raise
+    return None
+
+def _probe(source: sqlite3.Connection, table: str, start: int) -> Tuple[bool, Optional[int]]:
+    """(readable, first rowid >= start) where the rowid is None past the end."""
+    try:
+        row = source.execute(
+            f"SELECT rowid FROM {table} WHERE rowid >= ? ORDER BY rowid LIMIT 1;", (start,)
+        ).fetchone()
+    except sqlite3.DatabaseError as e:
+        if not is_corruption_error(e):
+            raise
+        return False, None
+    return True, row[0] if row else None
+
+def _next_readable_rowid(source: sqlite3.Connection, table: str, after: int) -> Tuple[int, Optional[int]]:
+    """
+    Where to resume a scan that failed after the row `after`.
+
+    Returns:
+        Tuple: (first rowid given up, rowid to resume from), the latter None if
+            nothing after `after` can be read.
+    """
+    readable, rowid = _probe(source, table, after + 1)
+    if readable:
+        # the key of the next row is readable but its content is not, skip that row only
+        return (rowid, rowid + 1) if rowid is not None and rowid < __MAX_ROWID else (after + 1, None)
+
+    # the seek itself fails: find a start past the damaged pages, then the closest one
+    lo, step = after + 1, 1
+    while True:
+        hi = min(after + step, __MAX_ROWID)
+        readable, rowid = _probe(source, table, hi)
+        if readable:
+            break
+        if hi == __MAX_ROWID:
+            return after + 1, None
+        lo, step = hi, step * 2
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        ok, first = _probe(source, table, mid)
+        if ok:
+            hi, rowid = mid, first
+        else:
+            lo = mid
+    return after + 1, rowid
+
+def _add_skipped(skipped: List, first: int, last: Optional[int]) -> None:
+    if last is not None and last < first:
+        return
+    if skipped and skipped[-1][1] is not None and skipped[-1][1] + 1 >= first:
+        # one range per run of damaged pages
+        first = skipped.pop()[0]
+    skipped.append((first, last))
+
+def _scan_by_rowid(
+    source: sqlite3.Connection, table: str, columns: List[str], batch_size: int, skipped: List
+) -> Iterator[List[Tuple]]:
+    """
+    Batches of (rowid, *columns), skipped (first, last) rowid ranges are appended to
+    `skipped`. When nothing past a damaged page can be sought to, the rows that are
+    still reachable from the end of the table are read backwards.
+    """
+    select = f"SELECT rowid, {', '.join(columns)} FROM {table} WHERE rowid >= ? ORDER BY rowid LIMIT ?;"
+    start = __MIN_ROWID
+    while True:
+        rows = []
+        try:
+            for row in source.execute(select, (start, batch_size)):
+                rows.append(row)
+        except sqlite3.DatabaseError as e:
+            if not is_corruption_error(e):
+                raise
+            if rows:
+                yield rows
+            after = rows[-1][0] if rows else start - 1
+            first, start = _next_readable_rowid(source, table, after)
+            if start is None:
+                lowest = yield from _scan_by_rowid_backwards(source, table, columns, after, batch_size)
+                _add_skipped(skipped, first, None if lowest is None else lowest - 1)
+                return
+            _add_skipped(skipped, first, start - 1)
+            continue
+        if rows:
+            yield rows
+        if len(rows) < batch_size or rows[-1][0] == __MAX_ROWID:
+            return
+        start = rows[-1][0] + 1
+
+def _scan_by_rowid_backwards(
+    source: sqlite3.Connection, table: str, columns: List[str], after: int, batch_size: int
+) -> Iterator[List[Tuple]]:
+    """Batches of the rows above `after` read from the end down, returns the lowest rowid read."""
+    select = (
+        f"SELECT rowid, {', '.join(columns)} FROM {table} "
+        "WHERE rowid > ? AND rowid <= ? ORDER BY rowid DESC LIMIT ?;"
+    )
+    upper, lowest = __MAX_ROWID, None
+    while True:
+        rows = []
+        try:
+            for row in source.execute(select, (after, upper, batch_size)):
+                rows.append(row)
+        except sqlite3.DatabaseError as e:
+            if not is_corruption_error(e):
+                raise
+            damaged = True
+        else:
+            damaged = False
+        if rows:
+            yield rows
+            lowest = rows[-1][0]
+            upper = lowest - 1
+        if damaged or len(rows) < batch_size:
+            return lowest
+
+def _scan_by_key(
+    source: sqlite3.Connection, table: str, columns: List[str], key: List[str], batch_size: int, skipped: List
+) -> Iterator[List[Tuple]]:
+    """
+    Batches of rows of a WITHOUT ROWID table in primary key order, from the start
+    until a damaged page, then from the end backwards down to the same point.
+    The (last key read forward, last key read backward) range is appended to `skipped`.
+    """
+    positions = [columns.index(name) for name in key]
+    keys = f"({', '.join(key)})"
+    marks = f"({', '.join('?' * len(key))})"
+    edges: Dict[bool, Optional[Tuple]] = {True: None, False: None}
+
+    for forward in (True, False):
+        while True:
+            bounds = [(">", edges[True]), ("<", edges[False])]
+            where = [f"{keys} {op} {marks}" for op, edge in bounds if edge is not None]
+            params = [value for _, edge in bounds if edge is not None for value in edge]
+            order = ", ".join(name if forward else f"{name} DESC" for name in key)
+            query = (
+                f"SELECT {', '.join(columns)} FROM {table} "
+                f"{'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY {order} LIMIT ?;"
+            )
+            rows = []
+            try:
+                for row in source.execute(query, (*params, batch_size)):
+                    rows.append(row)
+            except sqlite3.DatabaseError as e:
+                if not is_corruption_error(e):
+                    raise
+                damaged = True
+            else:
+                damaged = False
+            if rows:
+                yield rows
+                edges[forward] = tuple(rows[-1][i] for i in positions)
+            if damaged:
+                if not forward:
+                    skipped.append((edges[True], edges[False]))
+                    return
+                break
+            if len(rows) < batch_size:
+                # read up to the other edge without damage
+                return
+
+def _copy_table(
+    source: sqlite3.Connection, target: sqlite3.Connection, table_schema: Dict, batch_size: int
+) -> Dict[str, Any]:
+    name = table_schema["name"]
+    report: Dict[str, Any] = {"status": "ok", "recovered": 0, "lost": 0, "skipped": []}
+    try:
+        model = read_table_model(source.cursor(), name)
+    except sqlite3.DatabaseError as e:
+        if not is_corruption_error(e):
+            raise
+        model = None
+    declared = declared_table_model(table_schema)
+    columns = [column for column in declared.columns if model is not None and column in model.columns]
+    if not columns:
+        report["status"] = "unreadable"
+        return report
+
+    # same rule as the migration: rowid is kept unless a column already is the rowid
+    aliased = any(col[5] and col[2].upper() == "INTEGER" for col in table_schema["columns"])
+    by_rowid = not model.without_rowid
+    copy_rowid = by_rowid and not (declared.without_rowid or aliased)
+    insert_columns = (["rowid"] if copy_rowid else []) + columns
+    insert = (
+        f"INSERT OR IGNORE INTO {name} ({', '.join(insert_columns)}) "
+        f"VALUES ({', '.join('?' * len(insert_columns))});"
+    )
+
+    skipped: List[Tuple] = []
+    if by_rowid:
+        batches = _scan_by_rowid(source, name, columns, batch_size, skipped)
+    else:
+        key = [column for column, col in model.columns.items() if col[3] and column in columns]
+        batches = _scan_by_key(source, name, columns, key or columns, batch_size, skipped)
+
+    read = 0
+    for rows in batches:
+        read += len(rows)
+        if by_rowid and not copy_rowid:
+            rows = [row[1:] for row in rows]
+        before = target.total_changes
+        target.execute("BEGIN;")
+        target.executemany(insert, rows)
+        target.execute("COMMIT;")
+        inserted = target.total_changes - before
+        # rows the new table rejects (constraints) are lost too
+        report["recovered"] += inserted
+        report["lost"] += len(rows) - inserted
+
+    if skipped:
+        report["status"] = "damaged"
+        # the rows of the damaged pages, whatever gaps deletes left in the rowids
+        total = _count_rows(source, name)
+        report["lost"] = None if total is None else report["lost"] + max(total - read, 0)
+        if by_rowid:
+            # a range open at the start means "from the first row"
+            skipped = [(None if first == __MIN_ROWID else first, last) for first, last in skipped]
+        report["skipped"] = [list(bounds) for bounds in skipped]
+    return report
+
+def _recover_with_shell(broken_fp: Path, recovered_fp: Path) -> bool:
+    """
+    Pipes the `.recover` output of the sqlite3 shell into a new database.
+    False if the shell is not installed or the recovery failed.
+    """
+    shell = shutil.which("sqlite3")
+    if shell is None:
+        return False
+    try:
+        recover = subprocess.Popen([shell, str(broken_fp), ".recover"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        load = subprocess.run([shell, str(recovered_fp)], stdin=recover.stdout, capture_output=True)
+        recover.stdout.close()
+        # shells built without the recovery extension reject the command
+        recovered = recover.wait() == 0
+    except OSError:
+        return False
+    return recovered and load.returncode == 0 and recovered_fp.is_file()
+
+def salvage_sqlite_database(
+    broken_fp: Path, target_fp: Path, schema: Dict, batch_size: int = BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Copies every row still readable in `broken_fp` into a new database at `target_fp`.
+
+    1. The tables of `schema` are created in the new database, with no index or
+       trigger so the copy is a plain append (the validator adds them afterwards).
+    2. Each table is scanned in batches of `batch_size` rows, skipping damaged
+       pages, only the columns declared in the schema are kept. When the schema of
+       the broken file cannot be read at all, the file is first rebuilt with the
+       `.recover` command of the sqlite3 shell (if installed) and read from there.
+    3. `PRAGMA user_version` is carried over and the schema's `__on_salvage__`
+       callable(cursor, schema) runs last, to rebuild data derived from the
+       copied rows (e.g. summaries that now count lost rows).
+
+    Args:
+        broken_fp (Path): The damaged database, only read.
+        target_fp (Path): Where the new database is created, must not exist.
+        schema (Dict): The schema the new database follows.
+        batch_size (int): Rows read and written per batch.
+
+    Returns:
+        Dict: {"method": "scan" | "recover" | "none", "user_version": int,
+            "tables": {name: {"status", "recovered", "lost", "skipped"}}}, where
+            "lost" counts the rows that could not be read (counted through an
+            index, None if no count could be read) and the rejected rows,
+            a None bound of a skipped range is the start or end of the table.
+    """
+    report: Dict[str, Any] = {"method": "scan", "user_version": 0, "tables": {}}
+    recovered_fp = target_fp.with_name(target_fp.name + ".recovered")
+    source = sqlite3.connect(f"{broken_fp.resolve().as_uri()}?mode=ro", uri=True, timeout=5)
+    target = sqlite3.connect(str(target_fp), isolation_level=None)
+    try:
+        # the new file is only swapped in once complete, nothing to journal
+        target.execute("PRAGMA journal_mode = MEMORY;")
+        target.execute("PRAGMA synchronous = OFF;")
+        try:
+            tables = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+            report["user_version"] = source.execute("PRAGMA user_version;").fetchone()[0]
+        except sqlite3.DatabaseError as e:
+            if not is_corruption_error(e):
+                raise
+            source.close()
+            report["method"], tables = "none", set()
+            if _recover_with_shell(broken_fp, recovered_fp):
+                source = sqlite3.connect(str(recovered_fp))
+                report["method"] = "recover"
+                tables = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+            else:
+                source = sqlite3.connect(":memory:")
+
+        for table_schema in schema["Tables"]:
+            target.execute(create_sqlite_table_query(table_schema))
+            if table_schema["name"] in tables:
+                report["tables"][table_schema["name"]] = _copy_table(source, target, table_schema, batch_size)
+            else:
+                status = "unreadable" if report["method"] == "none" else "missing"
+                report["tables"][table_schema["name"]] = {"status": status, "recovered": 0, "lost": 0, "skipped": []}
+
+        target.execute(f"PRAGMA user_version = {int(report['user_version'])};")
+        on_salvage = schema.get("__on_salvage__")
+        if on_salvage is not None:
+            cursor = target.cursor()
+            cursor.execute("BEGIN;")
+            on_salvage(cursor, schema)
+            cursor.execute("COMMIT;")
+    finally:
+        source.close()
+        target.close()
+        try:
+            recovered_fp.unlink()
+        except OSError:
+            pass
+    return report
+
+def salvage_sqlite_file(sqlite3_fp: Path, schema: Dict, batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Replaces a corrupted database with the rows salvaged from it.
+
+    The broken file (and its -wal / -shm) is renamed to `<name>.corrupt-<time>` and
+    kept, the salvaged copy takes its place and the report is written next to the
+    broken file as `<name>.corrupt-<time>.report.json`.
+
+    Raises:
+        ValidationError: If another process has the database open, it would keep
+            writing to the renamed file.
+
+    Returns:
+        Dict: The report of `salvage_sqlite_database`, plus "corrupt_file".
+    """
+    if sqlite_database_in_use(sqlite3_fp):
+        raise ValidationError(
+            "sqlite3 database", "the sqlite3 database is damaged and open in another process, close it to repair it"
+        )
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    broken_fp = sqlite3_fp.with_name(f"{sqlite3_fp.name}.corrupt-{stamp}")
+    salvage_fp = sqlite3_fp.with_name(f"{sqlite3_fp.name}.salvage")
+    for suffix in ("", "-wal", "-shm"):
+        if Path(f"{sqlite3_fp}{suffix}").exists():
+            os.replace(f"{sqlite3_fp}{suffix}", f"{broken_fp}{suffix}")
+    for leftover in (salvage_fp, Path(f"{salvage_fp}-journal")):
+        if leftover.exists():
+            leftover.unlink()
+
+    report = salvage_sqlite_database(broken_fp, salvage_fp, schema, batch_size)
+    os.replace(salvage_fp, sqlite3_fp)
+    report["corrupt_file"] = str(broken_fp)
+    try:
+        with open(f"{broken_fp}.report.json", "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=4)
+    except OSError:
+        pass
+    return report
\ No newline at end of file
@@ -0,0 +1,206 @@
+# settings.json kept in memory.
+#
+# The file is parsed once and its values are typed against a schema of defaults, so
+# `get()` is a dict lookup the TUI can call on every frame. Edits made by hand while
+# the app runs are noticed by `poll()`, a single stat (mtime, size), and changes made
+# by the app are written back atomically after `debounce_ms` of quiet, so scrolling
+# through logos does not write the file once per keypress.
+from LeetSolver.fingerprints import fingerprint_json_file
+from LeetSolver.utils import atomic_write_json, validate_json_data
+from LeetSolver.error import LeetSolverError, ValidationError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pathlib import Path
+import threading
+import json
+
+DEBOUNCE_MS = 500
+__MISSING = object()
+
+
+def read_settings_file(settings_fp: Path) -> Optional[Dict[str, Any]]:
+    """The settings in the file, None if it is missing or not a JSON object."""
+    try:
+        with open(settings_fp, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+def changed_settings(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """The keys of `new` whose value differs from `old`, with their new value."""
+    return {key: value for key, value in new.items() if old.get(key, __MISSING) != value}
+
+
+class Settings:
+    """
+    In memory settings backed by a JSON file.
+
+    Values missing from the file or of another type than the default in `schema`
+    read as that default. `set()` only changes memory and schedules a write
+    `debounce_ms` later (moved back by every further `set()`), `flush()` writes right
+    away. Writes are merged onto what is on disk at that moment, so keys edited
+    by hand in the meantime are kept.
+
+    A file that cannot be parsed (e.g. saved halfway by an editor) keeps the last
+    good values until it changes again.
+
+    Args:
+        settings_fp (Path): The settings.json file.
+        schema (Optional[Dict]): Default value of every known key.
+        debounce_ms (float): Quiet time before changes are written.
+        call_later (Optional[Callable]): `call_later(delay_ms, callback)` returning
+            something with a `cancel()` (e.g. `EventLoop.call_later`) to run the
+            writes on, a daemon thread timer is used when None.
+    """
+
+    def __init__(
+        self,
+        settings_fp: Path,
+        schema: Optional[Dict[str, Any]] = None,
+        debounce_ms: float = DEBOUNCE_MS,
+        call_later: Optional[Callable[[float, Callable[[], Any]], Any]] = None
+    ) -> None:
+        self.settings_fp = Path(settings_fp)
+        self.schema = dict(schema or {})
+        self.debounce_ms = debounce_ms
+        self.call_later = call_later
+        self.__lock = threading.RLock()
+        self.__values: Dict[str, Any] = {}
+        # keys set in memory and not written yet
+        self.__pending: Dict[str, Any] = {}
+        self.__fingerprint: Optional[Tuple[int, int]] = None
+        self.__timer: Any = None
+        self.__listeners: List[Callable[[Dict[str, Any]], Any]] = []
+        # why the last debounced write failed, None once one succeeds
+        self.error: Optional[LeetSolverError] = None
+        self.reload()
+
+    @property
+    def pending(self) -> int:
+        return len(self.__pending)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """The value of `key` (no I/O), `default` if neither the file nor the schema has it."""
+        return self.__values.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.__values[key]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__values)
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], Any]) -> None:
+        """Calls `callback(changed)` with the changed keys after every change or reload."""
+        self.__listeners.append(callback)
+
+    def __notify(self, changed: Dict[str, Any]) -> None:
+        if changed:
+            for callback in self.__listeners:
+                callback(changed)
+
+    def reload(self) -> Dict[str, Any]:
+        """
+        Parses the file again, values set but not written yet are kept.
+
+        Returns:
+            Dict[str, Any]: The keys whose value changed, with their new value.
+        """
+        with self.__lock:
+            fingerprint = fingerprint_json_file(self.settings_fp)
+            data = read_settings_file(self.settings_fp)
+            self.__fingerprint = fingerprint
+            if data is None:
+                if self.__values:
+                    return {}
+                data = {}
+            validate_json_data(data, self.schema)
+            data.update(self.__pending)
+            changed = changed_settings(self.__values, data)
+            self.__values = data
+        self.__notify(changed)
+        return changed
+
+    def poll(self) -> Dict[str, Any]:
+        """
+        Reloads the file if its mtime or size changed since it was last read or
+        written, one `stat` otherwise.
+
+        Returns:
+            Dict[str, Any]: The keys whose value changed, with their new value.
+        """
+        if fingerprint_json_file(self.settings_fp) == self.__fingerprint:
+            return {}
+        return self.reload()
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Changes a value in memory and schedules writing it.
+
+        Raises:
+            ValidationError: If `value` is not of the type of the default in the schema.
+        """
+        if key in self.schema and not isinstance(value, type(self.schema[key])):
+            raise ValidationError(
+                "settings", f"'{key}' must be {type(self.schema[key]).__name__}, "
+                f"got {type(value).__name__}"
+            )
+        with self.__lock:
+            if key in self.__values and self.__values[key] == value:
+                return
+            self.__values = dict(self.__values, **{key: value})
+            self.__pending[key] = value
+            self.__schedule()
+        self.__notify({key: value})
+
+    def __schedule(self) -> None:
+        if self.__timer is not None:
+            self.__timer.cancel()
+        if self.call_later is not None:
+            self.__timer = self.call_later(self.debounce_ms, self.__flush_scheduled)
+        else:
+            self.__timer = threading.Timer(self.debounce_ms / 1000, self.__flush_scheduled)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    def __flush_scheduled(self) -> None:
+        # nobody waits on a debounced write, a failure is kept for the caller to show
+        # and the changes are written with the next one
+        try:
+            self.flush()
+            self.error = None
+        except LeetSolverError as e:
+            self.error = e
+
+    def flush(self) -> bool:
+        """
+        Writes the pending changes now.
+
+        Raises:
+            LeetSolverError: If the file could not be written, the changes stay pending.
+
+        Returns:
+            bool: True if something was written.
+        """
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            if not self.__pending:
+                return False
+            on_disk = read_settings_file(self.settings_fp)
+            data = dict(self.__values) if on_disk is None else dict(on_disk, **self.__pending)
+            try:
+                atomic_write_json(self.settings_fp, data)
+            except OSError as e:
+                raise LeetSolverError(f"Could not write the settings '{self.settings_fp}'", cause=e)
+            self.__fingerprint = fingerprint_json_file(self.settings_fp)
+            self.__pending = {}
+            validate_json_data(data, self.schema)
+            changed = changed_settings(self.__values, data)
+            self.__values = data
+        self.__notify(changed)
+        return True
+
+    def close(self) -> None:
+        """Writes what is still pending."""
+        self.flush()
\ No newline at end of file
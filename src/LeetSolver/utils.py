@@ -5,9 +5,16 @@ from typing import (
     Tuple,
     Iterator,
     Optional,
+    Callable,
     Any
 )
+from itertools import accumulate
+from bisect import bisect_right
 from pathlib import Path
+import threading
+import time
+import zlib
+import json
 import os
 
 
@@ -30,49 +37,161 @@ def remove_whitespace(test: str, lowercase: bool = True) -> str:
     processed = ''.join(char for char in test if not char.isspace())
     return processed.lower() if lowercase else processed
 
-def analyis_logo_data(data:List[str]):
-    return (
-        [
-            ("╭───╮                   ", "◉ ◉ |   leet solver     ", "╰───╯ Solve|Learn|Repeat", "  0                     "),
-            ("╭───╮                   ", "- - |   leet solver     ", "╰───╯ Solve|Learn|Repeat", "  0                     ")
-        ],
-        [800, 200]
+def schema_hash(schema: Any) -> str:
+    """
+    Returns a stable hash of a schema dict, so it can be stored and compared across runs.
+    Callables (e.g. `__on_upgrade__`) are hashed by their qualified name.
+    It only detects changes, so a crc32 is enough (and zlib loads much faster than hashlib).
+    """
+    encoded = json.dumps(
+        schema, sort_keys=True,
+        default=lambda obj: getattr(obj, "__qualname__", repr(obj))
     )
+    return f"{zlib.crc32(encoded.encode('utf-8')):08x}"
+
+def atomic_write_json(path: Path, data: Any, indent: Optional[int] = 4) -> None:
+    """
+    Writes `data` as JSON to a temporary file next to `path`, fsyncs it and renames it
+    over `path`, so readers (and a crash) see either the old or the new file, never
+    a half written one.
+
+    Raises:
+        OSError: If the file could not be written, `path` is then left untouched.
+    """
+    path = Path(path)
+    # one temporary file per writer, two threads saving at once must not share it
+    temp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=indent)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            temp.unlink()
+        except OSError:
+            pass
+        raise
+
+def validate_json_data(json_data: Dict, schema: Dict) -> bool:
+    """
+    Fills missing keys of `json_data` and replaces values of the wrong type with the
+    defaults of `schema` (nested dicts recursively), in place.
+    Returns True if the data was modified.
+    """
+    modified = False
+    
+    for key, schema_value in schema.items():
+        if key not in json_data:
+            modified, json_data[key] = True, schema_value
+            
+        elif isinstance(schema_value, dict) and isinstance(json_data.get(key), dict):
+            modified |= validate_json_data(json_data[key], schema_value)
+            
+        elif not isinstance(json_data[key], type(schema_value)):
+            modified, json_data[key] = True, schema_value
+
+    return modified
 
-class ListNode:
-    def __init__(self, var:Any = None, next_node:Optional[ListNode] = None) -> None:
-        self.var = var 
-        self.next = next_node
+def analyis_logo_data(data:List[str], height:int = 5, width:int = 25) -> Tuple[List[Tuple[str, ...]], List[int]]:
+    """
+    Parses a logo definition into its frames and their durations.
+
+    A definition is a list of lines where `@ <ms>` starts a new frame shown for
+    <ms> milliseconds, followed by the rows of that frame.
+
+    Returns:
+        Tuple: (frames, timestamps), each frame a tuple of its rows.
+
+    Raises:
+        ValueError: If there is no frame, a duration is not a positive integer
+            or a frame is larger than `height` x `width`.
+    """
+    frames: List[List[str]] = []
+    timestamps: List[int] = []
+    for line in data:
+        if line.startswith("@"):
+            duration = int(line[1:])
+            if duration <= 0:
+                raise ValueError(f"frame {len(frames)} has a non positive duration")
+            frames.append([])
+            timestamps.append(duration)
+        elif not frames:
+            raise ValueError("logo row before the first '@ <ms>' frame header")
+        else:
+            frames[-1].append(line)
+
+    if not frames:
+        raise ValueError("logo has no frames")
+    for idx, rows in enumerate(frames):
+        if len(rows) > height or any(len(row) > width for row in rows):
+            raise ValueError(f"frame {idx} is larger than {height}x{width}")
+    return [tuple(rows) for rows in frames], timestamps
+
+def pad_logo_frame(rows:Tuple[str, ...], height:int = 5, width:int = 25, margin:int = 1) -> Tuple[str, ...]:
+    """Pads a frame to `height` x `width` plus `margin` blank cells on every side."""
+    blank = " " * (width + 2 * margin)
+    body = [row.ljust(width) for row in rows] + [" " * width] * (height - len(rows))
+    return (
+        (blank,) * margin
+        + tuple(" " * margin + row + " " * margin for row in body)
+        + (blank,) * margin
+    )
 
 class Animation:
-    def __init__(self, ms_per_call:int, frames:List[str], timestamps:List[int]) -> None:
-        self.mspc = ms_per_call
-        self.head = self.__load_frames(frames, timestamps)
-        self.current = self.head
-        self.ctime = 0
+    """
+    Frames and how long (ms) each one stays on screen, stored in flat lists:
+    `frames[i]` is shown from `starts[i]` until `starts[i + 1]` of every cycle.
+    Nothing advances on its own, callers ask which frame is shown at a time `t`
+    and how long until it changes, so they can sleep exactly that long.
+    """
+    def __init__(self, frames:List[Any], timestamps:List[int]) -> None:
+        self.frames = list(frames)
+        self.starts = list(accumulate(timestamps[:-1], initial=0))
+        self.cycle = sum(timestamps)
     
-    def __load_frames(self, frames:List[str], timestamps:List[int]) -> Optional[ListNode]:
-        dummy = curr = ListNode()
-        for data in zip(frames, timestamps):
-            curr.next = ListNode(data)
-            curr = curr.next
-        return dummy.next
+    def index_at(self, t:float) -> int:
+        return bisect_right(self.starts, t % self.cycle) - 1 if self.cycle else 0
     
-    def __iter__(self):
-        return self
+    def frame_at(self, t:float) -> Any:
+        """The frame shown `t` ms after the animation started."""
+        return self.frames[self.index_at(t)] if self.frames else None
     
-    def __next__(self) -> Optional[str]:
-        
-        if self.current is None:
-            self.current = self.head
-            self.ctime = 0
-
-        self.ctime += self.mspc
-        
-        if self.ctime < self.current.var[1]:
+    def ms_until_next(self, t:float) -> Optional[float]:
+        """Ms from `t` until the shown frame changes, None if it never does."""
+        if len(self.frames) < 2 or not self.cycle:
             return None
-        
-        frame = self.current.var[0]
-        self.ctime = 0
-        self.current = self.current.next
-        return frame
\ No newline at end of file
+        index = self.index_at(t)
+        end = self.starts[index + 1] if index + 1 < len(self.starts) else self.cycle
+        return end - t % self.cycle
+
+
+class AnimationClock:
+    """
+    One clock shared by several animations, so the UI needs a single timer:
+    `frames()` gives every animation's current frame and `ms_until_next()` the
+    time until the first of them changes.
+    """
+    def __init__(self, clock:Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.start = clock()
+        self.animations: Dict[str, Animation] = {}
+    
+    def now(self) -> float:
+        return (self.clock() - self.start) * 1000
+    
+    def add(self, name:str, animation:Animation) -> None:
+        self.animations[name] = animation
+    
+    def frames(self, now:Optional[float] = None) -> Dict[str, Any]:
+        now = self.now() if now is None else now
+        return {name: animation.frame_at(now) for name, animation in self.animations.items()}
+    
+    def ms_until_next(self, now:Optional[float] = None) -> Optional[float]:
+        now = self.now() if now is None else now
+        waits = [
+            wait for wait in (animation.ms_until_next(now) for animation in self.animations.values())
+            if wait is not None
+        ]
+        return min(waits) if waits else None
\ No newline at end of file
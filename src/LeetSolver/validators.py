@@ -2,11 +2,27 @@ from LeetSolver.utils import (
     IsPathReadAndWritable,
     IsVersionCompatible,
     remove_whitespace,
+    atomic_write_json,
+    validate_json_data,
+)
+from LeetSolver.introspect import (
+    SchemaIntrospector,
+    declared_table_model,
+    diff_table_models
 )
 from LeetSolver.error import (
+    LeetSolverError,
     ValidationError, 
     PermissionErrorLS
 )
+# the fingerprints live in their own module so startup can check them without
+# importing the validators, they are re-exported here
+from LeetSolver.fingerprints import (
+    fingerprint_json_file,
+    fingerprint_sqlite_database
+)
+from LeetSolver.backup import BACKUP_DIR, backup_sqlite_database
+from LeetSolver.connection import connect
 from typing import Dict, Optional, Tuple, Union
 from pathlib import Path 
 import sqlite3
@@ -26,22 +42,6 @@ import json
 # [not yet] Performance optimizations for large files.
 # [not yet] modifay misisng data from backup if possible
 
-def validate_json_data(json_data: Dict, schema: Dict) -> bool:
-    modified = False
-    
-    for key, schema_value in schema.items():
-        if key not in json_data:
-            modified, json_data[key] = True, schema_value
-            
-        elif isinstance(schema_value, dict) and isinstance(json_data.get(key), dict):
-            modified |= validate_json_data(json_data[key], schema_value)
-            
-        elif not isinstance(json_data[key], type(schema_value)):
-            modified, json_data[key] = True, schema_value
-
-    return modified
-
-
 def validate_json_file(json_fp: Path, schema: Optional[Dict] = None, **kw) -> None:
     """
     Validates the given JSON file against a schema and optionally fixes it.
@@ -67,24 +67,25 @@ def validate_json_file(json_fp: Path, schema: Optional[Dict] = None, **kw) -> No
     # `validate_json_data` validates json data and fix data if necessary.
     #  and validate_json_data Returns True if the data was modified, False otherwise.
     if kw.get("fix", False) and schema and validate_json_data(json_data, schema): 
-        with open(json_fp, 'w', encoding="utf-8") as file: 
-            json.dump(json_data, file, indent=4)
-            
+        atomic_write_json(json_fp, json_data)
+
 
 # Summary of Edge Cases and Actions for sqlite3 data validation:
-# [done] if not exists and fix=false raise else database Corrupted create new file 
+# [done] if not exists and fix=false raise else database Corrupted salvage its rows into a new file (see `salvage.py`)
 # [done] File permissions check for read/write access.
 # [done] sqlite3 verstion checking if less then raise validation error
 # [done] if tables is missing create it with schema
-# [----] if colume Corrupted create a new table.
-# [----] if anything mismatched in sqlite3 create a new table.
-# [---1] fix `sqlite_table_issues` finish the colume missmatch finder
-# [---2] fix `validate_sqlite_tables` finish the `issue` analysis work.
-# [not yet] create backup and estire from backup
-# [not yet] data extractor to extract data from broken table
-# [not yet] Handle databae locks with rety mechanisms.
+# [done] declared indexes and triggers are created, and recreated if their sql changed
+# [done] declared virtual tables (FTS5) are created and refilled, and recreated if their sql changed
+# [done] schema version is stored in PRAGMA user_version, matching databases are not inspected
+# [done] if colume Corrupted or anything mismatched migrate the table (data is kept).
+# [done] fix `sqlite_table_issues` finish the colume missmatch finder
+# [done] fix `validate_sqlite_tables` finish the `issue` analysis work.
+# [done] create backup and estire from backup (see `backup.py`, taken before any migration)
+# [done] data extractor to extract data from broken table
+# [done] Handle databae locks with rety mechanisms (see `connection.py`).
 # [not yet] Logging modifications made during validation.
-# [not yet] Implement a proper database migration strategy if sceema change
+# [done] Implement a proper database migration strategy if sceema change
 # ===========================================================================
 # [SCHEMA DESIGN EXPLANATION]
 # ===========================================================================
@@ -95,23 +96,29 @@ def validate_json_file(json_fp: Path, schema: Optional[Dict] = None, **kw) -> No
 # 
 # 2. The validation method will not perform direct modifications (e.g., ALTER) on 
 #    the database tables. Instead, if any errors, corruption, or discrepancies 
-#    are detected in the schema, the existing tables will be replaced with new ones. 
+#    are detected in the schema, the existing tables will be replaced with new ones
+#    and the columns that exist in both are copied over (see `migrate_sqlite_table`).
 #    Why is this approach chosen?
 #       - SQLite3 has limitations when it comes to altering tables.
 #       - SQLite can only rename columns, add columns at the end of the table, 
 #         and drop columns that aren't part of primary keys or unique constraints.
 #       - As a result, it's often easier and cleaner to recreate the tables 
 #         entirely rather than modifying them directly.
+#    New columns must therefore have a default value or be nullable, else the
+#    copy fails and the old table is kept.
 # 
-# 3. The initial version (v1) of the schema design will not support views or 
-#    virtual tables. These features may be considered in later versions, but 
-#    they will not be included in the current implementation.
+# 3. Virtual tables (e.g. FTS5 indexes) are declared in "VirtualTables" and
+#    treated like indexes: they are compared by their sql and dropped and
+#    recreated when it differs, so they must only hold data derived from real
+#    tables (external content) and be refilled by their after-create statements.
+#    Views are not supported.
 # ===========================================================================
 # [SCHEMA DESIGN]
 # ===========================================================================
 # __DEMO_SQLITE_SCHEMA = {
-#     "__version__": "v1",  # optional versioning for future upgrades
-#     "__on_upgrade__": None,  # strategy for schema version mismatch should be callable(cursor,scema)
+#     "__version__": "v1",  # optional, stored in PRAGMA user_version. bump it on every schema change
+#     "__on_upgrade__": None,  # callable(cursor,scema) or {"v2": callable(cursor,scema), ...} run on upgrade
+#     "__on_salvage__": None,  # optional callable(cursor,scema) run on the rows salvaged from a damaged file
 #     "Tables": [
 #         {
 #             "name": "demo",
@@ -139,6 +146,13 @@ def validate_json_file(json_fp: Path, schema: Optional[Dict] = None, **kw) -> No
 #             "BEGIN UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id; END;"
 #         )
 #     },
+#     "VirtualTables": {
+#         # (create sql, [optional] statements run after it is (re)created)
+#         "demo_fts": (
+#             "CREATE VIRTUAL TABLE demo_fts USING fts5(column1, content='demo', content_rowid='rowid')",
+#             "INSERT INTO demo_fts(demo_fts) VALUES('rebuild');"
+#         )
+#     },
 #     "Indexes": {
 #         "idx_name": "CREATE INDEX idx_name ON table_name(column_name);",
 #         "idx_unique_name": "CREATE UNIQUE INDEX idx_unique_name ON table_name(column_name);",
@@ -170,75 +184,190 @@ def create_sqlite_table_query(schema: Dict) -> str:
     all_definitions = ", ".join(column_definitions + constraints)
     return f"CREATE TABLE {schema['name']} ({all_definitions}){schema['outer_statement']};"
 
-def sqlite_table_issues(cursor: sqlite3.Cursor, table_schema: Dict) -> Dict:
+def sqlite_table_issues(cursor: sqlite3.Cursor, table_schema: Dict, introspector: Optional[SchemaIntrospector] = None) -> Dict:
     """
     Compares declared schema against actual SQLite table.
-    Returns what parts are missing (columns, constraints, etc).
+    Returns what parts are missing (columns, constraints, etc), see `diff_table_models`.
     Used for backing up data safely before schema migration.
     """
-    # Get real schema info
-    table_info = cursor.execute(f"PRAGMA table_info({table_schema['name']});").fetchall()
-    create_table_sql = remove_whitespace(cursor.execute(
-        f'SELECT sql FROM sqlite_master WHERE type = "table" AND name = "{table_schema["name"]}";'
-    ).fetchone()[0])
-    
-    issues = {
-        "columns_exists": [],
-        "columns_missing": [],
-        "FOREIGN KEY": [],
-        "UNIQUE": [],
-        "outer_statement": False
-    }
+    introspector = introspector or SchemaIntrospector(cursor)
+    return diff_table_models(
+        declared_table_model(table_schema), introspector.table(table_schema["name"])
+    )
 
-    # Check columns by name only (you can add more detail if needed)
-    for column in table_schema["columns"]:
-        index = 0
-        while index < len(table_info):
-            if column[1] == table_info[index][1]:
-                col = table_info.pop(index)
-                # will check colume level issues for rn we not gonna modify it
-                issues["columns_exists"].append(col)
-                break
-            index += 1
-        else:
-            issues["columns_missing"].append(column[0])
+def sqlite_table_needs_migration(issue: Dict) -> bool:
+    """
+    True if the issues found by `sqlite_table_issues` need the table to be rebuilt.
+    Extra columns that are not in the schema alone are not a reason to rebuild.
+    """
+    return bool(
+        issue["columns_missing"] or issue["columns_mismatch"] or issue["FOREIGN KEY"]
+        or issue["UNIQUE"] or issue["outer_statement"]
+    )
 
-    # Check constraints 
-    for constraint_type in ("FOREIGN KEY", "UNIQUE"):
-        for idx, constraint in enumerate(table_schema["constraints"][constraint_type]):
-            if remove_whitespace(constraint) not in create_table_sql:
-                issues[constraint_type].append(idx)
+def _copies_rowid(cursor: sqlite3.Cursor, table_schema: Dict) -> bool:
+    # rowid is copied so anything keyed by it survives the rebuild, unless one side
+    # has no rowid or a column (INTEGER PRIMARY KEY) is already an alias of it
+    if any(col[5] and col[2].upper() == "INTEGER" for col in table_schema["columns"]):
+        return False
+    actual = SchemaIntrospector(cursor).table(table_schema["name"])
+    return not (declared_table_model(table_schema).without_rowid or actual.without_rowid)
 
-    # Check outer statement
-    outer_stmt = table_schema.get("outer_statement")
-    if outer_stmt and remove_whitespace(outer_stmt) not in create_table_sql:
-        issues["outer_statement"] = True
+def migrate_sqlite_table(cursor: sqlite3.Cursor, issue: Dict, table_schema: Dict) -> None:
+    """
+    Rebuilds a table that does not match its schema without losing its data.
+
+    1. Creates the table from the schema under a temporary name.
+    2. Copies every surviving column (`issue["columns_exists"]`) with a single
+       `INSERT INTO ... SELECT`, so the copy runs inside the SQLite engine.
+    3. Drops the old table and renames the new one in its place.
+    All steps run in one savepoint, if any of them fails the old table is left untouched.
+    Indexes and triggers of the old table are dropped with it, the validator recreates
+    them from the schema right after the tables.
+    """
+    name = table_schema["name"]
+    temp_name = f"{name}__migrating"
+    columns = ", ".join(
+        (["rowid"] if _copies_rowid(cursor, table_schema) else [])
+        + issue["columns_exists"]
+    )
+    
+    cursor.execute(f"SAVEPOINT migrate_{name};")
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {temp_name};")
+        cursor.execute(create_sqlite_table_query(dict(table_schema, name=temp_name)))
+        if columns:
+            cursor.execute(f"INSERT INTO {temp_name} ({columns}) SELECT {columns} FROM {name};")
+        cursor.execute(f"DROP TABLE {name};")
+        # legacy rename: triggers of other tables that use this table must not be
+        # re-parsed while it does not exist
+        cursor.execute("PRAGMA legacy_alter_table = ON;")
+        cursor.execute(f"ALTER TABLE {temp_name} RENAME TO {name};")
+    except sqlite3.DatabaseError as e:
+        cursor.execute(f"ROLLBACK TO migrate_{name};")
+        raise ValidationError("sqlite", f"migration of table '{name}' failed: {e}")
+    finally:
+        cursor.execute("PRAGMA legacy_alter_table = OFF;")
+        cursor.execute(f"RELEASE migrate_{name};")
 
-    return issues
+def validate_sqlite_tables(cursor: sqlite3.Cursor, issue: Union[str, Dict], table_schema: Dict, **kw) -> None:
+    """
+    Fixes a table using the result of `sqlite_table_issues` (or "not_exists"):
+    missing tables are created and mismatched ones are migrated with `migrate_sqlite_table`.
+    A migration rebuilds the table, it only runs with `fix=True`.
 
-def validate_sqlite_tables(cursor: sqlite3.Cursor, issue: Union[str, Dict], table_schema: Dict) -> None:
-    # the analysing of issue section havent been implemented yet and its big issue
-    # becouse recreation means data loss and when to delete and when to pass
-    # i need to write the basic verstion too so that will be written for rn i will pass
-    # if issue isnt str 
-    if isinstance(issue, str) and issue == "not_exists":
-        try:
+    Raises:
+        ValidationError: If the table needs a migration and `fix=False`, or fixing it failed.
+    """
+    try:
+        if isinstance(issue, str) and issue == "not_exists":
             cursor.execute(create_sqlite_table_query(table_schema))
+        elif isinstance(issue, dict) and sqlite_table_needs_migration(issue):
+            if not kw.get("fix", False):
+                raise ValidationError(
+                    "sqlite3 database", f"table '{table_schema['name']}' does not match its schema"
+                )
+            migrate_sqlite_table(cursor, issue, table_schema)
+    except sqlite3.DatabaseError as e:
+        raise ValidationError("sqlite", e)
+
+def validate_sqlite_objects(cursor: sqlite3.Cursor, object_type: str, declared: Dict[str, Union[str, Tuple[str, ...]]], **kw) -> None:
+    """
+    Validates the declared schema objects (`index`, `trigger` or virtual `table`) of a database.
+    Objects are compared by their whitespace-stripped `CREATE` sql, missing ones are
+    created and the ones whose sql differs are dropped and recreated (they hold no data).
+    A declared object may be a tuple of its `CREATE` sql followed by statements run
+    right after it is (re)created, e.g. to fill a full-text index from its content table.
+    Objects in the database that are not declared are left untouched.
+    """
+    existing = dict(cursor.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = ?;", (object_type,)).fetchall())
+    
+    for name, statements in declared.items():
+        sql, *after_create = (statements,) if isinstance(statements, str) else statements
+        actual_sql = existing.get(name)
+        if actual_sql is not None and remove_whitespace(actual_sql) == remove_whitespace(sql.rstrip("; \n")):
+            continue
+        
+        if not kw.get("fix", False):
+            raise ValidationError("sqlite3 database", f"{object_type} '{name}' is missing or outdated")
+        try:
+            if actual_sql is not None:
+                cursor.execute(f"DROP {object_type.upper()} {name};")
+            cursor.execute(sql)
+            for statement in after_create:
+                cursor.execute(statement)
         except sqlite3.DatabaseError as e:
             raise ValidationError("sqlite", e)
 
+def parse_schema_version(version: Union[str, int, None]) -> Optional[int]:
+    """
+    Converts a schema `__version__` ("v1", "v2", ... or an int) to the integer
+    stored in `PRAGMA user_version`, None if the schema is not versioned.
+    """
+    if version is None:
+        return None
+    if isinstance(version, int):
+        return version
+    return int(str(version).lstrip("vV"))
+
+def sqlite_schema_is_current(stored_version: int, target_version: Optional[int]) -> bool:
+    """
+    True if a database at `stored_version` is at the schema version `target_version`
+    (never for an unversioned schema).
+
+    Raises:
+        ValidationError: If the database is newer than the schema.
+    """
+    if target_version is None:
+        return False
+    if stored_version > target_version:
+        raise ValidationError(
+            "sqlite3 database",
+            f"database schema version {stored_version} is newer than supported version {target_version}"
+        )
+    return stored_version == target_version
+
+def run_sqlite_upgrades(cursor: sqlite3.Cursor, schema: Dict, from_version: int, to_version: int) -> None:
+    """
+    Runs the schema's `__on_upgrade__` for a database going from `from_version`
+    to `to_version`. It is either a single callable(cursor, schema) or a dict of
+    {version: callable(cursor, schema)}, where every step newer than `from_version`
+    (up to `to_version`) runs in version order.
+    """
+    on_upgrade = schema.get("__on_upgrade__")
+    if on_upgrade is None:
+        return
+    if callable(on_upgrade):
+        on_upgrade(cursor, schema)
+        return
+    
+    steps = sorted((parse_schema_version(version), step) for version, step in on_upgrade.items())
+    for version, step in steps:
+        if from_version < version <= to_version:
+            step(cursor, schema)
+
 def validate_sqlite_database(sqlite3_fp: Path, schema: Optional[Dict] = None, **kw) -> None:
     """
     Validates the given SQLite3 database against a schema and optionally fixes it.
 
-    If the database is corrupted or missing, it creates a new file if `fix=True`.
-    Ensures that all tables, columns, and constraints in the schema exist in the database.
+    If the database is missing, it creates a new file if `fix=True`. If it is damaged
+    (cannot be opened, or with `full=True` fails `PRAGMA quick_check`) its readable rows
+    are salvaged into a new file if `fix=True`, see `salvage.salvage_sqlite_file`.
+    Ensures that all tables, columns, constraints, virtual tables, indexes and triggers in the
+    schema exist in the database.
+    If the schema is versioned, a database whose `PRAGMA user_version` already matches
+    `__version__` is not inspected further, otherwise it is validated, upgraded with
+    `__on_upgrade__` and stamped with the new version.
     Returns True if successful, raises ValidationError otherwise.
     
     Args:
         sqlite3_fp (Path): Path to the SQLite3 database file.
         schema (Optional[Dict]): Schema definition for the database.
-        **kw: Additional options (e.g., fix=True to apply fixes).
+        **kw: Additional options (e.g., fix=True to apply fixes, full=True to
+            validate every table even if the version matches, backup=False to skip
+            the snapshot taken before tables are migrated or upgraded, backup_dir
+            to keep it elsewhere than `backups` next to the database).
 
     Raises:
         ValidationError: If validation fails and `fix=False`.
@@ -254,8 +383,17 @@ def validate_sqlite_database(sqlite3_fp: Path, schema: Optional[Dict] = None, **
     elif not kw.get("fix", False):
         raise ValidationError("sqlite3 database", "no sqlite3 database exists")
     
+    # a damaged file is replaced by the rows salvaged from it, then fully validated
+    if sqlite3_fp.exists() and schema:
+        from LeetSolver.salvage import sqlite_database_is_damaged, salvage_sqlite_file
+        if sqlite_database_is_damaged(sqlite3_fp, check_pages=kw.get("full", False)):
+            if not kw.get("fix", False):
+                raise ValidationError("sqlite3 database", "the sqlite3 database is damaged")
+            salvage_sqlite_file(sqlite3_fp, schema)
+            kw = dict(kw, full=True)
+    
     # database validation process: database will either be connected or created
-    with sqlite3.connect(str(sqlite3_fp), timeout = 5) as conn:
+    with connect(sqlite3_fp) as conn:
         cursor = conn.cursor()
         if not IsVersionCompatible(cursor.execute("SELECT sqlite_version();").fetchone()[0], __REQUIRED_VERSION):
             raise ValidationError("sqlite3 database", f"the version of sqlite3 database is < {__REQUIRED_VERSION}")
@@ -264,12 +402,63 @@ def validate_sqlite_database(sqlite3_fp: Path, schema: Optional[Dict] = None, **
         if not schema:
             return
         
-        tables_list = frozenset(row[0] for row in cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table';").fetchall())
+        # versioned schema: a database already at the schema version is valid as is,
+        # unless a full validation is asked for. read without a lock, so a start with
+        # nothing to change never waits on other writers
+        target_version = parse_schema_version(schema.get("__version__"))
+        full = kw.get("full", False)
+        if sqlite_schema_is_current(cursor.execute("PRAGMA user_version;").fetchone()[0], target_version) and not full:
+            return
+        
+        # one write transaction for the whole check and fix: another process validating
+        # at the same time waits (with backoff) and then finds the database up to date
+        cursor.execute("BEGIN IMMEDIATE;")
+        stored_version = cursor.execute("PRAGMA user_version;").fetchone()[0]
+        if sqlite_schema_is_current(stored_version, target_version) and not full:
+            conn.commit()
+            return
+        
+        introspector = SchemaIntrospector(cursor)
+        tables_list = introspector.tables()
+        issues = [
+            (sqlite_table_issues(cursor, table_schema, introspector) if table_schema["name"] in tables_list else "not_exists", table_schema)
+            for table_schema in schema["Tables"]
+        ]
+        
+        # snapshot the existing data before any table is rebuilt or upgraded, read from
+        # a connection of its own: this one holds the write lock the copy would wait on
+        migrating = any(isinstance(issue, dict) and sqlite_table_needs_migration(issue) for issue, _ in issues)
+        upgrading = target_version is not None and stored_version != target_version and bool(tables_list)
+        if kw.get("fix", False) and kw.get("backup", True) and (migrating or upgrading):
+            try:
+                backup_sqlite_database(
+                    sqlite3_fp, kw.get("backup_dir") or sqlite3_fp.parent / BACKUP_DIR,
+                    reason="migrate" if migrating else f"v{stored_version}"
+                )
+            except LeetSolverError as e:
+                raise ValidationError("sqlite3 database", f"no backup could be taken before changing it: {e}", cause=e)
         
         # checking tables
-        for table_schema in schema["Tables"]:
-            issue = sqlite_table_issues(cursor, table_schema) if table_schema["name"] in tables_list else "not_exists"
-            validate_sqlite_tables(cursor, issue, table_schema)
+        for issue, table_schema in issues:
+            validate_sqlite_tables(cursor, issue, table_schema, **kw)
+        
+        # checking virtual tables, indexes and triggers, after the tables they are built on
+        validate_sqlite_objects(cursor, "table", schema.get("VirtualTables", {}), **kw)
+        validate_sqlite_objects(cursor, "index", schema.get("Indexes", {}), **kw)
+        validate_sqlite_objects(cursor, "trigger", schema.get("Triggers", {}), **kw)
+        
+        # data upgrades run once the structure is right, then the version is recorded
+        if target_version is not None and stored_version != target_version:
+            cursor.execute("SAVEPOINT upgrade_schema;")
+            try:
+                run_sqlite_upgrades(cursor, schema, stored_version, target_version)
+                cursor.execute(f"PRAGMA user_version = {target_version};")
+            except Exception:
+                cursor.execute("ROLLBACK TO upgrade_schema;")
+                raise
+            finally:
+                cursor.execute("RELEASE upgrade_schema;")
         
-    conn.commit()
\ No newline at end of file
+        # the commit of the `with` block is sqlite3's own, a busy COMMIT would fail
+        # there at once instead of being retried
+        conn.commit()
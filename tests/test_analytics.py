@@ -0,0 +1,93 @@
+from LeetSolver.backend.analytics import AnalyticsCache, Insights
+from LeetSolver.backend.database import Database, make_log_event
+from LeetSolver.validators import validate_sqlite_database
+import LeetSolver.initapp as initapp
+import pytest
+
+SCHEMA = getattr(initapp, "__DEFAULT_SQLITE_SCHEMA")
+INSIGHTS = ("weekly_summary", "difficulty_trend", "time_distribution", "tag_stats")
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = tmp_path / "database.db"
+    validate_sqlite_database(database, schema=SCHEMA, fix=True)
+    db = Database(database=database)
+    db.add_question("two-sum", "Two Sum", "Easy", tags="array,hash-table")
+    db.add_question("3sum", "3Sum", "Medium", tags="array,two-pointers")
+    db.log_solves(make_log_event(question, date=f"2024-01-{day:02}", time_taken=10 * day)
+                  for day, question in enumerate(("two-sum", "3sum", "two-sum"), 1))
+    yield db
+    db.close()
+
+
+def recomputed(insights):
+    """Runs the dashboard, returns the insights that were not served from the cache."""
+    computed = []
+    for name in INSIGHTS:
+        query = getattr(insights.db, name)
+        setattr(insights.db, name, lambda *params, name=name, query=query: computed.append(name) or query(*params))
+    try:
+        dashboard = insights.dashboard()
+    finally:
+        for name in INSIGHTS:
+            delattr(insights.db, name)
+    # a cached result is the one a fresh query gives
+    for name in INSIGHTS:
+        expected = insights.db.time_distribution(10, None) if name == "time_distribution" else getattr(insights.db, name)()
+        assert [tuple(row) for row in dashboard[name]] == [tuple(row) for row in expected]
+    return sorted(computed)
+
+
+def test_results_are_reused_until_a_table_they_read_changes(db):
+    insights = Insights(db)
+    assert recomputed(insights) == sorted(INSIGHTS)
+    assert recomputed(insights) == []
+
+    db.log_solve("3sum", date="2024-01-08", time_taken=5)
+    assert recomputed(insights) == sorted(INSIGHTS)
+    with db.transaction() as conn:
+        conn.execute("UPDATE daily_log SET time_taken = 99 WHERE id = 1;")
+    assert recomputed(insights) == sorted(INSIGHTS)
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM daily_log WHERE id = 2;")
+    assert recomputed(insights) == sorted(INSIGHTS)
+
+    # the tables time_distribution does not read
+    with db.transaction() as conn:
+        conn.execute("UPDATE questions SET difficulty = 'Hard' WHERE question_id = '3sum';")
+    assert recomputed(insights) == ["difficulty_trend", "weekly_summary"]
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM question_tags WHERE question_id = 'two-sum';")
+    assert recomputed(insights) == ["tag_stats"]
+    assert recomputed(insights) == []
+
+
+def test_writes_of_other_connections_and_imports_invalidate(db):
+    insights = Insights(db)
+    recomputed(insights)
+    other = Database(database=db.database)
+    other.log_solve("two-sum", date="2024-01-09")
+    other.close()
+    assert recomputed(insights) == sorted(INSIGHTS)
+
+    db.import_solves(
+        [{"question_id": "two-sum", "name": "Two Sum", "difficulty": "Easy", "tags": None, "notes": None}],
+        [{**make_log_event("two-sum", date="2024-01-10"), "solved_at": 1704844800}],
+    )
+    assert recomputed(insights) == sorted(INSIGHTS)
+
+    # a rolled back write changed nothing
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.execute("DELETE FROM daily_log;")
+            raise RuntimeError
+    assert recomputed(insights) == []
+
+
+def test_least_recently_used_results_are_dropped(db):
+    cache = AnalyticsCache(db, maxsize=2)
+    for since in ("2024-01-01", "2024-01-02", "2024-01-01", "2024-01-03", "2024-01-02"):
+        cache.get("tag_stats", (since,), ("daily_log",), lambda since=since: db.tag_stats(since))
+    # 01-02 was evicted by 01-03, 01-01 was used more recently
+    assert (cache.hits, cache.misses) == (1, 4)
@@ -0,0 +1,51 @@
+from LeetSolver.utils import Animation, AnimationClock
+import pytest
+
+# shown for 800, 200 and 500 ms, a 1500 ms cycle
+BLINK = Animation(["open", "closed", "wink"], [800, 200, 500])
+
+
+@pytest.mark.parametrize("t, frame, wait", [
+    (0, "open", 800), (799.5, "open", 0.5), (800, "closed", 200), (999, "closed", 1),
+    (1000, "wink", 500), (1499, "wink", 1), (1500, "open", 800), (3800, "closed", 200),
+])
+def test_frames_change_exactly_on_their_boundaries(t, frame, wait):
+    assert BLINK.frame_at(t) == frame
+    assert BLINK.ms_until_next(t) == wait
+    # sleeping the whole wait lands on the next frame, one ms less does not
+    assert BLINK.frame_at(t + wait) != frame
+    assert BLINK.frame_at(t + wait - 0.001) == frame
+
+
+def test_index_at_matches_a_walk_through_the_frames():
+    durations = [30, 10, 10, 50]
+    animation = Animation(list("abcd"), durations)
+    shown = [index for index, duration in enumerate(durations) for _ in range(duration)]
+    for t in range(3 * sum(durations)):
+        assert animation.index_at(t) == shown[t % len(shown)]
+
+
+def test_a_single_frame_never_changes():
+    plain = Animation(["logo"], [1000])
+    assert [plain.frame_at(t) for t in (0, 999, 1000, 123456)] == ["logo"] * 4
+    assert plain.ms_until_next(0) is None and plain.ms_until_next(1000) is None
+    assert Animation([], []).frame_at(10) is None
+
+
+def test_clock_waits_for_the_first_animation_to_change():
+    now = [100.0]
+    clock = AnimationClock(clock=lambda: now[0])
+    clock.add("logo", BLINK)
+    clock.add("spinner", Animation(["|", "/", "-", "\\"], [120] * 4))
+    clock.add("plain", Animation(["logo"], [1000]))
+    assert clock.frames() == {"logo": "open", "spinner": "|", "plain": "logo"}
+    assert clock.ms_until_next() == 120
+
+    now[0] += 0.79
+    assert clock.frames() == {"logo": "open", "spinner": "-", "plain": "logo"}
+    assert clock.ms_until_next() == pytest.approx(10)
+    assert clock.frames(800) == {"logo": "closed", "spinner": "-", "plain": "logo"}
+
+    only_still = AnimationClock(clock=lambda: now[0])
+    only_still.add("plain", Animation(["logo"], [1000]))
+    assert only_still.ms_until_next() is None
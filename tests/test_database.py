@@ -0,0 +1,88 @@
+from LeetSolver.backend.database import Database
+from LeetSolver.validators import validate_sqlite_database
+import LeetSolver.initapp as initapp
+import random
+import pytest
+
+SCHEMA = getattr(initapp, "__DEFAULT_SQLITE_SCHEMA")
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = tmp_path / "database.db"
+    validate_sqlite_database(database, schema=SCHEMA, fix=True)
+    db = Database(database=database)
+    yield db
+    db.close()
+
+
+def summary(db):
+    return [(week["week_start"], week["total_questions"], week["easy_count"]) for week in db.weekly_summary()]
+
+
+def test_weekly_summary_counts_successful_solves(db):
+    db.add_question("two-sum", "Two Sum", "Easy")
+    db.log_solve("two-sum", date="2024-01-01")
+    db.log_solve("two-sum", date="2024-01-02", success=False)
+    db.log_solve("two-sum", date="2024-01-03")
+    assert summary(db) == [("2024-01-01", 2, 2)]
+    assert db.question_totals()["solves"] == 2
+
+    # a failed attempt marked as solved later is counted, and the other way round
+    with db.transaction() as conn:
+        conn.execute("UPDATE daily_log SET success = 1 WHERE date = '2024-01-02';")
+        conn.execute("UPDATE daily_log SET success = 0 WHERE date = '2024-01-01';")
+        conn.execute("UPDATE daily_log SET date = '2024-01-08' WHERE date = '2024-01-03';")
+    assert summary(db) == [("2024-01-08", 1, 1), ("2024-01-01", 1, 1)]
+
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM daily_log WHERE success;")
+    assert summary(db) == []
+    db.rebuild_weekly_summary()
+    assert summary(db) == []
+
+
+@pytest.mark.parametrize("descending", (False, True))
+@pytest.mark.parametrize("sort", ("magic_score", "difficulty"))
+def test_questions_page_follows_the_full_sort(db, sort, descending):
+    scores = random.Random(15)
+    db.add_questions({
+        "question_id": f"q{i:03}", "name": f"Question {i}", "tags": None, "notes": None,
+        "difficulty": scores.choice((None, "Easy", "Medium", "Hard")),
+    } for i in range(120))
+    with db.transaction() as conn:
+        # NULL scores and ties, both need question_id to order them
+        conn.executemany("UPDATE questions SET magic_score = ? WHERE question_id = ?;", [
+            (scores.choice((None, 0.5, 1.0, scores.random())), f"q{i:03}") for i in range(120)
+        ])
+    rows = db.conn.execute(f"SELECT {sort}, question_id FROM questions;").fetchall()
+    # NULL values first, then by value, question_id breaking ties
+    expected = sorted(((row[0], row[1]) for row in rows), key=lambda key: (key[0] is not None, key[0] or 0, key[1]))
+    if descending:
+        expected.reverse()
+
+    def page(key, forward, limit):
+        return [(row[sort], row["question_id"]) for row in db.questions_page(sort, key, forward, limit, descending)]
+
+    # walking the whole list page by page, from either end
+    walked, key = [], None
+    while True:
+        rows = page(key, True, 7)
+        if not rows:
+            break
+        walked += rows
+        key = rows[-1]
+    assert walked == expected
+    walked, key = [], None
+    while True:
+        rows = page(key, False, 7)
+        if not rows:
+            break
+        walked[:0] = rows
+        key = rows[0]
+    assert walked == expected
+
+    # from keys with a NULL and a non NULL value, in both directions
+    for index in range(len(expected)):
+        assert page(expected[index], True, 5) == expected[index + 1:index + 6]
+        assert page(expected[index], False, 5) == expected[max(index - 5, 0):index]
@@ -0,0 +1,64 @@
+from LeetSolver.backend.importer import import_submissions
+from LeetSolver.__main__ import import_history
+from LeetSolver.backend.database import Database
+from LeetSolver.validators import validate_sqlite_database
+import LeetSolver.initapp as initapp
+import argparse
+import json
+import pytest
+
+SCHEMA = getattr(initapp, "__DEFAULT_SQLITE_SCHEMA")
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = tmp_path / "database.db"
+    validate_sqlite_database(database, schema=SCHEMA, fix=True)
+    db = Database(database=database)
+    yield db
+    db.close()
+
+
+def test_importing_an_export_twice_adds_nothing_twice(db, tmp_path):
+    export = tmp_path / "export.jsonl"
+    with open(export, "w", encoding="utf-8") as file:
+        for i in range(30):
+            file.write(json.dumps({
+                "titleSlug": f"q{i % 7}", "difficulty": "easy",
+                "timestamp": 1700000000 + i * 86400, "statusDisplay": "Accepted",
+            }) + "\n")
+    first = import_submissions(db, export, batch_size=8)
+    db.log_solve("q1", date="2023-01-01")
+    again = import_submissions(db, export, batch_size=8)
+
+    assert (first["imported"], first["duplicate"]) == (30, 0)
+    assert (again["imported"], again["duplicate"]) == (0, 30)
+    conn = db.conn
+    assert conn.execute("SELECT COUNT(*) FROM daily_log;").fetchone()[0] == 31
+    assert conn.execute("SELECT SUM(total_solved) FROM questions;").fetchone()[0] == 31
+    assert conn.execute("SELECT SUM(total_questions) FROM weekly_summary;").fetchone()[0] == 31
+    assert db.change_versions()["daily_log"] == 31
+
+
+def test_import_leaves_the_schema_alone(db, tmp_path):
+    export = tmp_path / "export.jsonl"
+    with open(export, "w", encoding="utf-8") as file:
+        file.write(json.dumps({"titleSlug": "two-sum", "timestamp": 1700000000}) + "\n")
+        # without a date the submission is counted by the per row triggers
+        file.write(json.dumps({"titleSlug": "two-sum"}) + "\n")
+    schema_version = db.conn.execute("PRAGMA schema_version;").fetchone()[0]
+
+    assert import_submissions(db, export)["imported"] == 2
+    assert db.conn.execute("PRAGMA schema_version;").fetchone()[0] == schema_version
+    assert db.conn.execute("SELECT SUM(total_questions) FROM weekly_summary;").fetchone()[0] == 2
+    assert db.change_versions()["daily_log"] == 2
+
+
+def test_import_command_rescores_the_questions(db, tmp_path):
+    export = tmp_path / "export.jsonl"
+    with open(export, "w", encoding="utf-8") as file:
+        file.write(json.dumps({"titleSlug": "two-sum", "timestamp": 1700000000}) + "\n")
+
+    import_history(db, argparse.Namespace(file=export, batch_size=10))
+    # solved long ago, so due
+    assert db.stored_due_questions()[0]["question_id"] == "two-sum"
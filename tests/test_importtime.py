@@ -0,0 +1,23 @@
+# The quick commands must start without the TUI and scoring dependencies and
+# within the import time budget, see benchmarks/importtime.py.
+from pathlib import Path
+import tempfile
+import sys
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import importtime
+
+
+@pytest.fixture(scope="module")
+def home():
+    with tempfile.TemporaryDirectory() as home:
+        importtime.prepare(home)
+        yield home
+
+
+@pytest.mark.parametrize("command", importtime.COMMANDS, ids=" ".join)
+def test_command_within_import_budget(home, command):
+    _, failures = importtime.check(command, home, importtime.BUDGET_MS, repeat=3)
+    assert not failures
@@ -0,0 +1,83 @@
+import LeetSolver.frontend.logos as logos
+from LeetSolver.utils import analyis_logo_data, pad_logo_frame
+from LeetSolver.error import ValidationError
+import json
+import os
+import pytest
+
+ROW = "x" * 25
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    """A copy of the logo assets the loader reads instead of the shipped file."""
+    asset_file = tmp_path / "logos.json"
+    asset_file.write_bytes(getattr(logos, "__ASSET_FILE").read_bytes())
+    monkeypatch.setattr(logos, "__ASSET_FILE", asset_file)
+    logos.load_logo_definitions.cache_clear()
+    yield asset_file
+    logos.load_logo_definitions.cache_clear()
+
+
+@pytest.mark.parametrize("data", [
+    ["@ 100", ROW + "x"],
+    ["@ 100"] + [ROW] * 6,
+    ["@ 100", ROW, "@ 0", ROW],
+    ["@ -5", ROW],
+    ["@ soon", ROW],
+    [ROW, "@ 100"],
+    [],
+])
+def test_malformed_definitions_are_refused(data):
+    with pytest.raises(ValueError):
+        analyis_logo_data(data, 5, 25)
+    with pytest.raises(ValidationError):
+        logos.render_logo("test", {"data": data})
+
+
+def test_frames_are_padded_to_the_logo_box():
+    frames, timestamps = analyis_logo_data(["@ 300", "ab", "@ 700"] + [ROW] * 5, 5, 25)
+    assert (frames, timestamps) == ([("ab",), (ROW,) * 5], [300, 700])
+    padded = pad_logo_frame(frames[0], 5, 25, 1)
+    assert len(padded) == 7 and {len(row) for row in padded} == {27}
+    assert padded[1] == " ab" + " " * 24 and padded[0].strip() == padded[2].strip() == ""
+
+
+def test_every_shipped_logo_renders():
+    for logoid, definition in logos.load_logo_definitions().items():
+        frames, timestamps = logos.render_logo(logoid, definition)
+        assert len(frames) == len(timestamps) and all(duration > 0 for duration in timestamps)
+        assert all(len(frame) == 7 and {len(row) for row in frame} == {27} for frame in frames)
+    assert logos.load_logo("no-such-logo") == logos.load_logo(logos.DEFAULT_LOGO_ID)
+
+
+def test_cached_frames_are_used_until_the_assets_change(assets, tmp_path, monkeypatch):
+    cache_dir = tmp_path / ".leetsolver"
+    cache_dir.mkdir()
+    rendered = logos.load_logo("1", cache_dir)
+    assert rendered == logos.load_logo("1")
+    assert (cache_dir / getattr(logos, "__CACHE_FILE")).exists()
+
+    def render_logo(logoid, definition):
+        raise AssertionError("rendered again")
+
+    # an unknown id is cached under its own name, as the default logo
+    default = logos.load_logo("no-such-logo", cache_dir)
+    with monkeypatch.context() as patch:
+        patch.setattr(logos, "render_logo", render_logo)
+        assert logos.load_logo("1", cache_dir) == rendered
+        assert logos.load_logo("no-such-logo", cache_dir) == default
+
+    # editing the assets invalidates the cache
+    definitions = json.loads(assets.read_text(encoding="utf-8"))
+    definitions["1"]["data"] = ["@ 250", "edited"]
+    mtime = os.stat(assets).st_mtime_ns
+    assets.write_text(json.dumps(definitions), encoding="utf-8")
+    os.utime(assets, ns=(mtime + 10**9, mtime + 10**9))
+    logos.load_logo_definitions.cache_clear()
+    frames, timestamps = logos.load_logo("1", cache_dir)
+    assert timestamps == [250] and frames[0][1] == " edited" + " " * 20
+
+    # a broken cache file is rebuilt
+    (cache_dir / getattr(logos, "__CACHE_FILE")).write_text("[1, 2", encoding="utf-8")
+    assert logos.load_logo("1", cache_dir) == (frames, timestamps)
@@ -0,0 +1,92 @@
+from LeetSolver.salvage import salvage_sqlite_file, sqlite_database_is_damaged
+from LeetSolver.backend.database import Database, make_log_event
+from LeetSolver.validators import validate_sqlite_database
+from LeetSolver.error import ValidationError
+import LeetSolver.initapp as initapp
+from pathlib import Path
+import sqlite3
+import pytest
+
+SCHEMA = getattr(initapp, "__DEFAULT_SQLITE_SCHEMA")
+LOGS = 3000
+
+
+def damage_pages(database, table, count):
+    """Overwrites `count` leaf pages from the middle of a table with garbage, returns their rows."""
+    conn = sqlite3.connect(str(database))
+    try:
+        pages = conn.execute(
+            "SELECT pageno, ncell FROM dbstat WHERE name = ? AND pagetype = 'leaf' ORDER BY pageno;", (table,)
+        ).fetchall()
+        page_size = conn.execute("PRAGMA page_size;").fetchone()[0]
+    except sqlite3.OperationalError:
+        pytest.skip("sqlite3 built without the dbstat table")
+    finally:
+        conn.close()
+    damaged = pages[len(pages) // 2:len(pages) // 2 + count]
+    with open(database, "r+b") as file:
+        for pageno, _ in damaged:
+            file.seek((pageno - 1) * page_size)
+            file.write(b"\xa5" * page_size)
+    return sum(cells for _, cells in damaged)
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = tmp_path / "database.db"
+    validate_sqlite_database(database, schema=SCHEMA, fix=True, backup=False)
+    db = Database(database=database)
+    db.add_question("two-sum", "Two Sum", "Easy")
+    db.log_solves(make_log_event("two-sum", date=f"2024-{1 + i % 12:02}-{1 + i % 28:02}") for i in range(LOGS))
+    # gaps in the rowids, the lost rows must still be counted right
+    db.conn.execute("DELETE FROM daily_log WHERE id % 7 = 0;")
+    db.conn.execute("PRAGMA journal_mode = DELETE;")
+    db.close()
+    return database
+
+
+def logged(database):
+    conn = sqlite3.connect(str(database))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM daily_log;").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_salvage_keeps_the_readable_rows_and_counts_the_lost_ones(database):
+    before = logged(database)
+    lost = damage_pages(database, "daily_log", 2)
+    assert sqlite_database_is_damaged(database, check_pages=True)
+
+    report = salvage_sqlite_file(database, SCHEMA)
+
+    daily_log = report["tables"]["daily_log"]
+    assert daily_log["status"] == "damaged"
+    # every row is either recovered or counted as lost, at most one row per damaged
+    # run is lost beyond the damaged pages
+    assert daily_log["recovered"] + daily_log["lost"] == before
+    assert lost <= daily_log["lost"] <= lost + len(daily_log["skipped"])
+    assert report["tables"]["questions"] == {"status": "ok", "recovered": 1, "lost": 0, "skipped": []}
+    recovered = logged(database)
+    assert recovered == daily_log["recovered"]
+    assert not sqlite_database_is_damaged(database, check_pages=True)
+
+    # the broken file is kept, the salvaged one validates and its summary counts the surviving rows
+    assert sqlite_database_is_damaged(Path(report["corrupt_file"]), check_pages=True)
+    validate_sqlite_database(database, schema=SCHEMA, fix=True, full=True, backup=False)
+    db = Database(database=database)
+    assert sum(week["total_questions"] for week in db.weekly_summary()) == recovered
+    db.close()
+
+
+def test_salvage_refuses_a_database_open_elsewhere(database):
+    damage_pages(database, "daily_log", 1)
+    db = Database(database=database)
+    db.conn.execute("SELECT COUNT(*) FROM questions;").fetchone()
+    try:
+        with pytest.raises(ValidationError):
+            salvage_sqlite_file(database, SCHEMA)
+    finally:
+        db.close()
+    assert sorted(path.name for path in database.parent.iterdir()) == ["database.db"]
+    assert salvage_sqlite_file(database, SCHEMA)["tables"]["daily_log"]["status"] == "damaged"
@@ -0,0 +1,75 @@
+from LeetSolver.backend.search import QuestionSearch, fts_query, search_words
+from LeetSolver.backend.database import Database
+from LeetSolver.validators import validate_sqlite_database
+import LeetSolver.initapp as initapp
+import pytest
+
+SCHEMA = getattr(initapp, "__DEFAULT_SQLITE_SCHEMA")
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = tmp_path / "database.db"
+    validate_sqlite_database(database, schema=SCHEMA, fix=True)
+    db = Database(database=database)
+    db.add_questions([
+        {"question_id": "two-sum", "name": "Two Sum", "difficulty": "Easy", "tags": "array,hash-table", "notes": None},
+        {"question_id": "3sum", "name": "3Sum", "difficulty": "Medium", "tags": "array,two-pointers", "notes": "sort first"},
+        {"question_id": "lru-cache", "name": "LRU Cache", "difficulty": "Medium", "tags": "design", "notes": None},
+    ])
+    yield db
+    db.close()
+
+
+def found(db, text):
+    return [row["question_id"] for row in db.search_questions(fts_query(search_words(text)))]
+
+
+def index_is_in_sync(db):
+    # raises SQLITE_CORRUPT_VTAB when the index disagrees with `questions`
+    db.conn.execute("INSERT INTO questions_fts (questions_fts, rank) VALUES ('integrity-check', 1);")
+    return True
+
+
+def test_search_matches_names_tags_and_notes(db):
+    assert found(db, "two su") == ["two-sum"]
+    assert found(db, "lru") == ["lru-cache"]
+    assert sorted(found(db, "array")) == ["3sum", "two-sum"]
+    assert found(db, "sort") == ["3sum"]
+    assert found(db, "cache design") == ["lru-cache"]
+    assert found(db, "graph") == []
+    # FTS5 operators are searched for literally
+    assert found(db, 'two" OR "lru') == []
+    assert found(db, "NOT cache") == []
+
+
+def test_index_follows_inserts_updates_and_deletes(db):
+    db.add_question("two-sum", "Two Sum II", tags="binary-search", notes="sorted input")
+    assert found(db, "binary") == ["two-sum"]
+    assert found(db, "hash") == []
+    assert found(db, "ii sorted") == ["two-sum"]
+
+    db.add_question("lru-cache", "LFU Cache")
+    assert found(db, "lru") == []
+    assert found(db, "lfu") == ["lru-cache"]
+
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM questions WHERE question_id = '3sum';")
+    assert found(db, "array") == []
+    db.add_question("4sum", "4Sum", tags="array")
+    assert found(db, "array") == ["4sum"]
+    assert index_is_in_sync(db)
+
+
+def test_cached_results_until_cleared(db):
+    search = QuestionSearch(db)
+    assert [row["question_id"] for row in search.search("Hash")] == ["two-sum"]
+    assert search.search("zz") == []
+    db.add_question("zz-top", "ZZ Top")
+    db.add_question("group-anagrams", "Group Anagrams", tags="hash-table,string")
+    # cached, and an empty query is not run again for its extensions
+    assert search.search("zz") == [] and search.search("zzt") == []
+    assert [row["question_id"] for row in search.search("hash")] == ["two-sum"]
+    search.clear()
+    assert [row["question_id"] for row in search.search("zz")] == ["zz-top"]
+    assert sorted(row["question_id"] for row in search.search("hash")) == ["group-anagrams", "two-sum"]
@@ -0,0 +1,129 @@
+from LeetSolver.settings import Settings
+from LeetSolver.error import LeetSolverError, ValidationError
+import LeetSolver.utils as utils
+import json
+import os
+import pytest
+
+SCHEMA = {"logo": "default", "refresh_ms": 100, "show_heatmap": True}
+
+
+class FakeTimers:
+    """`call_later` of an event loop, the callbacks run when told to."""
+
+    class Handle:
+        def __init__(self, delay, callback):
+            self.delay, self.callback, self.cancelled = delay, callback, False
+
+        def cancel(self):
+            self.cancelled = True
+
+    def __init__(self):
+        self.handles = []
+
+    def __call__(self, delay, callback):
+        self.handles.append(self.Handle(delay, callback))
+        return self.handles[-1]
+
+    def run(self):
+        for handle in [handle for handle in self.handles if not handle.cancelled]:
+            handle.cancelled = True
+            handle.callback()
+
+
+@pytest.fixture
+def settings_fp(tmp_path):
+    settings_fp = tmp_path / "settings.json"
+    settings_fp.write_text(json.dumps({"logo": "fire", "refresh_ms": "fast"}), encoding="utf-8")
+    return settings_fp
+
+
+def on_disk(settings_fp):
+    return json.loads(settings_fp.read_text(encoding="utf-8"))
+
+
+def edit_by_hand(settings_fp, data):
+    before = os.stat(settings_fp).st_mtime_ns
+    settings_fp.write_text(json.dumps(data), encoding="utf-8")
+    # a coarse mtime must still tell the edit apart
+    os.utime(settings_fp, ns=(before + 10**9, before + 10**9))
+
+
+def test_values_are_typed_against_the_schema(settings_fp):
+    settings = Settings(settings_fp, SCHEMA, call_later=FakeTimers())
+    assert settings.as_dict() == {"logo": "fire", "refresh_ms": 100, "show_heatmap": True}
+    with pytest.raises(ValidationError):
+        settings.set("refresh_ms", "slow")
+    assert settings.pending == 0
+
+
+def test_changes_are_written_once_after_the_quiet_time(settings_fp):
+    timers = FakeTimers()
+    settings = Settings(settings_fp, SCHEMA, debounce_ms=250, call_later=timers)
+    for logo in ("wave", "dots", "stars"):
+        settings.set("logo", logo)
+    settings.set("show_heatmap", False)
+    # every set moved the write back, only the last timer is live
+    assert [handle.cancelled for handle in timers.handles] == [True, True, True, False]
+    assert timers.handles[-1].delay == 250
+    assert on_disk(settings_fp)["logo"] == "fire"
+    assert settings.get("logo") == "stars" and settings.pending == 2
+
+    timers.run()
+    assert on_disk(settings_fp) == {"logo": "stars", "refresh_ms": "fast", "show_heatmap": False}
+    assert settings.pending == 0
+    # setting a value to what it is schedules nothing
+    settings.set("logo", "stars")
+    assert len(timers.handles) == 4
+
+
+def test_hand_edits_are_reloaded_and_kept_by_writes(settings_fp):
+    timers = FakeTimers()
+    settings = Settings(settings_fp, SCHEMA, call_later=timers)
+    changes = []
+    settings.subscribe(changes.append)
+    assert settings.poll() == {}
+
+    settings.set("logo", "wave")
+    edit_by_hand(settings_fp, {"logo": "fire", "refresh_ms": 50})
+    # the value set in the app and not written yet wins over the file
+    assert settings.poll() == {"refresh_ms": 50}
+    assert settings.get("logo") == "wave"
+    assert settings.poll() == {}
+
+    # an editor saving halfway keeps the last good values
+    settings_fp.write_text('{"logo": "fi', encoding="utf-8")
+    assert settings.poll() == {} and settings.get("refresh_ms") == 50
+    edit_by_hand(settings_fp, {"logo": "fire", "refresh_ms": 50, "theme": "dark"})
+    settings.poll()
+
+    timers.run()
+    assert on_disk(settings_fp) == {"logo": "wave", "refresh_ms": 50, "theme": "dark"}
+    assert changes == [{"logo": "wave"}, {"refresh_ms": 50}, {"theme": "dark"}]
+    # our own write is not reloaded as an edit
+    assert settings.poll() == {}
+
+
+def test_failed_write_leaves_the_file_and_keeps_the_changes(settings_fp, monkeypatch):
+    timers = FakeTimers()
+    settings = Settings(settings_fp, SCHEMA, call_later=timers)
+    before = settings_fp.read_bytes()
+    settings.set("logo", "wave")
+
+    def replace(source, target):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(utils.os, "replace", replace)
+    with pytest.raises(LeetSolverError):
+        settings.flush()
+    settings.set("show_heatmap", False)
+    timers.run()
+    assert isinstance(settings.error, LeetSolverError)
+    assert settings_fp.read_bytes() == before
+    assert [path.name for path in settings_fp.parent.iterdir()] == ["settings.json"]
+    assert settings.pending == 2
+
+    monkeypatch.undo()
+    settings.close()
+    assert settings.pending == 0
+    assert on_disk(settings_fp) == {"logo": "wave", "refresh_ms": "fast", "show_heatmap": False}
@@ -0,0 +1,113 @@
+from LeetSolver.backend.streaks import StreakEngine
+from LeetSolver.backend.database import Database, make_log_event
+from LeetSolver.validators import validate_sqlite_database
+import LeetSolver.initapp as initapp
+from collections import Counter
+import datetime
+import random
+import pytest
+
+SCHEMA = getattr(initapp, "__DEFAULT_SQLITE_SCHEMA")
+FIRST_DAY = datetime.date(2024, 1, 1)
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = tmp_path / "database.db"
+    validate_sqlite_database(database, schema=SCHEMA, fix=True)
+    db = Database(database=database)
+    db.add_question("two-sum", "Two Sum", "Easy")
+    yield db
+    db.close()
+
+
+def day(offset):
+    return (FIRST_DAY + datetime.timedelta(days=offset)).isoformat()
+
+
+def naive(db, today):
+    """Streaks and heatmap recomputed from every row of `daily_log`."""
+    counts = Counter(row[0] for row in db.conn.execute("SELECT date FROM daily_log;"))
+    active = lambda date: counts[date.isoformat()] > 0
+    longest = run = 0
+    if counts:
+        date = datetime.date.fromisoformat(min(counts))
+        while date <= datetime.date.fromisoformat(max(counts)):
+            run = run + 1 if active(date) else 0
+            longest = max(longest, run)
+            date += datetime.timedelta(days=1)
+    date = datetime.date.fromisoformat(today)
+    if not active(date):
+        date -= datetime.timedelta(days=1)
+    current = 0
+    while active(date):
+        current += 1
+        date -= datetime.timedelta(days=1)
+    end = datetime.date.fromisoformat(today)
+    heatmap = [counts[(end - datetime.timedelta(days=i)).isoformat()] for i in range(99, -1, -1)]
+    return counts, longest, current, heatmap
+
+
+def check(engine, db, today):
+    counts, longest, current, heatmap = naive(db, today)
+    assert engine.longest_streak == longest
+    assert engine.current_streak(today) == current
+    assert engine.heatmap(100, today) == heatmap
+    for date, count in counts.items():
+        assert engine.count_on(date) == count
+    grid = engine.heatmap_grid(10, today)
+    first = datetime.date.fromisoformat(grid["first_day"])
+    assert first.weekday() == 0
+    for weekday, row in enumerate(grid["rows"]):
+        for week, value in enumerate(row):
+            date = first + datetime.timedelta(days=7 * week + weekday)
+            assert value == (counts[date.isoformat()] if date.isoformat() <= today else 0)
+    assert first + datetime.timedelta(days=69) >= datetime.date.fromisoformat(today) > first + datetime.timedelta(days=62)
+
+
+def test_engine_matches_a_recomputation_after_every_change(db, tmp_path):
+    changes = random.Random(19)
+    engine = StreakEngine(db)
+    engine.refresh()
+    check(engine, db, day(0))
+    for step in range(150):
+        change = changes.random()
+        if change < 0.6:
+            # runs of days, some before the first logged day
+            start = changes.randint(-30, 120)
+            db.log_solves(make_log_event("two-sum", date=day(start + i))
+                          for i in range(changes.randint(1, 6)) for _ in range(changes.randint(1, 2)))
+        elif change < 0.7:
+            db.import_solves([], [
+                {**make_log_event("two-sum", date=day(changes.randint(-30, 120))), "solved_at": 1704067200 + step}
+            ])
+        elif change < 0.85:
+            with db.transaction() as conn:
+                conn.execute("DELETE FROM daily_log WHERE id IN (SELECT id FROM daily_log ORDER BY random() LIMIT 3);")
+        else:
+            with db.transaction() as conn:
+                conn.execute("UPDATE daily_log SET date = ? WHERE id IN (SELECT id FROM daily_log ORDER BY random() LIMIT 1);",
+                             (day(changes.randint(-30, 120)),))
+        if changes.random() < 0.2:
+            # a new session starts from the saved state
+            engine = StreakEngine(db)
+        engine.refresh()
+        check(engine, db, day(changes.randint(-40, 130)))
+
+
+def test_saved_state_is_reused_and_a_broken_one_rebuilt(db):
+    db.log_solves(make_log_event("two-sum", date=day(i)) for i in (0, 1, 2, 4))
+    engine = StreakEngine(db)
+    engine.refresh()
+    assert engine.state_path.exists()
+
+    restored = StreakEngine(db)
+    assert restored.load()
+    assert (restored.longest_streak, restored.current_streak(day(5))) == (3, 1)
+
+    engine.state_path.write_text("{not json", encoding="utf-8")
+    broken = StreakEngine(db)
+    assert not broken.load()
+    db.log_solve("two-sum", date=day(5))
+    broken.refresh()
+    check(broken, db, day(5))
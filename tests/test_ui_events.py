@@ -0,0 +1,81 @@
+from LeetSolver.frontend.ui_events import EventLoop
+import threading
+import signal
+import time
+import os
+import pytest
+
+
+@pytest.fixture
+def loop():
+    loop = EventLoop()
+    yield loop
+    loop.close()
+
+
+def test_timers_run_in_order_and_cancelled_ones_never(loop):
+    ran = []
+    loop.call_later(30, lambda: ran.append("third"))
+    loop.call_later(10, lambda: ran.append("second"))
+    loop.call_later(0, lambda: ran.append("first"))
+    loop.call_later(20, lambda: ran.append("cancelled")).cancel()
+    loop.call_later(40, loop.stop)
+    loop.run()
+    assert ran == ["first", "second", "third"]
+
+
+def test_idle_loop_sleeps_until_the_next_timer(loop):
+    ran = []
+    loop.call_later(100, lambda: ran.append(time.monotonic()))
+    start, cpu = time.monotonic(), time.process_time()
+    while not ran:
+        loop.run_once()
+    assert ran[0] - start >= 0.1
+    assert time.process_time() - cpu < 0.05
+
+
+def test_readers_run_when_their_fd_is_readable(loop):
+    read, write = os.pipe()
+    try:
+        received = []
+        loop.add_reader(read, lambda: received.append(os.read(read, 10)))
+        threading.Timer(0.05, os.write, (write, b"k")).start()
+        # no timer is scheduled, only the key wakes the loop
+        loop.run_once()
+        assert received == [b"k"]
+        loop.remove_reader(read)
+    finally:
+        os.close(read)
+        os.close(write)
+
+
+def test_background_results_are_handed_back_on_the_loop_thread(loop):
+    done = []
+
+    def query(value):
+        time.sleep(0.05)
+        return value, threading.get_ident()
+
+    loop.run_in_background(query, 42, on_done=lambda future: done.append((future.result(), threading.get_ident())))
+    while not done:
+        loop.run_once()
+    (value, worker), thread = done[0]
+    assert value == 42
+    assert worker != thread == threading.get_ident()
+
+
+def test_posted_events_and_signals_wake_the_loop(loop):
+    posted = []
+    threading.Timer(0.05, loop.call_soon_threadsafe, (lambda: posted.append("posted"),)).start()
+    loop.run_once()
+    assert posted == ["posted"]
+
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        loop.add_signal_handler(signal.SIGUSR1, lambda: posted.append("signal"))
+        threading.Timer(0.05, os.kill, (os.getpid(), signal.SIGUSR1)).start()
+        while len(posted) < 2:
+            loop.run_once()
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+    assert posted == ["posted", "signal"]
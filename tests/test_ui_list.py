@@ -0,0 +1,80 @@
+from LeetSolver.frontend.ui_list import VirtualList
+from concurrent.futures import Future
+import random
+
+ROWS = [f"q{i:04}" for i in range(1000)]
+
+
+def fetch(key, forward, limit):
+    # rows after (before) `key` in list order, like `Database.questions_page`
+    if key is None:
+        return ROWS[:limit] if forward else ROWS[-limit:]
+    index = ROWS.index(key)
+    return ROWS[index + 1:index + 1 + limit] if forward else ROWS[max(index - limit, 0):index]
+
+
+class DeferredLoader:
+    """Runs the fetches when told to, like the event loop's worker threads."""
+
+    def __init__(self):
+        self.queued = []
+
+    def __call__(self, fetch, *args, on_done):
+        self.queued.append((fetch, args, on_done))
+
+    def run(self):
+        while self.queued:
+            fetch, args, on_done = self.queued.pop(0)
+            future = Future()
+            future.set_result(fetch(*args))
+            on_done(future)
+
+
+def test_random_moves_match_the_full_list():
+    rows = VirtualList(fetch, key=lambda row: row, height=10, prefetch=5)
+    rows.reload()
+    expected = 0
+    moves = random.Random(15)
+    for _ in range(2000):
+        delta = moves.choice((-1, 1, -10, 10, -37, 37, -500, 500))
+        rows.move(delta)
+        expected = min(max(expected + delta, 0), len(ROWS) - 1)
+        assert rows.selected == ROWS[expected]
+        assert rows.visible() == ROWS[expected - (rows.cursor - rows.top):][:10]
+        # the held window stays within the visible rows, the margins and one page
+        assert len(rows.rows) <= 10 + 2 * 5 + 500
+
+
+def test_window_is_trimmed_while_scrolling():
+    rows = VirtualList(fetch, key=lambda row: row, height=10, prefetch=5)
+    rows.reload()
+    for _ in range(300):
+        rows.move(1)
+    assert rows.selected == ROWS[300]
+    # the visible rows, a margin on either side and at most one more page of margin
+    assert len(rows.rows) <= 10 + 3 * 5
+    assert not rows.at_start and not rows.at_end
+    rows.page(100)
+    assert (rows.selected, rows.at_end) == (ROWS[-1], True)
+    rows.page(-100)
+    assert (rows.selected, rows.at_start) == (ROWS[0], True)
+
+
+def test_pages_pressed_while_loading_are_finished_when_the_rows_arrive():
+    loader = DeferredLoader()
+    rows = VirtualList(fetch, key=lambda row: row, height=10, prefetch=5, loader=loader)
+    rows.reload()
+    loader.run()
+    # three pages down before the next page is fetched
+    for _ in range(3):
+        rows.page(1)
+    assert rows.selected == ROWS[14]
+    loader.run()
+    assert rows.selected == ROWS[30]
+    assert rows.visible()[-1] == ROWS[30]
+
+    # reversing before the rows arrive cancels what was left of the move
+    rows.page(1)
+    rows.page(-2)
+    loader.run()
+    assert rows.selected == ROWS[20]
@@ -0,0 +1,98 @@
+from LeetSolver.frontend.ui_renderer import Region, Renderer
+import LeetSolver.frontend.ui_renderer as ui_renderer
+import random
+
+
+class FakeWindow:
+    """A curses window keeping its cells, and the writes made to it."""
+
+    def __init__(self, height, width, y=0, x=0):
+        self.cells = [[" "] * width for _ in range(height)]
+        self.writes = []
+        self.refreshes = 0
+
+    def box(self):
+        for row in self.cells:
+            row[0] = row[-1] = "|"
+        self.cells[0] = self.cells[-1] = ["-"] * len(self.cells[0])
+
+    def addstr(self, y, x, text):
+        self.writes.append((y, x, text))
+        self.cells[y][x:x + len(text)] = text
+
+    def noutrefresh(self):
+        self.refreshes += 1
+
+    def erase(self):
+        pass
+
+    def inner(self):
+        return ["".join(row[1:-1]) for row in self.cells[1:-1]]
+
+
+def test_flush_writes_only_the_changed_cells():
+    region = Region((8, 22, 0, 0), win=FakeWindow(8, 22))
+    assert region.flush()
+    refreshes = 1
+    writes = random.Random(11)
+    for _ in range(300):
+        region.win.writes = []
+        before = list(region.back)
+        for _ in range(writes.randint(0, 3)):
+            region.write(writes.randint(-2, 7), writes.randint(-5, 22), "".join(writes.choices("ab ", k=writes.randint(0, 8))))
+        changed = [y for y in range(region.height) if region.back[y] != before[y]]
+        assert region.flush() == bool(changed)
+        refreshes += bool(changed)
+        assert region.win.inner() == region.back
+        # one write per changed row, from its first to its last changed cell
+        assert [y - 1 for y, _, _ in region.win.writes] == changed
+        for y, x, text in region.win.writes:
+            assert text[0] != before[y - 1][x - 1] and text[-1] != before[y - 1][x + len(text) - 2]
+    # a region without changes is not refreshed
+    assert region.win.refreshes == refreshes
+
+
+def test_write_is_clipped_to_the_region():
+    region = Region((4, 7, 0, 0), win=FakeWindow(4, 7))
+    region.write(0, -2, "abcdefgh")
+    region.write(1, 3, "xyz")
+    region.write(2, 0, "never")
+    region.write(-1, 0, "never")
+    region.write(0, 5, "never")
+    assert region.back == ["cdefg", "   xy"]
+    region.flush()
+    assert region.win.inner() == ["cdefg", "   xy"]
+    assert [row[0] + row[-1] for row in region.win.cells[1:-1]] == ["||", "||"]
+
+
+def test_render_updates_the_terminal_only_after_changes(monkeypatch):
+    windows, updates = [], []
+
+    def newwin(height, width, y, x):
+        windows.append(FakeWindow(height, width))
+        return windows[-1]
+
+    monkeypatch.setattr(ui_renderer.curses, "newwin", newwin)
+    monkeypatch.setattr(ui_renderer.curses, "doupdate", lambda: updates.append(1))
+    renderer = Renderer(FakeWindow(24, 80))
+    renderer.layout({"logo": (7, 27, 0, 0), "list": (10, 40, 7, 0)})
+    renderer.render()
+    assert len(updates) == 1
+    renderer.render()
+    assert len(updates) == 1
+
+    renderer["list"].write(2, 4, "two-sum")
+    renderer["list"].write(2, 4, "two-sum")
+    renderer.render()
+    assert len(updates) == 2
+    assert windows[1].inner()[2].startswith("    two-sum")
+    # writing what is already shown sends nothing
+    renderer["list"].write(2, 4, "two-sum")
+    renderer.render()
+    assert len(updates) == 2
+
+    # a resize builds new windows and paints everything once
+    renderer.layout({"logo": (7, 27, 0, 0), "list": (12, 40, 7, 0)})
+    assert len(windows) == 4
+    renderer.render()
+    assert len(updates) == 3 and windows[3].inner()[2].strip() == ""
@@ -0,0 +1,203 @@
+# Databases created by older releases must upgrade to the current schema on startup.
+from LeetSolver.backup import BACKUP_DIR, backup_sqlite_database, copy_sqlite_database, list_backups
+from LeetSolver.validators import validate_sqlite_database, parse_schema_version
+from LeetSolver.backend.database import Database
+from LeetSolver.error import BackupError, ValidationError
+import LeetSolver.initapp as initapp
+import threading
+import sqlite3
+import time
+import pytest
+
+SCHEMA = getattr(initapp, "__DEFAULT_SQLITE_SCHEMA")
+
+# the tables as the first release created them (rollback journal, user_version 0)
+BASELINE_TABLES = (
+    "CREATE TABLE questions (question_id TEXT NOT NULL PRIMARY KEY , name TEXT NOT NULL , "
+    "difficulty TEXT CHECK(difficulty IN ('Easy', 'Medium', 'Hard')), first_solved DATE , "
+    "last_solved DATE , total_solved INTEGER DEFAULT 0 , "
+    "personal_rating INTEGER CHECK(personal_rating BETWEEN 1 AND 10), best_rating INTEGER , "
+    "current_rating INTEGER , magic_score REAL , tags TEXT , notes TEXT );",
+    "CREATE TABLE daily_log (id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, date DATE NOT NULL , "
+    "question_id TEXT NOT NULL , time_taken INTEGER , success BOOLEAN , revision_status BOOLEAN , "
+    "FOREIGN KEY(question_id) REFERENCES questions(question_id));",
+    "CREATE TABLE weekly_summary (week_start DATE NOT NULL PRIMARY KEY , total_questions INTEGER , "
+    "easy_count INTEGER , medium_count INTEGER , hard_count INTEGER );",
+)
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    database = tmp_path / "database.db"
+    conn = sqlite3.connect(str(database))
+    for sql in BASELINE_TABLES:
+        conn.execute(sql)
+    conn.execute(
+        "INSERT INTO questions (question_id, name, difficulty, tags) "
+        "VALUES ('two-sum', 'Two Sum', 'Easy', 'array,hash-table');")
+    conn.executemany(
+        "INSERT INTO daily_log (date, question_id, time_taken, success, revision_status) "
+        "VALUES (?, 'two-sum', 30, ?, 0);",
+        [("2024-01-01", 1), ("2024-01-03", 1), ("2024-01-10", 1), ("2024-01-11", 0)])
+    conn.commit()
+    conn.close()
+    return database
+
+
+def run_with_timeout(func, timeout=60):
+    errors = []
+
+    def target():
+        try:
+            func()
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "timed out"
+    if errors:
+        raise errors[0]
+
+
+def test_baseline_database_upgrades(baseline_db):
+    run_with_timeout(lambda: validate_sqlite_database(baseline_db, schema=SCHEMA, fix=True))
+
+    conn = sqlite3.connect(str(baseline_db))
+    try:
+        assert conn.execute("PRAGMA user_version;").fetchone()[0] == parse_schema_version(SCHEMA["__version__"])
+        assert conn.execute("SELECT COUNT(*) FROM daily_log;").fetchone()[0] == 4
+        # the solves logged before the summary was maintained are counted, not the failed attempt
+        assert conn.execute(
+            "SELECT week_start, total_questions, easy_count FROM weekly_summary ORDER BY week_start;"
+        ).fetchall() == [("2024-01-01", 2, 2), ("2024-01-08", 1, 1)]
+    finally:
+        conn.close()
+    backups = baseline_db.parent / BACKUP_DIR
+    assert len(list_backups(backups)) == 1
+    assert not list(backups.glob("*.tmp"))
+
+
+def test_mismatched_table_is_not_migrated_without_fix(baseline_db):
+    before = sqlite3.connect(str(baseline_db))
+    schema_sql = before.execute("SELECT sql FROM sqlite_master WHERE name = 'daily_log';").fetchone()[0]
+    before.close()
+
+    with pytest.raises(ValidationError, match="daily_log"):
+        validate_sqlite_database(baseline_db, schema=SCHEMA)
+
+    conn = sqlite3.connect(str(baseline_db))
+    try:
+        assert conn.execute("SELECT sql FROM sqlite_master WHERE name = 'daily_log';").fetchone()[0] == schema_sql
+        assert conn.execute("PRAGMA user_version;").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_backup_refuses_a_connection_in_a_transaction(baseline_db, tmp_path):
+    conn = sqlite3.connect(str(baseline_db))
+    try:
+        conn.execute("BEGIN IMMEDIATE;")
+        with pytest.raises(BackupError):
+            run_with_timeout(lambda: backup_sqlite_database(conn, tmp_path / BACKUP_DIR), timeout=10)
+    finally:
+        conn.close()
+
+
+def test_commit_waits_for_a_reader(baseline_db):
+    from LeetSolver.connection import connect
+    reader = sqlite3.connect(str(baseline_db), check_same_thread=False)
+    writer = connect(baseline_db)
+    try:
+        reader.execute("BEGIN;")
+        reader.execute("SELECT COUNT(*) FROM daily_log;").fetchone()
+        writer.execute("BEGIN IMMEDIATE;")
+        writer.execute("DELETE FROM daily_log;")
+        # rollback journal: COMMIT needs the reader gone, it is released meanwhile
+        threading.Timer(0.2, reader.rollback).start()
+        writer.execute("COMMIT;")
+        assert writer.execute("SELECT COUNT(*) FROM daily_log;").fetchone()[0] == 0
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_upgrade_commit_waits_for_a_reader(baseline_db):
+    reader = sqlite3.connect(str(baseline_db), check_same_thread=False)
+    try:
+        reader.execute("BEGIN;")
+        reader.execute("SELECT COUNT(*) FROM daily_log;").fetchone()
+        # rollback journal: the COMMIT ending the upgrade needs the reader gone
+        threading.Timer(0.3, reader.rollback).start()
+        run_with_timeout(lambda: validate_sqlite_database(baseline_db, schema=SCHEMA, fix=True, backup=False))
+    finally:
+        reader.close()
+    conn = sqlite3.connect(str(baseline_db))
+    try:
+        assert conn.execute("PRAGMA user_version;").fetchone()[0] == parse_schema_version(SCHEMA["__version__"])
+    finally:
+        conn.close()
+
+
+def test_copy_sleeps_while_the_target_is_locked(baseline_db, tmp_path):
+    target_fp = tmp_path / "copy.db"
+    locker = sqlite3.connect(str(target_fp), isolation_level=None, check_same_thread=False)
+    locker.execute("BEGIN EXCLUSIVE;")
+    threading.Timer(0.5, locker.rollback).start()
+    # no busy handler of its own: every locked step comes back at once
+    source, target = sqlite3.connect(str(baseline_db)), sqlite3.connect(str(target_fp), timeout=0)
+    try:
+        started = time.process_time()
+        copy_sqlite_database(source, target)
+        # waiting for the lock costs no CPU
+        assert time.process_time() - started < 0.25
+        assert target.execute("SELECT COUNT(*) FROM daily_log;").fetchone()[0] == 4
+    finally:
+        source.close()
+        target.close()
+        locker.close()
+
+
+def test_current_database_is_validated_without_the_write_lock(tmp_path):
+    database = tmp_path / "database.db"
+    validate_sqlite_database(database, schema=SCHEMA, fix=True)
+    writer = sqlite3.connect(str(database), isolation_level=None)
+    try:
+        writer.execute("BEGIN IMMEDIATE;")
+        started = time.monotonic()
+        validate_sqlite_database(database, schema=SCHEMA, fix=True)
+        assert time.monotonic() - started < 1
+    finally:
+        writer.close()
+
+
+def test_upgrade_splits_the_tag_strings(baseline_db):
+    conn = sqlite3.connect(str(baseline_db))
+    conn.executemany(
+        "INSERT INTO questions (question_id, name, tags) VALUES (?, ?, ?);", [
+            ("3sum", "3Sum", " Array; Two Pointers,array ,, "),
+            ("lru-cache", "LRU Cache", None),
+            ("valid-parentheses", "Valid Parentheses", ""),
+        ])
+    conn.commit()
+    conn.close()
+    run_with_timeout(lambda: validate_sqlite_database(baseline_db, schema=SCHEMA, fix=True))
+
+    db = Database(database=baseline_db)
+    try:
+        tags = db.conn.execute(
+            "SELECT qt.question_id, t.name FROM question_tags AS qt JOIN tags AS t ON t.tag_id = qt.tag_id "
+            "ORDER BY qt.question_id, t.name;"
+        ).fetchall()
+        # trimmed, lowercased and unique, one tag row per name
+        assert [tuple(row) for row in tags] == [
+            ("3sum", "array"), ("3sum", "two pointers"), ("two-sum", "array"), ("two-sum", "hash-table"),
+        ]
+        assert db.conn.execute("SELECT COUNT(*) FROM tags;").fetchone()[0] == 3
+        assert [row["question_id"] for row in db.questions_with_tag(" Array")] == ["3sum", "two-sum"]
+        # the solves logged before the upgrade count for the tags of their question
+        stats = {row["tag"]: (row["questions"], row["attempts"], row["solved"]) for row in db.tag_stats()}
+        assert stats == {"array": (2, 4, 3), "hash-table": (1, 4, 3), "two pointers": (1, 0, 0)}
+    finally:
+        db.close()
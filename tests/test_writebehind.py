@@ -0,0 +1,99 @@
+from LeetSolver.backend.writebehind import WriteBehindQueue, parse_journal
+from LeetSolver.backend.database import Database, make_log_event
+from LeetSolver.validators import validate_sqlite_database
+import LeetSolver.initapp as initapp
+import multiprocessing
+import json
+import pytest
+
+SCHEMA = getattr(initapp, "__DEFAULT_SQLITE_SCHEMA")
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = tmp_path / "database.db"
+    validate_sqlite_database(database, schema=SCHEMA, fix=True)
+    db = Database(database=database)
+    db.add_question("two-sum", "Two Sum", "Easy")
+    yield db
+    db.close()
+
+
+def logged(db):
+    return db.conn.execute("SELECT COUNT(*) FROM daily_log;").fetchone()[0]
+
+def journal_seqs(journal):
+    return [seq for seq, _ in parse_journal(journal.read_text(encoding="utf-8").splitlines(True))]
+
+
+def test_two_queues_share_one_journal(db):
+    # two processes logging to the same directory, each with its own handle
+    other = Database(database=db.database)
+    first, second = WriteBehindQueue(db), WriteBehindQueue(other)
+    first.log("two-sum")
+    second.log("two-sum")
+    first.log("two-sum")
+    assert journal_seqs(first.journal_path) == [1, 2, 3]
+
+    # a flush writes the entries of both and empties the journal
+    assert first.flush() == 3
+    assert first.journal_path.read_text(encoding="utf-8") == ""
+    assert second.flush() == 0
+    second.log("two-sum")
+    assert second.flush() == 1
+    assert (first.pending, second.pending) == (0, 0)
+    assert logged(db) == 4
+    assert db.journal_position(first.journal_path.name) == 4
+    first.close()
+    second.close()
+    other.close()
+
+
+def test_crashed_journal_is_replayed_once(db, tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    db.apply_journal(journal.name, [(1, make_log_event("two-sum", date="2024-01-01"))])
+    with open(journal, "w", encoding="utf-8") as file:
+        for seq in (1, 2, 3):
+            file.write(json.dumps({"seq": seq, "event": make_log_event("two-sum", date=f"2024-01-0{seq}")}) + "\n")
+        # the crash tore the last write
+        file.write('{"seq": 4, "event": {"question_')
+
+    queue = WriteBehindQueue(db)
+    assert queue.pending == 2
+    queue.log("two-sum", date="2024-01-05")
+    # the torn entry was never acknowledged, its number is given again
+    assert journal_seqs(journal) == [1, 2, 3, 4]
+    assert queue.flush() == 3
+    queue.close()
+
+    # a second replay finds nothing new
+    queue = WriteBehindQueue(db)
+    assert (queue.pending, queue.flush()) == (0, 0)
+    queue.close()
+    dates = [row["date"] for row in db.logs_between("2024-01-01", "2024-01-31")]
+    assert dates == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-05"]
+
+
+def log_from_another_process(database, count):
+    db = Database(database=database)
+    queue = WriteBehindQueue(db)
+    for _ in range(count):
+        queue.log("two-sum")
+    db.close()
+
+
+def test_processes_logging_at_once_get_distinct_numbers(db):
+    workers = [
+        multiprocessing.get_context("fork").Process(target=log_from_another_process, args=(db.database, 50))
+        for _ in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    queue = WriteBehindQueue(db)
+    assert sorted(journal_seqs(queue.journal_path)) == list(range(1, 151))
+    assert queue.flush() == 150
+    queue.close()
+    assert logged(db) == 150